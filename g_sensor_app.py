@@ -7,7 +7,7 @@ Sensor Logger - Pythonista3用センサーログ記録アプリ
 - GPS（位置、速度、精度）
 - デッドレコニング（GPS途絶時の推測航法）
 - OpenStreetMap表示
-- JSONログ記録
+- ログ記録（gzip圧縮NDJSON）
 
 対応: iPhone 17 Pro
 更新レート: 100ms (10Hz)
@@ -18,9 +18,15 @@ import motion
 import location
 import math
 import time
+import numpy as np
 import json
+import gzip
 import os
+import threading
+import collections
+import bisect
 from datetime import datetime
+from functools import lru_cache
 
 # 共有機能
 try:
@@ -29,6 +35,26 @@ try:
 except ImportError:
     CONSOLE_AVAILABLE = False
 
+# 高速JSONエンコーダ（Pythonista3には未同梱のため標準jsonにフォールバック）
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# JITコンパイラ（Pythonista3には未同梱のためPython実装にフォールバック）
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """numba未導入時は関数をそのまま返す"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
 # スリープ防止機能・気圧計
 try:
     from objc_util import ObjCClass, on_main_thread
@@ -47,6 +73,17 @@ except ImportError:
     UIDevice = None
     CMAltimeter = None
 
+# 角度変換定数（math.radians/math.degreesの関数呼び出しを省く）
+DEG2RAD = math.pi / 180.0
+RAD2DEG = 180.0 / math.pi
+TWO_PI = 2.0 * math.pi
+
+# 地球半径の逆数（JITカーネル用）
+INV_EARTH_RADIUS = 1.0 / 6378137.0
+
+# cos(緯度)キャッシュの緯度の丸め桁数（1e-4度 ≒ 11m）
+LAT_CACHE_DECIMALS = 4
+
 
 def set_sleep_disabled(disabled):
     """画面スリープの有効/無効を設定"""
@@ -61,8 +98,41 @@ def set_sleep_disabled(disabled):
     return False
 
 
+@lru_cache(maxsize=64)
+def _inv_cos_lat_rounded(lat_key):
+    """丸めた緯度に対する1/cos(緯度)"""
+    return 1.0 / math.cos(lat_key * DEG2RAD)
+
+
+def inv_cos_lat(lat):
+    """1/cos(緯度)を取得（m→経度変換用）
+
+    10Hzの更新間で緯度はほぼ変わらないため、緯度を丸めた値でメモ化し
+    GPSINSFusion / DeadReckoning で共有する。
+    """
+    return _inv_cos_lat_rounded(round(float(lat), LAT_CACHE_DECIMALS))
+
+
+def json_dumps_bytes(obj):
+    """オブジェクトをコンパクトなJSON（UTF-8バイト列）にエンコード"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+_device_info_cache = None
+
+
 def get_device_info():
-    """デバイス情報を取得"""
+    """デバイス情報を取得（プロセス中は不変のため初回の結果を再利用）"""
+    global _device_info_cache
+    if _device_info_cache is None:
+        _device_info_cache = _query_device_info()
+    return _device_info_cache
+
+
+def _query_device_info():
+    """UIDeviceからデバイス情報を取得（ObjCブリッジ呼び出し）"""
     info = {
         'model': 'Unknown',
         'system_name': 'Unknown',
@@ -230,7 +300,32 @@ MAP_HTML = '''
             });
         }
 
+        // メモリ上のLRUキャッシュ（IndexedDBのトランザクションを避ける）
+        var MEM_CACHE_SIZE = 256;
+        var memCache = new Map();
+
+        function memCacheGet(key) {
+            var blob = memCache.get(key);
+            if (blob !== undefined) {
+                // 最近使用した順に並べ替え
+                memCache.delete(key);
+                memCache.set(key, blob);
+            }
+            return blob;
+        }
+
+        function memCachePut(key, blob) {
+            memCache.delete(key);
+            memCache.set(key, blob);
+            if (memCache.size > MEM_CACHE_SIZE) {
+                memCache.delete(memCache.keys().next().value);
+            }
+        }
+
         function getCachedTile(key) {
+            var blob = memCacheGet(key);
+            if (blob) return Promise.resolve(blob);
+
             return openDB().then(function(database) {
                 return new Promise(function(resolve, reject) {
                     var tx = database.transaction(STORE_NAME, 'readonly');
@@ -239,21 +334,48 @@ MAP_HTML = '''
                     request.onsuccess = function() { resolve(request.result); };
                     request.onerror = function() { resolve(null); };
                 });
+            }).then(function(result) {
+                if (result) memCachePut(key, result);
+                return result;
             }).catch(function() { return null; });
         }
 
-        function cacheTile(key, blob) {
-            return openDB().then(function(database) {
-                return new Promise(function(resolve) {
-                    var tx = database.transaction(STORE_NAME, 'readwrite');
-                    var store = tx.objectStore(STORE_NAME);
-                    store.put(blob, key);
-                    tx.oncomplete = function() { resolve(); };
-                    tx.onerror = function() { resolve(); };
+        // 書き込みはまとめて1トランザクションで行う
+        var pendingWrites = [];
+        var writeScheduled = false;
+
+        function scheduleIdle(callback) {
+            if (window.requestIdleCallback) {
+                window.requestIdleCallback(callback);
+            } else {
+                setTimeout(callback, 50);
+            }
+        }
+
+        function flushTileWrites() {
+            writeScheduled = false;
+            var writes = pendingWrites;
+            pendingWrites = [];
+            if (writes.length === 0) return;
+
+            openDB().then(function(database) {
+                var tx = database.transaction(STORE_NAME, 'readwrite');
+                var store = tx.objectStore(STORE_NAME);
+                writes.forEach(function(entry) {
+                    store.put(entry[1], entry[0]);
                 });
             }).catch(function() {});
         }
 
+        function cacheTile(key, blob) {
+            memCachePut(key, blob);
+            pendingWrites.push([key, blob]);
+            if (!writeScheduled) {
+                writeScheduled = true;
+                scheduleIdle(flushTileWrites);
+            }
+        }
+
         // キャッシュ対応タイルレイヤー
         L.TileLayer.Cached = L.TileLayer.extend({
             createTile: function(coords, done) {
@@ -358,49 +480,92 @@ MAP_HTML = '''
         var lastPosition = null;
         var isTracking = false;
 
+        // ステータス表示のDOM要素（毎回の検索を避ける）
+        var statusDot = document.getElementById('statusDot');
+        var statusText = document.getElementById('statusText');
+        var lastStatusSource = null;
+
+        // マーカー・精度円の現在の色（変化時のみsetStyleする）
+        var markerColor = null;
+        var accuracyCircleColor = null;
+
+        // 地図の追従（setViewは一定間隔に間引く）
+        var SET_VIEW_INTERVAL_MS = 200;
+        var lastSetViewTime = 0;
+
+        // 航跡点のバッファ（まとめてポリラインに反映し再描画回数を減らす）
+        var POINT_FLUSH_INTERVAL_MS = 500;
+        var pointBuffer = [];
+        var flushTimer = null;
+
+        function flushPoints() {
+            if (flushTimer !== null) {
+                clearTimeout(flushTimer);
+                flushTimer = null;
+            }
+            if (currentSegment && pointBuffer.length > 0) {
+                currentSegment.setLatLngs(currentSegment.getLatLngs().concat(pointBuffer));
+            }
+            pointBuffer = [];
+        }
+
+        function bufferPoint(latlng) {
+            pointBuffer.push(latlng);
+            if (flushTimer === null) {
+                flushTimer = setTimeout(flushPoints, POINT_FLUSH_INTERVAL_MS);
+            }
+        }
+
         function updateStatus(source) {
-            var dot = document.getElementById('statusDot');
-            var text = document.getElementById('statusText');
-            dot.style.background = sourceColors[source] || sourceColors.waiting;
-            text.textContent = sourceLabels[source] || source;
+            if (source === lastStatusSource) return;
+            lastStatusSource = source;
+            statusDot.style.background = sourceColors[source] || sourceColors.waiting;
+            statusText.textContent = sourceLabels[source] || source;
         }
 
         function updateIntegratedPosition(lat, lon, source, accuracy) {
-            var latlng = L.latLng(lat, lon);
+            var latlng = [lat, lon];
 
-            // マーカーの色を更新
+            // マーカーの位置・色を更新
             var color = sourceColors[source] || sourceColors.waiting;
             currentMarker.setLatLng(latlng);
-            currentMarker.setStyle({
-                fillColor: color,
-                opacity: 1,
-                fillOpacity: 0.9
-            });
+            if (color !== markerColor) {
+                currentMarker.setStyle({
+                    fillColor: color,
+                    opacity: 1,
+                    fillOpacity: 0.9
+                });
+                markerColor = color;
+            }
 
             // 精度円（GPS系のみ表示）
             if (source.startsWith('gps') && accuracy > 0) {
                 accuracyCircle.setLatLng(latlng);
                 accuracyCircle.setRadius(accuracy);
-                accuracyCircle.setStyle({
-                    fillColor: color,
-                    color: color,
-                    opacity: 0.3,
-                    fillOpacity: 0.1
-                });
-            } else {
+                if (color !== accuracyCircleColor) {
+                    accuracyCircle.setStyle({
+                        fillColor: color,
+                        color: color,
+                        opacity: 0.3,
+                        fillOpacity: 0.1
+                    });
+                    accuracyCircleColor = color;
+                }
+            } else if (accuracyCircleColor !== null) {
                 accuracyCircle.setStyle({opacity: 0, fillOpacity: 0});
+                accuracyCircleColor = null;
             }
 
             // 航跡の追加
             if (isTracking) {
                 if (currentSource !== source) {
                     // ソースが変わったら新しいセグメントを開始
-                    if (lastPosition) {
+                    if (lastPosition && currentSegment) {
                         // 前のセグメントに現在位置を追加（つなぐため）
-                        if (currentSegment) {
-                            currentSegment.addLatLng(latlng);
-                        }
+                        pointBuffer.push(latlng);
                     }
+                    // バッファ済みの点を前のセグメントに反映
+                    flushPoints();
                     // 新しいセグメントを開始
                     currentSegment = L.polyline([latlng], {
                         color: color,
@@ -412,19 +577,34 @@ MAP_HTML = '''
                     trackSegments.push(currentSegment);
                     currentSource = source;
                 } else {
-                    // 同じソースなら現在のセグメントに追加
+                    // 同じソースなら現在のセグメントに追加（バッファ経由）
                     if (currentSegment) {
-                        currentSegment.addLatLng(latlng);
+                        bufferPoint(latlng);
                     }
                 }
             }
 
             lastPosition = latlng;
-            map.setView(latlng);
+
+            // 地図の追従（再レイアウトを抑えるため間引く）
+            var now = performance.now();
+            if (now - lastSetViewTime >= SET_VIEW_INTERVAL_MS) {
+                map.setView(latlng);
+                lastSetViewTime = now;
+            }
             updateStatus(source);
         }
 
+        // Python側からまとめて送られた位置を順に反映 [[lat, lon, source, accuracy], ...]
+        function updatePositionBatch(positions) {
+            for (var i = 0; i < positions.length; i++) {
+                var p = positions[i];
+                updateIntegratedPosition(p[0], p[1], p[2], p[3]);
+            }
+        }
+
         function startTracking() {
+            flushPoints();
             isTracking = true;
             currentSource = null;
             currentSegment = null;
@@ -432,10 +612,18 @@ MAP_HTML = '''
         }
 
         function stopTracking() {
+            flushPoints();
             isTracking = false;
         }
 
         function resetTrack() {
+            // 未反映の点を破棄
+            if (flushTimer !== null) {
+                clearTimeout(flushTimer);
+                flushTimer = null;
+            }
+            pointBuffer = [];
+
             // 全セグメントを削除
             trackSegments.forEach(function(seg) {
                 map.removeLayer(seg);
@@ -449,6 +637,8 @@ MAP_HTML = '''
             // マーカーを非表示
             currentMarker.setStyle({opacity: 0, fillOpacity: 0});
             accuracyCircle.setStyle({opacity: 0, fillOpacity: 0});
+            markerColor = null;
+            accuracyCircleColor = null;
             updateStatus('waiting');
         }
     </script>
@@ -458,15 +648,31 @@ MAP_HTML = '''
 
 
 class DataLogger:
-    """センサーデータのログ記録クラス"""
+    """センサーデータのログ記録クラス（バックグラウンドスレッドで逐次書き出し）"""
+
+    FLUSH_BATCH_SIZE = 256  # 一度にまとめて書き出す最大レコード数
+    FLUSH_INTERVAL = 1.0    # 書き出し間隔（秒）
+    SYNC_INTERVAL = 30.0    # gzipストリームをディスクへ同期する間隔（秒）
+    FILE_BUFFER_SIZE = 1 << 20  # 出力ファイルのバッファサイズ（バイト）
+
+    # センサー値の量子化桁数（小数点以下、センサー分解能相当）
+    QUANTIZE_DECIMALS = {
+        'gravity': 5,            # G
+        'user_acceleration': 5,  # G
+        'attitude': 6,           # rad / deg
+        'gyro_calculated': 4,    # rad/s
+        'magnetic_field': 2      # μT
+    }
 
     def __init__(self):
         self.session_start = datetime.now()
-        self.records = []
+        # レコードの時刻はセッション開始からの経過ナノ秒（単調増加時計）で記録する
+        self._start_ns = time.monotonic_ns()
         device_info = get_device_info()
         self.metadata = {
             'session_start': self.session_start.isoformat(),
             'session_start_unix': time.time(),
+            'record_time': 't_ns',  # session_start_unixからの経過時間 [ns]
             'device': device_info.get('model', 'iPhone'),
             'device_info': device_info,
             'app_version': '1.1.0',
@@ -475,34 +681,53 @@ class DataLogger:
                 'altimeter': ALTIMETER_AVAILABLE,
                 'sleep_control': SLEEP_CONTROL_AVAILABLE,
                 'direct_gyro': False  # Pythonista3では直接取得不可
+            },
+            'quantization': {
+                'sensors_decimals': self.QUANTIZE_DECIMALS
             }
         }
         self.last_saved_path = None
 
-    def add_record(self, data):
-        """レコードを追加"""
-        record = {
-            'timestamp': time.time(),
-            'datetime': datetime.now().isoformat(),
-            'sequence': len(self.records),
-            **data
-        }
-        self.records.append(record)
+        # メタデータは不変なので、ヘッダ行のバイト列を一度だけ生成しておく
+        self._header_line = json_dumps_bytes(
+            {'type': 'metadata', 'metadata': self.metadata}
+        ) + b'\n'
+
+        # 書き出し待ちレコード [(t_ns, data), ...]
+        self._queue = collections.deque()
+        self._record_count = 0
+        self._written_count = 0
+
+        # 書き出しスレッド
+        self._file = None
+        self._raw_file = None
+        self._filepath = None
+        self._last_sync = 0.0
+        self._flush_event = threading.Event()
+        self._stop_requested = False
+        self._writer_thread = None
+        # 書き出しスレッドで発生した最初の例外（stop/saveで呼び出し元へ送出する）
+        self._writer_error = None
 
-    def _get_log_data(self):
-        """保存用データを取得"""
-        return {
-            'metadata': self.metadata,
-            'record_count': len(self.records),
-            'records': self.records
-        }
+    def add_record(self, data):
+        """レコードを追加（書き出しはバックグラウンドスレッドで行う）"""
+        if self._writer_error is not None:
+            # 書き出しスレッドが停止しているので、キューに溜め続けない
+            return
+        self._queue.append((time.monotonic_ns() - self._start_ns, data))
+        self._record_count += 1
+        if len(self._queue) >= self.FLUSH_BATCH_SIZE:
+            self._flush_event.set()
 
     def _get_filename(self):
         """ファイル名を生成"""
-        return f"sensor_log_{self.session_start.strftime('%Y%m%d_%H%M%S')}.json"
+        return f"sensor_log_{self.session_start.strftime('%Y%m%d_%H%M%S')}.ndjson.gz"
+
+    def start(self, directory=None):
+        """ログファイルを開いて書き出しスレッドを開始"""
+        if self._writer_thread is not None:
+            return self._filepath
 
-    def save(self, directory=None):
-        """ローカルに保存"""
         if directory is None:
             directory = os.path.expanduser('~/Documents')
 
@@ -510,14 +735,120 @@ class DataLogger:
         if not os.path.exists(log_dir):
             os.makedirs(log_dir)
 
-        filename = self._get_filename()
-        filepath = os.path.join(log_dir, filename)
+        self._filepath = os.path.join(log_dir, self._get_filename())
+
+        # gzip圧縮NDJSON: 1行目にメタデータ、以降1行1レコード
+        # 圧縮レベルは端末のCPU負荷を抑えるため最小にする
+        # 圧縮後のバイト列は大きめのバッファに溜めてからまとめて書き込む
+        self._raw_file = open(self._filepath, 'wb', buffering=self.FILE_BUFFER_SIZE)
+        self._file = gzip.GzipFile(fileobj=self._raw_file, mode='wb', compresslevel=1)
+        self._file.write(self._header_line)
+        self._last_sync = time.monotonic()
+
+        self._stop_requested = False
+        self._writer_thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._writer_thread.start()
+        return self._filepath
+
+    def _flush_loop(self):
+        """書き出しスレッド本体（一定件数または一定時間ごとにまとめて書き出す）"""
+        while True:
+            self._flush_event.wait(self.FLUSH_INTERVAL)
+            self._flush_event.clear()
+            stop_requested = self._stop_requested
+            try:
+                self._write_pending()
+            except Exception as e:
+                # ディスクフル等で書き出せない場合は記録を打ち切り、stop()で通知する
+                self._writer_error = e
+                self._queue.clear()
+                break
+            if stop_requested:
+                break
+
+    def _quantize(self, data):
+        """センサー値を分解能相当の桁数に丸める（ログサイズ削減）"""
+        sensors = data.get('sensors')
+        if not sensors:
+            return
+        for name, digits in self.QUANTIZE_DECIMALS.items():
+            values = sensors.get(name)
+            if values:
+                # レコードは書き出しスレッドの専有なので、その場で書き換える
+                for k, v in values.items():
+                    if v.__class__ is float:
+                        values[k] = round(v, digits)
+
+    def _write_pending(self):
+        """キューに溜まったレコードをファイルへ書き出す"""
+        queue = self._queue
+        dumps = json_dumps_bytes
+        while queue:
+            lines = []
+            while queue and len(lines) < self.FLUSH_BATCH_SIZE:
+                t_ns, data = queue.popleft()
+                self._quantize(data)
+                # t_ns/sequenceはdictを作り直さずにバイト列の先頭へ差し込む
+                body = dumps(data)
+                lines.append(b'{"t_ns":%d,"sequence":%d%s%s' % (
+                    t_ns, self._written_count,
+                    b',' if len(body) > 2 else b'', body[1:]
+                ))
+                self._written_count += 1
+            lines.append(b'')
+            self._file.write(b'\n'.join(lines))
+
+        # gzipのflushは圧縮ブロックを区切るため、一定間隔ごとにまとめて行う
+        # （停止時はcloseで残りが書き出される）
+        now = time.monotonic()
+        if now - self._last_sync >= self.SYNC_INTERVAL:
+            self._file.flush()
+            self._last_sync = now
 
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(self._get_log_data(), f, ensure_ascii=False, separators=(',', ':'))
+    def stop(self):
+        """書き出しスレッドを停止してファイルを閉じる
+
+        returns: 保存したファイルパス（レコードがない場合はNone）
+        raises: 書き出しに失敗していた場合はその例外
+        """
+        if self._writer_thread is None:
+            if self._writer_error is not None:
+                raise self._writer_error
+            return self.last_saved_path
+
+        self._stop_requested = True
+        self._flush_event.set()
+        self._writer_thread.join()
+        self._writer_thread = None
+
+        # GzipFileは渡されたファイルオブジェクトを閉じないため個別に閉じる
+        # （閉じる際の書き込みで失敗しても、もう一方は必ず閉じる）
+        for f in (self._file, self._raw_file):
+            try:
+                f.close()
+            except Exception as e:
+                if self._writer_error is None:
+                    self._writer_error = e
+        self._file = None
+        self._raw_file = None
 
-        self.last_saved_path = filepath
-        return filepath
+        if self._writer_error is not None:
+            raise self._writer_error
+
+        if self._record_count == 0:
+            # 空のログは残さない
+            os.remove(self._filepath)
+            return None
+
+        self.last_saved_path = self._filepath
+        return self._filepath
+
+    def save(self, directory=None):
+        """ローカルに保存（未書き出し分を書き出してファイルを閉じる）"""
+        if (self._writer_thread is None and self.last_saved_path is None
+                and self._writer_error is None):
+            self.start(directory)
+        return self.stop()
 
     def share(self):
         """共有シートを開く（Dropbox等に送信可能）"""
@@ -535,13 +866,165 @@ class DataLogger:
 
     def get_record_count(self):
         """記録数を取得"""
-        return len(self.records)
+        return self._record_count
+
+
+# GPS/INS融合の状態ベクトルのインデックス
+(STATE_LAT, STATE_LON,                      # 位置 [deg]
+ STATE_VN, STATE_VE,                        # 速度（北、東）[m/s]
+ STATE_HEADING,                             # 方位 [rad]
+ STATE_POS_UNC, STATE_VEL_UNC,              # 不確実性 [m], [m/s]
+ STATE_MEM_VN, STATE_MEM_VE, STATE_MEM_SPEED,  # メモリー速度 [m/s]
+ STATE_MEM_HEADING) = range(11)             # メモリー方位 [rad]
+STATE_SIZE = 11
+
+# 静止検出（ZUPT）・移動判定の加速度しきい値 [G]
+ZUPT_ACCEL_THRESHOLD = 0.08
+ZUPT_ACCEL_THRESHOLD_SQ = ZUPT_ACCEL_THRESHOLD * ZUPT_ACCEL_THRESHOLD
+MOVE_ACCEL_THRESHOLD = 0.05
+
+# センサー値が取得できない場合の代替（motionモジュールの3要素タプルと同じ形）
+ZERO_VEC3 = (0.0, 0.0, 0.0)
+
+
+@njit(cache=True)
+def _ins_step(state, accel, attitude, use_accel, delta_yaw, dt, inv_cos_lat):
+    """通常INSモードの1ステップ（stateをその場で更新し、速度[m/s]を返す）
+
+    accel, attitude: motionモジュールの (x, y, z) / (roll, pitch, yaw) をそのまま受け取る
+    """
+    ax, ay, az = accel
+    roll, pitch, yaw = attitude
+    lat = state[STATE_LAT]
+    lon = state[STATE_LON]
+    vel_north = state[STATE_VN]
+    vel_east = state[STATE_VE]
+
+    # ヨー角の変化から方位を更新
+    state[STATE_HEADING] += delta_yaw
+
+    # 加速度から世界座標系への変換
+    if use_accel:
+        # ピッチ・ロール補正
+        ay_corrected = ay * math.cos(pitch) - az * math.sin(pitch)
+        ax_corrected = ax * math.cos(roll)
+
+        # デバイス座標から世界座標へ
+        # heading = 3π/2 - yaw より cos(heading) = -sin(yaw), sin(heading) = -cos(yaw)
+        cos_heading = -math.sin(yaw)
+        sin_heading = -math.cos(yaw)
+
+        accel_forward = ay_corrected
+        accel_right = ax_corrected
+
+        accel_north = accel_forward * cos_heading - accel_right * sin_heading
+        accel_east = accel_forward * sin_heading + accel_right * cos_heading
+
+        # 静止検出（ZUPT）: 平方根を取らず2乗同士で比較
+        if ax * ax + ay * ay + az * az < ZUPT_ACCEL_THRESHOLD_SQ:
+            vel_north *= 0.8
+            vel_east *= 0.8
+        elif abs(ax) > MOVE_ACCEL_THRESHOLD or abs(ay) > MOVE_ACCEL_THRESHOLD:
+            vel_north += accel_north * 9.81 * dt
+            vel_east += accel_east * 9.81 * dt
+
+    # 速度の減衰（ドリフト抑制）
+    vel_north *= 0.99
+    vel_east *= 0.99
+
+    # 最大速度制限
+    max_speed = 10.0
+    speed = math.sqrt(vel_north * vel_north + vel_east * vel_east)
+    if speed > max_speed:
+        scale = max_speed / speed
+        vel_north *= scale
+        vel_east *= scale
+
+    # 位置の更新
+    state[STATE_LAT] = lat + vel_north * dt * INV_EARTH_RADIUS * RAD2DEG
+    state[STATE_LON] = lon + vel_east * dt * INV_EARTH_RADIUS * inv_cos_lat * RAD2DEG
+    state[STATE_VN] = vel_north
+    state[STATE_VE] = vel_east
+
+    # 不確実性の増加（予測ステップでは増加）
+    state[STATE_POS_UNC] += 0.1 * dt
+    state[STATE_VEL_UNC] += 0.05 * dt
+
+    return speed
+
+
+@njit(cache=True)
+def _memory_step(state, delta_yaw, decay, dt, inv_cos_lat):
+    """メモリートラックモードの1ステップ（stateをその場で更新し、速度[m/s]を返す）"""
+    # 方位変化をメモリ速度に適用
+    heading = state[STATE_MEM_HEADING] + delta_yaw
+    state[STATE_MEM_HEADING] = heading
+
+    # メモリ速度を減衰（時間経過で信頼度低下）
+    state[STATE_MEM_VN] *= decay
+    state[STATE_MEM_VE] *= decay
+    speed = state[STATE_MEM_SPEED] * decay
+    state[STATE_MEM_SPEED] = speed
+
+    # 方位変化を反映した速度ベクトルで位置を更新
+    state[STATE_LAT] += speed * math.cos(heading) * dt * INV_EARTH_RADIUS * RAD2DEG
+    state[STATE_LON] += speed * math.sin(heading) * dt * INV_EARTH_RADIUS * inv_cos_lat * RAD2DEG
+
+    # 不確実性の増加（予測ステップでは増加）
+    state[STATE_POS_UNC] += 0.1 * dt
+    state[STATE_VEL_UNC] += 0.05 * dt
+
+    return speed
+
+
+@njit(cache=True)
+def _dr_step(lat, lon, vel_north, vel_east, heading, accel, use_accel, dt, inv_cos_lat):
+    """デッドレコニングの1ステップ
+
+    accel: motionモジュールの (x, y, z) をそのまま受け取る
+    returns: (lat, lon, vel_north, vel_east, speed,
+              accel_north, accel_east, delta_lat_deg, delta_lon_deg)
+    """
+    ax, ay, az = accel
+    accel_north = 0.0
+    accel_east = 0.0
+
+    if use_accel:
+        accel_forward = ay
+        accel_right = ax
+
+        cos_heading = math.cos(heading)
+        sin_heading = math.sin(heading)
+
+        accel_north = accel_forward * cos_heading - accel_right * sin_heading
+        accel_east = accel_forward * sin_heading + accel_right * cos_heading
+
+        if abs(ax) > MOVE_ACCEL_THRESHOLD or abs(ay) > MOVE_ACCEL_THRESHOLD:
+            vel_north += accel_north * 9.81 * dt
+            vel_east += accel_east * 9.81 * dt
+
+    decay = 0.995
+    vel_north *= decay
+    vel_east *= decay
+
+    speed = math.sqrt(vel_north * vel_north + vel_east * vel_east)
+
+    delta_lat = vel_north * dt * INV_EARTH_RADIUS * RAD2DEG
+    delta_lon = vel_east * dt * INV_EARTH_RADIUS * inv_cos_lat * RAD2DEG
+
+    return (lat + delta_lat, lon + delta_lon, vel_north, vel_east, speed,
+            accel_north, accel_east, delta_lat, delta_lon)
 
 
 class GPSINSFusion:
-    """GPS/INS融合による位置推定クラス（簡易Kalmanフィルタ + メモリートラック）"""
+    """GPS/INS融合による位置推定クラス（簡易Kalmanフィルタ + メモリートラック）
+
+    位置・速度・不確実性・メモリー速度は単一の状態ベクトル self.state
+    （STATE_* でインデックス）にまとめて保持する。
+    """
 
     EARTH_RADIUS = 6378137.0
+    INV_EARTH_RADIUS = 1.0 / EARTH_RADIUS
 
     # メモリートラック設定
     ACCURACY_THRESHOLD_GOOD = 15.0   # これ以下なら速度を記憶
@@ -549,36 +1032,51 @@ class GPSINSFusion:
     MEMORY_VELOCITY_DECAY = 0.98     # メモリー速度の減衰率（per update）
     MEMORY_MAX_DURATION = 60.0       # メモリートラック最大持続時間（秒）
 
+    TRACK_CAPACITY = 36000  # 軌跡の最大保持点数（10Hzで約1時間分、超えたら古い点から上書き）
+
     def __init__(self):
+        self._track = np.empty((self.TRACK_CAPACITY, 2), dtype=np.float64)
+        # update_insの戻り値（毎回のdict生成を避けて使い回す）
+        self._ins_result = {
+            'lat': 0.0,
+            'lon': 0.0,
+            'speed': 0.0,
+            'heading': 0.0,
+            'mode': 'ins',
+            'memory_elapsed': 0.0
+        }
         self.reset()
 
     def reset(self):
         """状態をリセット"""
-        self.current_lat = None
-        self.current_lon = None
-        self.velocity_north = 0.0
-        self.velocity_east = 0.0
-        self.position_uncertainty = 10.0
-        self.velocity_uncertainty = 1.0
-        self.track = []  # [(lat, lon), ...]
+        self.state = np.zeros(STATE_SIZE, dtype=np.float64)
+        self.state[STATE_POS_UNC] = 10.0
+        self.state[STATE_VEL_UNC] = 1.0
+        self._track_count = 0  # これまでに追加した軌跡点数
         self.is_initialized = False
         self.last_yaw = None
-        self.current_heading = 0.0
 
         # メモリートラック用
-        self.memory_velocity_north = 0.0
-        self.memory_velocity_east = 0.0
-        self.memory_heading = 0.0
-        self.memory_speed = 0.0
         self.is_memory_mode = False
         self.memory_mode_start_time = None
         self.last_good_gps_time = None
 
+    @property
+    def current_lat(self):
+        """現在の推定緯度（未初期化時はNone）"""
+        return float(self.state[STATE_LAT]) if self.is_initialized else None
+
+    @property
+    def current_lon(self):
+        """現在の推定経度（未初期化時はNone）"""
+        return float(self.state[STATE_LON]) if self.is_initialized else None
+
     def initialize(self, lat, lon):
         """初期位置を設定"""
-        self.current_lat = lat
-        self.current_lon = lon
-        self.track = [(lat, lon)]
+        self.state[STATE_LAT] = lat
+        self.state[STATE_LON] = lon
+        self._track_count = 0
+        self._append_track(lat, lon)
         self.is_initialized = True
 
     def update_gps(self, lat, lon, speed, course, accuracy):
@@ -587,16 +1085,17 @@ class GPSINSFusion:
             self.initialize(lat, lon)
             return
 
+        state = self.state
         current_time = time.time()
 
         # GPS精度が良好な場合：速度をメモリに記憶
         if accuracy >= 0 and accuracy < self.ACCURACY_THRESHOLD_GOOD:
             if course >= 0 and speed > 0.3:
-                course_rad = math.radians(course)
-                self.memory_velocity_north = speed * math.cos(course_rad)
-                self.memory_velocity_east = speed * math.sin(course_rad)
-                self.memory_heading = course_rad
-                self.memory_speed = speed
+                course_rad = course * DEG2RAD
+                state[STATE_MEM_VN] = speed * math.cos(course_rad)
+                state[STATE_MEM_VE] = speed * math.sin(course_rad)
+                state[STATE_MEM_SPEED] = speed
+                state[STATE_MEM_HEADING] = course_rad
             self.last_good_gps_time = current_time
 
             # メモリーモード解除
@@ -606,7 +1105,7 @@ class GPSINSFusion:
 
         # GPS精度が悪化した場合：メモリートラックモードへ
         if accuracy < 0 or accuracy >= self.ACCURACY_THRESHOLD_DEGRADE:
-            if not self.is_memory_mode and self.memory_speed > 0.3:
+            if not self.is_memory_mode and state[STATE_MEM_SPEED] > 0.3:
                 self.is_memory_mode = True
                 self.memory_mode_start_time = current_time
             return  # GPS更新をスキップ
@@ -616,32 +1115,38 @@ class GPSINSFusion:
         gps_weight = 1.0 / (1.0 + accuracy / 10.0)
 
         # 位置の補正
-        self.current_lat = (1 - gps_weight) * self.current_lat + gps_weight * lat
-        self.current_lon = (1 - gps_weight) * self.current_lon + gps_weight * lon
+        state[STATE_LAT:STATE_LON + 1] = (
+            (1 - gps_weight) * state[STATE_LAT:STATE_LON + 1]
+            + gps_weight * np.array((lat, lon))
+        )
 
         # 速度の補正（GPSのcourseが有効な場合）
         if course >= 0 and speed > 0.5:
-            course_rad = math.radians(course)
-            gps_vel_north = speed * math.cos(course_rad)
-            gps_vel_east = speed * math.sin(course_rad)
+            course_rad = course * DEG2RAD
+            gps_vel = speed * np.array((math.cos(course_rad), math.sin(course_rad)))
 
             vel_weight = gps_weight * 0.5
-            self.velocity_north = (1 - vel_weight) * self.velocity_north + vel_weight * gps_vel_north
-            self.velocity_east = (1 - vel_weight) * self.velocity_east + vel_weight * gps_vel_east
-            self.current_heading = course_rad
+            state[STATE_VN:STATE_VE + 1] = (
+                (1 - vel_weight) * state[STATE_VN:STATE_VE + 1] + vel_weight * gps_vel
+            )
+            state[STATE_HEADING] = course_rad
 
         # 不確実性の更新
-        self.position_uncertainty = accuracy * 0.5 + self.position_uncertainty * 0.5
-        self.velocity_uncertainty *= 0.9
+        state[STATE_POS_UNC] = accuracy * 0.5 + state[STATE_POS_UNC] * 0.5
+        state[STATE_VEL_UNC] *= 0.9
 
         # 軌跡に追加
-        self.track.append((self.current_lat, self.current_lon))
+        self._append_track(state[STATE_LAT], state[STATE_LON])
 
     def update_ins(self, user_accel, attitude, dt):
-        """INS（センサー）データで状態を予測更新"""
-        if not self.is_initialized or self.current_lat is None:
+        """INS（センサー）データで状態を予測更新
+
+        戻り値のdictは次回呼び出しで上書きされるため、保持する場合はコピーすること
+        """
+        if not self.is_initialized:
             return None
 
+        state = self.state
         current_time = time.time()
         use_memory_track = False
         memory_elapsed = 0.0
@@ -649,147 +1154,90 @@ class GPSINSFusion:
         # メモリートラックモードの判定
         if self.is_memory_mode and self.memory_mode_start_time:
             memory_elapsed = current_time - self.memory_mode_start_time
-            if memory_elapsed < self.MEMORY_MAX_DURATION and self.memory_speed > 0.3:
+            if memory_elapsed < self.MEMORY_MAX_DURATION and state[STATE_MEM_SPEED] > 0.3:
                 use_memory_track = True
 
+        # ヨー角の変化（IEEE 754剰余で[-π, π]に正規化）
+        delta_yaw = 0.0
+        if attitude:
+            yaw = attitude[2]
+            last_yaw = self.last_yaw
+            if last_yaw is not None:
+                delta_yaw = math.remainder(yaw - last_yaw, TWO_PI)
+            self.last_yaw = yaw
+
         if use_memory_track:
             # === メモリートラックモード ===
-            # 記憶した速度で等速直線運動を仮定
-
-            # ジャイロで方位変化のみ検出（旋回対応）
-            if attitude:
-                roll, pitch, yaw = attitude
-                if self.last_yaw is not None:
-                    delta_yaw = yaw - self.last_yaw
-                    if delta_yaw > math.pi:
-                        delta_yaw -= 2 * math.pi
-                    elif delta_yaw < -math.pi:
-                        delta_yaw += 2 * math.pi
-                    # 方位変化をメモリ速度に適用
-                    self.memory_heading += delta_yaw
-                self.last_yaw = yaw
-
-            # メモリ速度を減衰（時間経過で信頼度低下）
-            self.memory_velocity_north *= self.MEMORY_VELOCITY_DECAY
-            self.memory_velocity_east *= self.MEMORY_VELOCITY_DECAY
-            self.memory_speed *= self.MEMORY_VELOCITY_DECAY
-
-            # 方位変化を反映した速度ベクトル
-            vel_north = self.memory_speed * math.cos(self.memory_heading)
-            vel_east = self.memory_speed * math.sin(self.memory_heading)
-
-            # 位置の更新（メモリ速度使用）
-            delta_lat = (vel_north * dt) / self.EARTH_RADIUS
-            delta_lon = (vel_east * dt) / (
-                self.EARTH_RADIUS * math.cos(math.radians(self.current_lat))
-            )
-
-            self.current_lat += math.degrees(delta_lat)
-            self.current_lon += math.degrees(delta_lon)
-
-            speed = self.memory_speed
-
+            # 記憶した速度で等速直線運動を仮定（ジャイロで方位変化のみ反映）
+            speed = _memory_step(state, delta_yaw, self.MEMORY_VELOCITY_DECAY,
+                                 dt, inv_cos_lat(state[STATE_LAT]))
         else:
             # === 通常INSモード ===
-            # ヨー角の変化から方位を更新
-            if attitude:
-                roll, pitch, yaw = attitude
-
-                if self.last_yaw is not None:
-                    delta_yaw = yaw - self.last_yaw
-                    if delta_yaw > math.pi:
-                        delta_yaw -= 2 * math.pi
-                    elif delta_yaw < -math.pi:
-                        delta_yaw += 2 * math.pi
-                    self.current_heading += delta_yaw
-
-                self.last_yaw = yaw
-
-                # ピッチ補正
-                cos_pitch = math.cos(pitch)
-                sin_pitch = math.sin(pitch)
-                cos_roll = math.cos(roll)
-
-            # 加速度から世界座標系への変換
-            if user_accel and attitude:
-                ax, ay, az = user_accel
-
-                # ピッチ・ロール補正
-                ay_corrected = ay * cos_pitch - az * sin_pitch
-                ax_corrected = ax * cos_roll
-
-                # デバイス座標から世界座標へ
-                heading = 3 * math.pi / 2 - yaw
-
-                accel_forward = ay_corrected
-                accel_right = ax_corrected
-
-                accel_north = (accel_forward * math.cos(heading) -
-                              accel_right * math.sin(heading))
-                accel_east = (accel_forward * math.sin(heading) +
-                             accel_right * math.cos(heading))
-
-                # 静止検出（ZUPT）
-                accel_mag = math.sqrt(ax**2 + ay**2 + az**2)
-                is_stationary = accel_mag < 0.08
-
-                if is_stationary:
-                    self.velocity_north *= 0.8
-                    self.velocity_east *= 0.8
-                else:
-                    threshold = 0.05
-                    if abs(ax) > threshold or abs(ay) > threshold:
-                        self.velocity_north += accel_north * 9.81 * dt
-                        self.velocity_east += accel_east * 9.81 * dt
-
-            # 速度の減衰（ドリフト抑制）
-            self.velocity_north *= 0.99
-            self.velocity_east *= 0.99
-
-            # 最大速度制限
-            max_speed = 10.0
-            speed = math.sqrt(self.velocity_north**2 + self.velocity_east**2)
-            if speed > max_speed:
-                scale = max_speed / speed
-                self.velocity_north *= scale
-                self.velocity_east *= scale
-
-            # 位置の更新
-            delta_lat = (self.velocity_north * dt) / self.EARTH_RADIUS
-            delta_lon = (self.velocity_east * dt) / (
-                self.EARTH_RADIUS * math.cos(math.radians(self.current_lat))
-            )
-
-            self.current_lat += math.degrees(delta_lat)
-            self.current_lon += math.degrees(delta_lon)
-
-        # 不確実性の増加（予測ステップでは増加）
-        self.position_uncertainty += 0.1 * dt
-        self.velocity_uncertainty += 0.05 * dt
+            # タプルのまま渡し、展開はカーネル側で行う
+            use_accel = bool(user_accel and attitude)
+            speed = _ins_step(state,
+                              user_accel if use_accel else ZERO_VEC3,
+                              attitude or ZERO_VEC3, use_accel,
+                              delta_yaw, dt, inv_cos_lat(state[STATE_LAT]))
 
         # 軌跡に追加
-        self.track.append((self.current_lat, self.current_lon))
-
-        return {
-            'lat': self.current_lat,
-            'lon': self.current_lon,
-            'speed': speed,
-            'heading': math.degrees(self.current_heading if not use_memory_track else self.memory_heading),
-            'mode': 'memory_track' if use_memory_track else 'ins',
-            'memory_elapsed': memory_elapsed if use_memory_track else 0.0
-        }
+        lat = float(state[STATE_LAT])
+        lon = float(state[STATE_LON])
+        self._append_track(lat, lon)
+
+        heading = state[STATE_MEM_HEADING] if use_memory_track else state[STATE_HEADING]
+        result = self._ins_result
+        result['lat'] = lat
+        result['lon'] = lon
+        result['speed'] = float(speed)
+        result['heading'] = float(heading) * RAD2DEG
+        result['mode'] = 'memory_track' if use_memory_track else 'ins'
+        result['memory_elapsed'] = memory_elapsed if use_memory_track else 0.0
+        return result
+
+    def _append_track(self, lat, lon):
+        """軌跡リングバッファに1点追加"""
+        row = self._track[self._track_count % self.TRACK_CAPACITY]
+        row[0] = lat
+        row[1] = lon
+        self._track_count += 1
 
     def get_track(self):
-        """軌跡を取得"""
-        return self.track
+        """軌跡を取得（古い順の (N, 2) 配列 [[lat, lon], ...]）"""
+        n = self._track_count
+        capacity = self.TRACK_CAPACITY
+        if n <= capacity:
+            return self._track[:n]
+        head = n % capacity
+        return np.concatenate((self._track[head:], self._track[:head]))
 
 
 class DeadReckoning:
     """デッドレコニング（推測航法）クラス"""
 
     EARTH_RADIUS = 6378137.0
+    INV_EARTH_RADIUS = 1.0 / EARTH_RADIUS
 
     def __init__(self):
+        # update_with_sensorsの戻り値（毎回のdict生成を避けて使い回す）
+        self._debug = {
+            'velocity_north': 0.0,
+            'velocity_east': 0.0,
+            'delta_yaw': 0.0,
+            'accel_north': 0.0,
+            'accel_east': 0.0,
+            'delta_lat': 0.0,
+            'delta_lon': 0.0
+        }
+        self._result = {
+            'lat': 0.0,
+            'lon': 0.0,
+            'speed': 0.0,
+            'heading': 0.0,
+            'elapsed': 0.0,
+            # デバッグ用の計算値
+            'debug': self._debug
+        }
         self.reset()
 
     def reset(self):
@@ -822,7 +1270,7 @@ class DeadReckoning:
         self.current_lat = lat
         self.current_lon = lon
 
-        course_rad = math.radians(course)
+        course_rad = course * DEG2RAD
         self.velocity_north = speed * math.cos(course_rad)
         self.velocity_east = speed * math.sin(course_rad)
         self.current_heading = course_rad
@@ -841,77 +1289,100 @@ class DeadReckoning:
         return True
 
     def update_with_sensors(self, user_accel, attitude, dt):
-        """センサーデータで位置を更新"""
+        """センサーデータで位置を更新
+
+        戻り値のdictは次回呼び出しで上書きされるため、保持する場合はコピーすること
+        """
         if not self.is_active or self.current_lat is None:
             return None
 
         delta_yaw = 0.0
+        heading = self.current_heading
 
         if attitude:
-            roll, pitch, yaw = attitude
-
-            if self.last_yaw is not None:
-                delta_yaw = yaw - self.last_yaw
+            yaw = attitude[2]
 
-                if delta_yaw > math.pi:
-                    delta_yaw -= 2 * math.pi
-                elif delta_yaw < -math.pi:
-                    delta_yaw += 2 * math.pi
-
-                self.current_heading += delta_yaw
+            last_yaw = self.last_yaw
+            if last_yaw is not None:
+                # ±πで折り返し（IEEE 754剰余で[-π, π]に正規化）
+                delta_yaw = math.remainder(yaw - last_yaw, TWO_PI)
+                heading += delta_yaw
 
             self.last_yaw = yaw
 
-        accel_north = 0.0
-        accel_east = 0.0
-
-        if user_accel:
-            ax, ay, az = user_accel
-
-            accel_forward = ay
-            accel_right = ax
-
-            accel_north = (accel_forward * math.cos(self.current_heading)
-                          - accel_right * math.sin(self.current_heading))
-            accel_east = (accel_forward * math.sin(self.current_heading)
-                         + accel_right * math.cos(self.current_heading))
-
-            threshold = 0.05
-            if abs(ax) > threshold or abs(ay) > threshold:
-                self.velocity_north += accel_north * 9.81 * dt
-                self.velocity_east += accel_east * 9.81 * dt
-
-        decay = 0.995
-        self.velocity_north *= decay
-        self.velocity_east *= decay
-
-        speed = math.sqrt(self.velocity_north**2 + self.velocity_east**2)
-
-        delta_lat = (self.velocity_north * dt) / self.EARTH_RADIUS
-        delta_lon = (self.velocity_east * dt) / (
-            self.EARTH_RADIUS * math.cos(math.radians(self.current_lat))
+        lat = self.current_lat
+        (lat, lon, vel_north, vel_east, speed,
+         accel_north, accel_east, delta_lat, delta_lon) = _dr_step(
+            lat, self.current_lon,
+            self.velocity_north, self.velocity_east, heading,
+            user_accel or ZERO_VEC3, bool(user_accel), dt, inv_cos_lat(lat)
         )
 
-        self.current_lat += math.degrees(delta_lat)
-        self.current_lon += math.degrees(delta_lon)
-
-        return {
-            'lat': self.current_lat,
-            'lon': self.current_lon,
-            'speed': speed,
-            'heading': math.degrees(self.current_heading),
-            'elapsed': time.time() - self.dr_start_time,
-            # デバッグ用の計算値
-            'debug': {
-                'velocity_north': self.velocity_north,
-                'velocity_east': self.velocity_east,
-                'delta_yaw': delta_yaw,
-                'accel_north': accel_north,
-                'accel_east': accel_east,
-                'delta_lat': math.degrees(delta_lat),
-                'delta_lon': math.degrees(delta_lon)
-            }
-        }
+        # 状態の書き戻しは最後に1回だけ
+        self.current_lat = lat
+        self.current_lon = lon
+        self.velocity_north = vel_north
+        self.velocity_east = vel_east
+        self.current_heading = heading
+
+        result = self._result
+        result['lat'] = lat
+        result['lon'] = lon
+        result['speed'] = speed
+        result['heading'] = heading * RAD2DEG
+        result['elapsed'] = time.time() - self.dr_start_time
+
+        debug = self._debug
+        debug['velocity_north'] = vel_north
+        debug['velocity_east'] = vel_east
+        debug['delta_yaw'] = delta_yaw
+        debug['accel_north'] = accel_north
+        debug['accel_east'] = accel_east
+        debug['delta_lat'] = delta_lat
+        debug['delta_lon'] = delta_lon
+        return result
+
+
+# GPS水平精度[m]の区分（しきい値未満で該当レベル）と (表示名, 表示色, ログ用キー)
+GPS_ACCURACY_THRESHOLDS = (5, 15, 30, 100)
+GPS_ACCURACY_LEVELS = (
+    ('Excellent', '#06d6a0', 'excellent'),
+    ('Good', '#ffd166', 'good'),
+    ('Fair', '#f77f00', 'fair'),
+    ('Poor', '#ef476f', 'poor'),
+    ('Very Poor', '#ef476f', 'very_poor'),
+)
+# 地図上でGPS色として表示する精度レベル（excellent/good/fair）
+GPS_TRACK_SOURCES = ('gps_excellent', 'gps_good', 'gps_fair')
+
+
+def gps_accuracy_level(h_acc):
+    """GPS水平精度をGPS_ACCURACY_LEVELSのインデックスに変換"""
+    return bisect.bisect_right(GPS_ACCURACY_THRESHOLDS, h_acc)
+
+
+class SensorLabel:
+    """センサー値ラベル1つ分の表示状態"""
+
+    __slots__ = ('label', 'format', 'tolerance', 'last_text', 'last_value')
+
+    def __init__(self, label, unit, fmt):
+        self.label = label
+        # 書式文字列は作成時に一度だけ組み立て、更新時はformatを呼ぶだけにする
+        self.format = ('{:' + fmt + '} ' + unit).format
+        # 表示桁の半分未満の変化は表示に現れないので更新を省略する
+        decimals = int(fmt.rsplit('.', 1)[1].rstrip('f'))
+        self.tolerance = 0.5 * 10.0 ** -decimals
+        self.last_text = label.text  # 最後に設定した表示文字列
+        self.last_value = None       # 最後に表示した数値
+
+
+# 地図に送る位置1点分のJS配列リテラル [lat, lon, source, accuracy]
+# （緯度経度は1e-7度 ≒ 1cmで十分なので桁数を固定して文字列を短くする）
+MAP_POSITION_JS = '[%.7f,%.7f,"%s",%.1f]'
+
+# デッドレコニング非動作時のログ値（全レコードで共有する読み取り専用dict）
+DR_INACTIVE_LOG = {'active': False, 'result': None}
 
 
 class SensorView(ui.View):
@@ -922,20 +1393,43 @@ class SensorView(ui.View):
         self.name = 'Sensor Logger'
         self.background_color = '#1a1a2e'
         self.update_interval = 0.1
+        # デバッグ用: 生のlocationデータ全体をログに含めるか
+        self.debug_log_raw_location = False
         self.sensor_labels = {}
         self._prev_attitude = None
         self._map_initialized = False
         self._map_ready = False
         self._start_time = time.time()
         self._last_gps_timestamp = None
+        self._last_gps_update_time = time.time()
         self._gps_timeout = 5.0
 
+        # 地図への位置更新はまとめて送る（WebView呼び出し回数の削減）
+        self.map_flush_interval = 0.2
+        self._pending_positions = []
+        self._last_map_flush_time = 0.0
+
+        # GPS値・記録数の表示は更新頻度の低いデータなので間引いて更新する
+        self.slow_display_interval = 0.5
+        self._last_slow_display_time = 0.0
+        # 1フレーム内のJavaScript呼び出しは連結して1回で実行する
+        self._js_queue = []
+
         self.dead_reckoning = DeadReckoning()
         self._dr_mode = False
 
         # GPS/INS融合
         self.gps_ins_fusion = GPSINSFusion()
 
+        # Fusion/DRの予測更新は専用スレッドで行い、UIは最新の結果を参照する
+        # （減衰係数は1ステップ単位で調整されているため、周期は表示更新と同じ10Hz）
+        self.ins_update_interval = 0.1
+        self._state_lock = threading.Lock()
+        self._latest_fusion = None
+        self._latest_dr = None
+        self._ins_running = False
+        self._ins_thread = None
+
         # 気圧計
         self.barometer = Barometer()
 
@@ -943,6 +1437,9 @@ class SensorView(ui.View):
         self.logger = DataLogger()
         self._logging_enabled = False
 
+        # 毎フレームui.delayに渡すコールバック（バウンドメソッドを毎回生成しない）
+        self._update_callback = self._update_display
+
         self._setup_ui()
         self._start_updates()
 
@@ -978,7 +1475,7 @@ class SensorView(ui.View):
             val.frame = (x_pos + 55, y, w - 60, row_height)
             self.add_subview(val)
 
-            labels[key] = {'value': val, 'unit': unit, 'fmt': fmt}
+            labels[key] = SensorLabel(val, unit, fmt)
             y += row_height
 
         return labels, y + 3
@@ -1082,9 +1579,11 @@ class SensorView(ui.View):
         )
 
         self.gps_status_label = ui.Label()
-        self.gps_status_label.text = '--- (--m)'
+        self._gps_status_text = '--- (--m)'
+        self._gps_status_color = '#8d99ae'
+        self.gps_status_label.text = self._gps_status_text
         self.gps_status_label.font = ('Menlo-Bold', 13)
-        self.gps_status_label.text_color = '#8d99ae'
+        self.gps_status_label.text_color = self._gps_status_color
         self.gps_status_label.alignment = ui.ALIGN_CENTER
         self.gps_status_label.frame = (right_x + 8, y_right, 190, 18)
         self.add_subview(self.gps_status_label)
@@ -1137,9 +1636,15 @@ class SensorView(ui.View):
             set_sleep_disabled(False)
             print('Sleep timer enabled')
 
-            # ログ保存
-            if self.logger.get_record_count() > 0:
+            # ログ保存（書き出しスレッドを停止してファイルを閉じる）
+            try:
                 filepath = self.logger.save()
+            except Exception as e:
+                print(f'Log save failed: {e}')
+                self.log_label.text = 'Save failed'
+                self.log_label.text_color = '#ef476f'
+                filepath = None
+            if filepath:
                 print(f'Log saved: {filepath}')
                 # 保存完了表示
                 self.log_label.text = 'Saved!'
@@ -1148,8 +1653,9 @@ class SensorView(ui.View):
                 self.share_button.enabled = True
                 self.share_button.background_color = '#118ab2'
         else:
-            # 記録開始（新しいロガーを作成）
+            # 記録開始（新しいロガーを作成して書き出しを開始）
             self.logger = DataLogger()
+            self.logger.start()
             self._logging_enabled = True
             self.rec_button.title = '■ STOP'
             self.rec_button.background_color = '#ef476f'
@@ -1160,7 +1666,9 @@ class SensorView(ui.View):
             self.share_button.background_color = '#8d99ae'
 
             # GPS/INS Fusionをリセット
-            self.gps_ins_fusion.reset()
+            with self._state_lock:
+                self.gps_ins_fusion.reset()
+                self._latest_fusion = None
             # 航跡をリセットして記録開始
             self._reset_map_track()
             self._start_map_tracking()
@@ -1173,6 +1681,9 @@ class SensorView(ui.View):
             set_sleep_disabled(True)
             print('Sleep timer disabled (screen will stay on)')
 
+        # 航跡の停止・リセット・開始を1回の呼び出しで地図に送る
+        self._flush_js()
+
     def _share_log(self, sender):
         """ログファイルを共有"""
         if self.logger.share():
@@ -1187,6 +1698,10 @@ class SensorView(ui.View):
         self._last_update_time = time.time()
         self._schedule_update()
 
+        self._ins_running = True
+        self._ins_thread = threading.Thread(target=self._ins_loop, daemon=True)
+        self._ins_thread.start()
+
         # 起動時の初期位置設定（WebViewロード完了を待って実行）
         def set_initial_location():
             if not self._map_initialized:
@@ -1204,50 +1719,99 @@ class SensorView(ui.View):
 
         ui.delay(set_initial_location, 2.5)
 
+    def _ins_loop(self):
+        """Fusion/DRの予測更新ループ（UI更新とは独立したスレッドで実行）"""
+        gps_ins_fusion = self.gps_ins_fusion
+        dead_reckoning = self.dead_reckoning
+        last_time = time.time()
+
+        while self._ins_running:
+            time.sleep(self.ins_update_interval)
+            now = time.time()
+            dt = now - last_time
+            last_time = now
+
+            user_accel = motion.get_user_acceleration()
+            attitude = motion.get_attitude()
+
+            with self._state_lock:
+                # 戻り値のdictは次回呼び出しで上書きされるため、UIにはコピーを渡す
+                if self._logging_enabled and gps_ins_fusion.is_initialized:
+                    result = gps_ins_fusion.update_ins(user_accel, attitude, dt)
+                    self._latest_fusion = dict(result) if result else None
+
+                result = dead_reckoning.update_with_sensors(user_accel, attitude, dt)
+                if result:
+                    snapshot = dict(result)
+                    snapshot['debug'] = dict(result['debug'])
+                    self._latest_dr = snapshot
+
     def _schedule_update(self):
         """定期更新のスケジューリング"""
-        ui.delay(self._update_display, self.update_interval)
+        ui.delay(self._update_callback, self.update_interval)
 
     def _update_value(self, group, key, value):
         """センサー値の表示更新"""
-        if group not in self.sensor_labels:
+        labels = self.sensor_labels.get(group)
+        if labels is None:
+            return
+        item = labels.get(key)
+        if item is None:
             return
-        if key not in self.sensor_labels[group]:
+        last_value = item.last_value
+        if last_value is not None and abs(value - last_value) < item.tolerance:
             return
-        item = self.sensor_labels[group][key]
-        unit = item['unit']
-        fmt = item['fmt']
-        item['value'].text = f'{value:{fmt}} {unit}'
+        item.last_value = value
+        text = item.format(value)
+        # 表示が変わらない場合はUIKitへの書き込みを省略
+        if text != item.last_text:
+            item.label.text = text
+            item.last_text = text
 
     def _update_map_integrated(self, lat, lon, source, accuracy=0):
-        """地図上の統合航跡位置を更新"""
-        js = f'updateIntegratedPosition({lat}, {lon}, "{source}", {accuracy});'
+        """地図上の統合航跡位置を更新（送信は_flush_map_updatesでまとめて行う）"""
+        self._pending_positions.append(MAP_POSITION_JS % (lat, lon, source, accuracy))
+
+    def _flush_map_updates(self):
+        """溜まった位置更新を1回のJavaScript呼び出しで地図に送る"""
+        if not self._pending_positions:
+            return
+        batch = ','.join(self._pending_positions)
+        self._pending_positions = []
+        self._queue_js(f'updatePositionBatch([{batch}]);')
+
+    def _queue_js(self, js):
+        """地図へのJavaScript呼び出しを予約（_flush_jsでまとめて実行）"""
+        self._js_queue.append(js)
+
+    def _flush_js(self):
+        """予約したJavaScriptを1回のevaluate_javascriptで実行"""
+        if not self._js_queue:
+            return
+        js = ''.join(self._js_queue)
+        self._js_queue = []
         self.map_view.evaluate_javascript(js)
 
     def _start_map_tracking(self):
         """地図の航跡記録を開始"""
-        js = 'startTracking();'
-        self.map_view.evaluate_javascript(js)
+        self._queue_js('startTracking();')
 
     def _stop_map_tracking(self):
         """地図の航跡記録を停止"""
-        js = 'stopTracking();'
-        self.map_view.evaluate_javascript(js)
+        self._flush_map_updates()
+        self._queue_js('stopTracking();')
 
     def _reset_map_track(self):
         """地図の航跡をリセット"""
-        js = 'resetTrack();'
-        self.map_view.evaluate_javascript(js)
+        self._pending_positions = []
+        self._queue_js('resetTrack();')
 
     def _update_gps_status(self, h_acc, timestamp=None, is_dr=False, dr_elapsed=0):
         """GPS受信状況を更新"""
         now = time.time()
 
         if is_dr:
-            status = f'DR {dr_elapsed:.0f}s'
-            color = '#FF9500'
-            self.gps_status_label.text = status
-            self.gps_status_label.text_color = color
+            self._set_gps_status_label(f'DR {dr_elapsed:.0f}s', '#FF9500')
             return
 
         if timestamp is not None:
@@ -1255,41 +1819,30 @@ class SensorView(ui.View):
                 self._last_gps_timestamp = timestamp
                 self._last_gps_update_time = now
 
-        if not hasattr(self, '_last_gps_update_time'):
-            self._last_gps_update_time = now
-
         time_since_update = now - self._last_gps_update_time
 
         if timestamp is None or time_since_update > self._gps_timeout:
-            status = 'No Signal'
-            color = '#ef476f'
-            self.gps_status_label.text = status
-            self.gps_status_label.text_color = color
+            self._set_gps_status_label('No Signal', '#ef476f')
             return True
 
         if h_acc < 0:
             status = 'Invalid'
             color = '#ef476f'
-        elif h_acc < 5:
-            status = 'Excellent'
-            color = '#06d6a0'
-        elif h_acc < 15:
-            status = 'Good'
-            color = '#ffd166'
-        elif h_acc < 30:
-            status = 'Fair'
-            color = '#f77f00'
-        elif h_acc < 100:
-            status = 'Poor'
-            color = '#ef476f'
         else:
-            status = 'Very Poor'
-            color = '#ef476f'
+            status, color, _ = GPS_ACCURACY_LEVELS[gps_accuracy_level(h_acc)]
 
-        self.gps_status_label.text = f'{status} ({h_acc:.0f}m)'
-        self.gps_status_label.text_color = color
+        self._set_gps_status_label(f'{status} ({h_acc:.0f}m)', color)
         return False
 
+    def _set_gps_status_label(self, text, color):
+        """GPS状態ラベルを更新（変化がない場合はUIKitへの書き込みを省略）"""
+        if text != self._gps_status_text:
+            self.gps_status_label.text = text
+            self._gps_status_text = text
+        if color != self._gps_status_color:
+            self.gps_status_label.text_color = color
+            self._gps_status_color = color
+
     def _update_display(self):
         """表示の更新"""
         if not self.on_screen:
@@ -1309,13 +1862,22 @@ class SensorView(ui.View):
         # 気圧計データ取得
         barometer_data = self.barometer.get_data()
 
+        # ループ内で繰り返し参照する属性・関数をローカルに束縛
+        update_value = self._update_value
+        slow_display = now - self._last_slow_display_time >= self.slow_display_interval
+        if slow_display:
+            self._last_slow_display_time = now
+        hypot = math.hypot
+        logging_enabled = self._logging_enabled
+        dead_reckoning = self.dead_reckoning
+        gps_ins_fusion = self.gps_ins_fusion
+
         # ログ用データ構造（拡張版）
         log_record = {
             'dt': dt,
             'sensors': {
                 'gravity': None,
                 'user_acceleration': None,
-                'raw_acceleration': None,  # 重力含む生加速度
                 'attitude': None,
                 'magnetic_field': None,
                 'gyro_calculated': None,  # 姿勢差分から計算した角速度
@@ -1326,74 +1888,69 @@ class SensorView(ui.View):
                 'status': None,
                 'no_signal': False
             },
-            'dead_reckoning': {
-                'active': False,
-                'result': None
-            }
+            'dead_reckoning': DR_INACTIVE_LOG
         }
+        sensors_log = log_record['sensors']
+        gps_log = log_record['gps']
 
         # 重力加速度
         if gravity:
-            x, y, z = gravity
-            self._update_value('gravity', 'X', x)
-            self._update_value('gravity', 'Y', y)
-            self._update_value('gravity', 'Z', z)
-            mag = math.sqrt(x**2 + y**2 + z**2)
-            self._update_value('gravity', 'mag', mag)
-
-            log_record['sensors']['gravity'] = {
-                'x': x, 'y': y, 'z': z, 'magnitude': mag
+            gx, gy, gz = gravity
+            update_value('gravity', 'X', gx)
+            update_value('gravity', 'Y', gy)
+            update_value('gravity', 'Z', gz)
+            mag = hypot(gx, gy, gz)
+            update_value('gravity', 'mag', mag)
+
+            sensors_log['gravity'] = {
+                'x': gx, 'y': gy, 'z': gz, 'magnitude': mag
             }
 
         # ユーザー加速度
         if user_accel:
-            x, y, z = user_accel
-            self._update_value('user_accel', 'X', x)
-            self._update_value('user_accel', 'Y', y)
-            self._update_value('user_accel', 'Z', z)
-            mag = math.sqrt(x**2 + y**2 + z**2)
-            self._update_value('user_accel', 'mag', mag)
-
-            log_record['sensors']['user_acceleration'] = {
-                'x': x, 'y': y, 'z': z, 'magnitude': mag
-            }
-
-        # 生加速度（重力 + ユーザー加速度）- センサーフュージョン前処理用
-        if gravity and user_accel:
-            raw_x = gravity[0] + user_accel[0]
-            raw_y = gravity[1] + user_accel[1]
-            raw_z = gravity[2] + user_accel[2]
-            raw_mag = math.sqrt(raw_x**2 + raw_y**2 + raw_z**2)
-            log_record['sensors']['raw_acceleration'] = {
-                'x': raw_x, 'y': raw_y, 'z': raw_z, 'magnitude': raw_mag
+            ux, uy, uz = user_accel
+            update_value('user_accel', 'X', ux)
+            update_value('user_accel', 'Y', uy)
+            update_value('user_accel', 'Z', uz)
+            mag = hypot(ux, uy, uz)
+            update_value('user_accel', 'mag', mag)
+
+            sensors_log['user_acceleration'] = {
+                'x': ux, 'y': uy, 'z': uz, 'magnitude': mag
             }
 
         # 姿勢（オイラー角）
         gyro_data = None
         if attitude:
             roll, pitch, yaw = attitude
-            self._update_value('attitude', 'roll', math.degrees(roll))
-            self._update_value('attitude', 'pitch', math.degrees(pitch))
-            self._update_value('attitude', 'yaw', math.degrees(yaw))
-
-            log_record['sensors']['attitude'] = {
+            roll_deg = roll * RAD2DEG
+            pitch_deg = pitch * RAD2DEG
+            yaw_deg = yaw * RAD2DEG
+            update_value('attitude', 'roll', roll_deg)
+            update_value('attitude', 'pitch', pitch_deg)
+            update_value('attitude', 'yaw', yaw_deg)
+
+            sensors_log['attitude'] = {
                 'roll_rad': roll, 'pitch_rad': pitch, 'yaw_rad': yaw,
-                'roll_deg': math.degrees(roll),
-                'pitch_deg': math.degrees(pitch),
-                'yaw_deg': math.degrees(yaw)
+                'roll_deg': roll_deg,
+                'pitch_deg': pitch_deg,
+                'yaw_deg': yaw_deg
             }
 
             # 角速度の近似計算
-            if self._prev_attitude:
-                gyro_x = (roll - self._prev_attitude[0]) / dt
-                gyro_y = (pitch - self._prev_attitude[1]) / dt
-                gyro_z = (yaw - self._prev_attitude[2]) / dt
-                self._update_value('gyro', 'X', gyro_x)
-                self._update_value('gyro', 'Y', gyro_y)
-                self._update_value('gyro', 'Z', gyro_z)
+            prev_attitude = self._prev_attitude
+            if prev_attitude:
+                prev_roll, prev_pitch, prev_yaw = prev_attitude
+                inv_dt = 1.0 / dt
+                gyro_x = (roll - prev_roll) * inv_dt
+                gyro_y = (pitch - prev_pitch) * inv_dt
+                gyro_z = (yaw - prev_yaw) * inv_dt
+                update_value('gyro', 'X', gyro_x)
+                update_value('gyro', 'Y', gyro_y)
+                update_value('gyro', 'Z', gyro_z)
 
                 gyro_data = {'x': gyro_x, 'y': gyro_y, 'z': gyro_z}
-                log_record['sensors']['gyro_calculated'] = gyro_data
+                sensors_log['gyro_calculated'] = gyro_data
 
             self._prev_attitude = attitude
 
@@ -1401,13 +1958,13 @@ class SensorView(ui.View):
         if magnetic:
             x, y, z = magnetic[:3]
             accuracy = magnetic[3] if len(magnetic) > 3 else -1
-            self._update_value('magnetic', 'X', x)
-            self._update_value('magnetic', 'Y', y)
-            self._update_value('magnetic', 'Z', z)
-            mag = math.sqrt(x**2 + y**2 + z**2)
-            self._update_value('magnetic', 'mag', mag)
+            update_value('magnetic', 'X', x)
+            update_value('magnetic', 'Y', y)
+            update_value('magnetic', 'Z', z)
+            mag = hypot(x, y, z)
+            update_value('magnetic', 'mag', mag)
 
-            log_record['sensors']['magnetic_field'] = {
+            sensors_log['magnetic_field'] = {
                 'x': x, 'y': y, 'z': z,
                 'magnitude': mag, 'accuracy': accuracy
             }
@@ -1436,7 +1993,7 @@ class SensorView(ui.View):
             speed_accuracy = loc.get('speed_accuracy', -1)  # 速度精度
             course_accuracy = loc.get('course_accuracy', -1)  # 進行方向精度
 
-            log_record['gps']['raw'] = {
+            gps_log['raw'] = {
                 'latitude': lat,
                 'longitude': lon,
                 'altitude': alt,
@@ -1455,95 +2012,85 @@ class SensorView(ui.View):
             }
 
             # デバッグ用: 生のlocationデータ全体を保存
-            log_record['gps']['raw_location_dict'] = dict(loc)
+            if self.debug_log_raw_location:
+                gps_log['raw_location_dict'] = dict(loc)
 
             no_signal = self._update_gps_status(h_acc, timestamp)
 
-            if h_acc < 5:
-                gps_status = 'excellent'
-            elif h_acc < 15:
-                gps_status = 'good'
-            elif h_acc < 30:
-                gps_status = 'fair'
-            elif h_acc < 100:
-                gps_status = 'poor'
-            else:
-                gps_status = 'very_poor'
+            acc_level = gps_accuracy_level(h_acc)
+            gps_status = GPS_ACCURACY_LEVELS[acc_level][2]
 
-            log_record['gps']['status'] = gps_status
-            log_record['gps']['no_signal'] = no_signal
+            gps_log['status'] = gps_status
+            gps_log['no_signal'] = no_signal
 
             if not no_signal:
-                self._dr_mode = False
-                self.dead_reckoning.update_gps(lat, lon, speed, course, timestamp)
+                with self._state_lock:
+                    self._dr_mode = False
+                    self._latest_dr = None
+                    dead_reckoning.update_gps(lat, lon, speed, course, timestamp)
+
+                    # GPS/INS Fusion: GPS更新（ログ記録中のみ）
+                    if logging_enabled:
+                        gps_ins_fusion.update_gps(lat, lon, speed, course, h_acc)
 
                 # 初回GPS取得時に地図を現在位置に移動
                 # WebViewのロード完了を待つ（起動から2秒後）
                 elapsed = time.time() - self._start_time
                 if not self._map_initialized and elapsed > 2.0:
-                    js = f'setInitialPosition({lat}, {lon});'
-                    self.map_view.evaluate_javascript(js)
+                    self._queue_js(f'setInitialPosition({lat}, {lon});')
                     self._map_initialized = True
 
-                # GPS/INS Fusion: GPS更新（ログ記録中のみ）
-                if self._logging_enabled:
-                    self.gps_ins_fusion.update_gps(lat, lon, speed, course, h_acc)
-
-                self._update_value('gps', 'lat', lat)
-                self._update_value('gps', 'lon', lon)
-                self._update_value('gps', 'alt', alt)
-                self._update_value('gps', 'speed', speed)
-
-                self.sensor_labels['gps']['lat']['value'].text_color = '#edf2f4'
-                self.sensor_labels['gps']['lon']['value'].text_color = '#edf2f4'
-                self.sensor_labels['gps']['speed']['value'].text_color = '#edf2f4'
+                if slow_display:
+                    update_value('gps', 'lat', lat)
+                    update_value('gps', 'lon', lon)
+                    update_value('gps', 'alt', alt)
+                    update_value('gps', 'speed', speed)
         else:
             no_signal = True
             self._update_gps_status(-1, None)
-            log_record['gps']['no_signal'] = True
-            log_record['gps']['status'] = 'no_signal'
+            gps_log['no_signal'] = True
+            gps_log['status'] = 'no_signal'
 
         # デッドレコニングモード（ログ用に継続）
-        if no_signal and self.dead_reckoning.last_gps_lat is not None:
+        if no_signal and dead_reckoning.last_gps_lat is not None:
             if not self._dr_mode:
-                self._dr_mode = True
-                self.dead_reckoning.start_dead_reckoning()
-
-            dr_result = self.dead_reckoning.update_with_sensors(
-                user_accel, attitude, dt
-            )
+                with self._state_lock:
+                    self._dr_mode = True
+                    dead_reckoning.start_dead_reckoning()
 
+            # 位置の積算は_ins_loopが行う（ここでは最新結果を参照するだけ）
+            dr_result = self._latest_dr
             if dr_result:
-                log_record['dead_reckoning']['active'] = True
-                log_record['dead_reckoning']['result'] = {
-                    'latitude': dr_result['lat'],
-                    'longitude': dr_result['lon'],
-                    'speed': dr_result['speed'],
-                    'heading_deg': dr_result['heading'],
-                    'elapsed_sec': dr_result['elapsed'],
-                    'last_gps_lat': self.dead_reckoning.last_gps_lat,
-                    'last_gps_lon': self.dead_reckoning.last_gps_lon,
-                    'debug': dr_result.get('debug', {})
+                log_record['dead_reckoning'] = {
+                    'active': True,
+                    'result': {
+                        'latitude': dr_result['lat'],
+                        'longitude': dr_result['lon'],
+                        'speed': dr_result['speed'],
+                        'heading_deg': dr_result['heading'],
+                        'elapsed_sec': dr_result['elapsed'],
+                        'last_gps_lat': dead_reckoning.last_gps_lat,
+                        'last_gps_lon': dead_reckoning.last_gps_lon,
+                        'debug': dr_result['debug']
+                    }
                 }
 
-        # GPS/INS Fusion: INS更新（ログ記録中のみ）
-        fusion_result = None
-        if self._logging_enabled and self.gps_ins_fusion.is_initialized:
-            fusion_result = self.gps_ins_fusion.update_ins(user_accel, attitude, dt)
-            if fusion_result:
-                # ログにFusion結果を追加
-                log_record['gps_ins_fusion'] = {
-                    'latitude': fusion_result['lat'],
-                    'longitude': fusion_result['lon'],
-                    'speed': fusion_result['speed'],
-                    'heading': fusion_result['heading'],
-                    'mode': fusion_result.get('mode', 'ins'),
-                    'memory_elapsed': fusion_result.get('memory_elapsed', 0.0)
-                }
+        # GPS/INS Fusion: _ins_loopが更新した最新結果（ログ記録中のみ）
+        fusion_result = self._latest_fusion if logging_enabled else None
+        if fusion_result:
+            # ログにFusion結果を追加
+            log_record['gps_ins_fusion'] = {
+                'latitude': fusion_result['lat'],
+                'longitude': fusion_result['lon'],
+                'speed': fusion_result['speed'],
+                'heading': fusion_result['heading'],
+                'mode': fusion_result.get('mode', 'ins'),
+                'memory_elapsed': fusion_result.get('memory_elapsed', 0.0)
+            }
 
         # === 統合航跡の表示（ログ記録中のみ） ===
         # 常にFusion位置を使用（連続性確保）、色はGPS精度/モードで決定
-        if self._logging_enabled:
+        if logging_enabled:
             display_lat, display_lon, track_source, display_acc = None, None, None, 0
 
             if fusion_result:
@@ -1555,12 +2102,8 @@ class SensorView(ui.View):
                 # 色の決定: GPS精度が良ければGPS色、そうでなければFusion/Memory/INS色
                 if not no_signal and loc:
                     display_acc = h_acc
-                    if h_acc < 5:
-                        track_source = 'gps_excellent'
-                    elif h_acc < 15:
-                        track_source = 'gps_good'
-                    elif h_acc < 30:
-                        track_source = 'gps_fair'
+                    if acc_level < len(GPS_TRACK_SOURCES):
+                        track_source = GPS_TRACK_SOURCES[acc_level]
                     else:
                         # GPS精度が悪い場合はFusionモードで色分け
                         track_source = 'memory' if fusion_mode == 'memory_track' else 'fusion'
@@ -1572,12 +2115,8 @@ class SensorView(ui.View):
                 # Fusionがない場合はGPSを使用（後方互換性）
                 display_lat, display_lon = lat, lon
                 display_acc = h_acc
-                if h_acc < 5:
-                    track_source = 'gps_excellent'
-                elif h_acc < 15:
-                    track_source = 'gps_good'
-                elif h_acc < 30:
-                    track_source = 'gps_fair'
+                if acc_level < len(GPS_TRACK_SOURCES):
+                    track_source = GPS_TRACK_SOURCES[acc_level]
                 else:
                     track_source = 'gps_poor'
 
@@ -1593,17 +2132,25 @@ class SensorView(ui.View):
                     'accuracy': display_acc
                 }
 
+            # 地図への送信は一定間隔ごとにまとめて行う
+            if now - self._last_map_flush_time >= self.map_flush_interval:
+                self._flush_map_updates()
+                self._last_map_flush_time = now
+
         # ログ記録
-        if self._logging_enabled:
+        if logging_enabled:
             self.logger.add_record(log_record)
-            count = self.logger.get_record_count()
-            self.log_label.text = f'{count} rec'
-            self.log_label.text_color = '#ef476f'
+            if slow_display:
+                self.log_label.text = f'{self.logger.get_record_count()} rec'
+
+        # このフレームで溜まった地図操作をまとめて実行
+        self._flush_js()
 
         self._schedule_update()
 
     def will_close(self):
         """ビューが閉じられる際の処理"""
+        self._ins_running = False
         motion.stop_updates()
         location.stop_updates()
 
@@ -1614,9 +2161,14 @@ class SensorView(ui.View):
         set_sleep_disabled(False)
 
         # 記録中なら保存
-        if self._logging_enabled and self.logger.get_record_count() > 0:
-            filepath = self.logger.save()
-            print(f'Log saved: {filepath}')
+        if self._logging_enabled:
+            try:
+                filepath = self.logger.save()
+            except Exception as e:
+                print(f'Log save failed: {e}')
+                filepath = None
+            if filepath:
+                print(f'Log saved: {filepath}')
 
 
 def main():
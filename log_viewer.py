@@ -6,34 +6,122 @@ PySide6 + PyQtGraph + 国土地理院地図 によるセンサーログの可視
 """
 
 import sys
+import io
 import json
+import gzip
 import math
+import base64
+import threading
 import numpy as np
 import urllib.request
 from pathlib import Path
+from datetime import datetime
 from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QSplitter, QTabWidget, QFileDialog, QPushButton, QLabel,
     QGroupBox, QStatusBar, QComboBox, QTreeView, QHeaderView, QFileSystemModel
 )
-from PySide6.QtCore import Qt, QUrl, QDir
+from PySide6.QtCore import Qt, QUrl, QDir, QObject, QThread, QTimer, Signal
 from PySide6.QtGui import QAction, QShortcut, QKeySequence
-from PySide6.QtWebEngineWidgets import QWebEngineView
-from PySide6.QtWebChannel import QWebChannel
 
 import pyqtgraph as pg
 
-# PyQtGraph設定
-pg.setConfigOptions(antialias=True)
-
-
-# 国土地理院地図HTML
-MAP_HTML = '''
-<!DOCTYPE html>
-<html>
-<head>
+# 標高タイル（PNG）のデコード用（未インストール時は地形断面を表示しない）
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# 高速JSONエンコーダ/デコーダ（未インストール時は標準jsonにフォールバック）
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# JITコンパイラ（未インストール時はPython実装にフォールバック）
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """numba未導入時は関数をそのまま返す"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# OpenGL描画（PyOpenGL未インストール時はQPainterで描画）
+try:
+    import OpenGL  # noqa: F401
+    OPENGL_AVAILABLE = True
+except ImportError:
+    OPENGL_AVAILABLE = False
+
+# PyQtGraph設定（長い時系列の曲線はOpenGLで描画する）
+pg.setConfigOptions(antialias=True, useOpenGL=OPENGL_AVAILABLE,
+                    enableExperimental=OPENGL_AVAILABLE)
+
+# ログファイルの拡張子
+LOG_FILE_PATTERNS = ['*.ndjson.gz', '*.json']
+LOG_FILE_SUFFIXES = ('.ndjson.gz', '.json')
+
+# 地図WebViewのHTTPディスクキャッシュ（Leaflet・地図タイル）
+WEB_CACHE_DIR = Path.home() / '.cache' / 'sensor-log-viewer' / 'web'
+
+# setHtmlのベースURL（固定のオリジンにしてキャッシュを起動間で共有する）
+MAP_BASE_URL = 'https://unpkg.com/'
+
+# GPS精度レベル（MAP_HTMLのaccuracyColorsのキーと対応）
+GPS_ACCURACY_THRESHOLDS = (5, 15, 30, 100)  # [m]
+GPS_ACCURACY_LEVELS = ('excellent', 'good', 'fair', 'poor', 'very_poor')
+
+# 地図に渡す軌跡の間引き解像度（このズームレベルの1ピクセル未満の移動を間引く）
+# タイルレイヤーの最大ズームに合わせ、拡大しても角が欠けないようにする
+MAP_DECIMATION_ZOOM = 20
+
+# 地図JSをまとめて実行する間隔 [ms]（この間に同じ用途のJSが続いた場合は最新のものだけ実行する）
+MAP_JS_COALESCE_MS = 50
+
+# センサーデータの構造化配列（1レコード1行、列はビューとして取り出す）
+SENSOR_RECORD_DTYPE = np.dtype([
+    ('timestamp', 'f8'), ('t', 'f8'),  # UNIX秒、先頭レコードからの経過時間 [s]
+    ('gravity_x', 'f8'), ('gravity_y', 'f8'), ('gravity_z', 'f8'),
+    ('has_accel', '?'), ('accel_x', 'f8'), ('accel_y', 'f8'), ('accel_z', 'f8'),
+    ('has_attitude', '?'),
+    ('roll', 'f8'), ('pitch', 'f8'), ('yaw', 'f8'),                  # [deg]
+    ('roll_rad', 'f8'), ('pitch_rad', 'f8'), ('yaw_rad', 'f8'),      # [rad]
+    ('gyro_x', 'f8'), ('gyro_y', 'f8'), ('gyro_z', 'f8'),
+    ('mag_x', 'f8'), ('mag_y', 'f8'), ('mag_z', 'f8'),
+])
+GPS_RECORD_DTYPE = np.dtype([
+    ('lat', 'f8'), ('lon', 'f8'), ('alt', 'f8'),
+    ('speed', 'f8'), ('accuracy', 'f8'), ('t', 'f8'),
+])
+DR_RECORD_DTYPE = np.dtype([
+    ('lat', 'f8'), ('lon', 'f8'), ('speed', 'f8'), ('heading', 'f8'), ('t', 'f8'),
+])
+# 統合航跡・標高断面図の点（位置のあるレコードのみ、欠損値はNaN）
+TRACK_POINT_DTYPE = np.dtype([
+    ('lat', 'f8'), ('lon', 'f8'), ('timestamp', 'f8'),
+    ('has_fusion', '?'), ('memory_mode', '?'), ('gps_valid', '?'),
+    ('accuracy', 'f8'), ('gps_alt', 'f8'), ('gps_v_acc', 'f8'),  # GPS有効時のみ
+    ('baro', 'f8'),     # 気圧計相対高度 [m]
+    ('accel_z', 'f8'),
+])
+
+# 統合航跡の色分けタイプ（先頭3つはGPS_ACCURACY_THRESHOLDSの段階と対応）
+INTEGRATED_TRACK_TYPES = ('gps_excellent', 'gps_good', 'gps_fair', 'gps_poor',
+                          'memory', 'fused', 'ins')
+
+
+# 地図HTML共通のヘッダー（Leaflet読み込み・基本スタイル。<style>は各HTML側で閉じる）
+_MAP_HEAD = '''\
     <meta charset="utf-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css"/>
@@ -42,7 +130,60 @@ MAP_HTML = '''
         body { margin: 0; padding: 0; }
         #map { width: 100%; height: 100vh; }
         .leaflet-control-attribution { font-size: 10px; }
-        .info-box {
+'''
+
+# 地図HTML共通の初期化JS（地図生成・タイルレイヤー切り替え）
+_MAP_INIT_JS = '''\
+        var map = L.map('map').setView([35.6812, 139.7671], 15);
+
+        // タイルレイヤー定義
+        var tileLayers = {
+            gsi: L.tileLayer('https://cyberjapandata.gsi.go.jp/xyz/pale/{z}/{x}/{y}.png', {
+                attribution: '<a href="https://maps.gsi.go.jp/development/ichiran.html">国土地理院</a>',
+                maxZoom: 18
+            }),
+            gsi_std: L.tileLayer('https://cyberjapandata.gsi.go.jp/xyz/std/{z}/{x}/{y}.png', {
+                attribution: '<a href="https://maps.gsi.go.jp/development/ichiran.html">国土地理院</a>',
+                maxZoom: 18
+            }),
+            gsi_photo: L.tileLayer('https://cyberjapandata.gsi.go.jp/xyz/seamlessphoto/{z}/{x}/{y}.jpg', {
+                attribution: '<a href="https://maps.gsi.go.jp/development/ichiran.html">国土地理院</a>',
+                maxZoom: 18
+            }),
+            osm: L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
+                attribution: '&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a>',
+                maxZoom: 19
+            }),
+            google_map: L.tileLayer('https://mt1.google.com/vt/lyrs=m&x={x}&y={y}&z={z}', {
+                attribution: '&copy; Google Maps',
+                maxZoom: 20
+            }),
+            google_satellite: L.tileLayer('https://mt1.google.com/vt/lyrs=s&x={x}&y={y}&z={z}', {
+                attribution: '&copy; Google Maps',
+                maxZoom: 20
+            }),
+            google_hybrid: L.tileLayer('https://mt1.google.com/vt/lyrs=y&x={x}&y={y}&z={z}', {
+                attribution: '&copy; Google Maps',
+                maxZoom: 20
+            })
+        };
+
+        var currentTileLayer = tileLayers.google_map;
+        currentTileLayer.addTo(map);
+
+        function setMapType(mapType) {
+            map.removeLayer(currentTileLayer);
+            currentTileLayer = tileLayers[mapType] || tileLayers.google_map;
+            currentTileLayer.addTo(map);
+        }
+'''
+
+# 国土地理院地図HTML
+MAP_HTML = '''
+<!DOCTYPE html>
+<html>
+<head>
+''' + _MAP_HEAD + '''        .info-box {
             background: rgba(255,255,255,0.9);
             padding: 8px 12px;
             border-radius: 4px;
@@ -91,50 +232,9 @@ MAP_HTML = '''
 <body>
     <div id="map"></div>
     <script>
-        var map = L.map('map').setView([35.6812, 139.7671], 15);
-
-        // タイルレイヤー定義
-        var tileLayers = {
-            gsi: L.tileLayer('https://cyberjapandata.gsi.go.jp/xyz/pale/{z}/{x}/{y}.png', {
-                attribution: '<a href="https://maps.gsi.go.jp/development/ichiran.html">国土地理院</a>',
-                maxZoom: 18
-            }),
-            gsi_std: L.tileLayer('https://cyberjapandata.gsi.go.jp/xyz/std/{z}/{x}/{y}.png', {
-                attribution: '<a href="https://maps.gsi.go.jp/development/ichiran.html">国土地理院</a>',
-                maxZoom: 18
-            }),
-            gsi_photo: L.tileLayer('https://cyberjapandata.gsi.go.jp/xyz/seamlessphoto/{z}/{x}/{y}.jpg', {
-                attribution: '<a href="https://maps.gsi.go.jp/development/ichiran.html">国土地理院</a>',
-                maxZoom: 18
-            }),
-            osm: L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
-                attribution: '&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a>',
-                maxZoom: 19
-            }),
-            google_map: L.tileLayer('https://mt1.google.com/vt/lyrs=m&x={x}&y={y}&z={z}', {
-                attribution: '&copy; Google Maps',
-                maxZoom: 20
-            }),
-            google_satellite: L.tileLayer('https://mt1.google.com/vt/lyrs=s&x={x}&y={y}&z={z}', {
-                attribution: '&copy; Google Maps',
-                maxZoom: 20
-            }),
-            google_hybrid: L.tileLayer('https://mt1.google.com/vt/lyrs=y&x={x}&y={y}&z={z}', {
-                attribution: '&copy; Google Maps',
-                maxZoom: 20
-            })
-        };
-
-        var currentTileLayer = tileLayers.google_map;
-        currentTileLayer.addTo(map);
-
-        function setMapType(mapType) {
-            map.removeLayer(currentTileLayer);
-            currentTileLayer = tileLayers[mapType] || tileLayers.google_map;
-            currentTileLayer.addTo(map);
-        }
-
-        var gpsLayers = [];
+''' + _MAP_INIT_JS + '''
+        // 地図レイヤーは再描画のたびに作り直さず、座標だけを差し替えて使い回す
+        var gpsLayersByLevel = {};
         var drTrack = null;
         var insTrack = null;
         var startMarker = null;
@@ -142,6 +242,7 @@ MAP_HTML = '''
         var insEndMarker = null;
         var currentMarker = null;
         var legendControl = null;
+        var currentDatasetId = null;
 
         // GPS精度による色分け
         var accuracyColors = {
@@ -152,25 +253,40 @@ MAP_HTML = '''
             very_poor: '#ef476f'   // 赤 (>= 100m)
         };
 
+        // 凡例のHTMLは読み込み時に一度だけパースし、表示のたびに複製する
+        var legendTemplate = document.createElement('template');
+        legendTemplate.innerHTML = '<strong>Track Types</strong><br>' +
+            '<div class="legend-item"><div class="legend-color" style="background:#06d6a0"></div>GPS Excellent (&lt;5m)</div>' +
+            '<div class="legend-item"><div class="legend-color" style="background:#118ab2"></div>GPS Good (&lt;15m)</div>' +
+            '<div class="legend-item"><div class="legend-color" style="background:#ffd166"></div>GPS Fair (&lt;30m)</div>' +
+            '<div class="legend-item"><div class="legend-color" style="background:#f77f00"></div>GPS Poor (&lt;100m)</div>' +
+            '<div class="legend-item"><div class="legend-color" style="background:#ef476f"></div>GPS Very Poor</div>' +
+            '<div class="legend-item"><div class="legend-color dotted"></div>GPS/INS Fusion</div>' +
+            '<div class="legend-item"><div class="legend-color dashed"></div>DR (GPS Lost)</div>';
+
         // DR軌跡の色（紫/マゼンタ系）
         var drColor = '#9D4EDD';
 
         // INS軌跡の色（シアン系）
         var insColor = '#00CED1';
 
+        // 精度レベル（しきい値 5, 15, 30, 100m を超えた数がインデックス）
+        var accuracyLevels = ['excellent', 'good', 'fair', 'poor', 'very_poor'];
+
+        function getAccuracyLevel(accuracy) {
+            // 分岐なしで段階を数える（!(a < t) なのでNaNは最低ランク）
+            return accuracyLevels[!(accuracy < 5) + !(accuracy < 15) + !(accuracy < 30) + !(accuracy < 100)];
+        }
+
         function getAccuracyColor(accuracy) {
-            if (accuracy < 5) return accuracyColors.excellent;
-            if (accuracy < 15) return accuracyColors.good;
-            if (accuracy < 30) return accuracyColors.fair;
-            if (accuracy < 100) return accuracyColors.poor;
-            return accuracyColors.very_poor;
+            return accuracyColors[getAccuracyLevel(accuracy)];
         }
 
         function clearMap() {
-            gpsLayers.forEach(function(layer) {
-                map.removeLayer(layer);
-            });
-            gpsLayers = [];
+            for (var level in gpsLayersByLevel) {
+                map.removeLayer(gpsLayersByLevel[level]);
+            }
+            gpsLayersByLevel = {};
             if (drTrack) map.removeLayer(drTrack);
             if (insTrack) map.removeLayer(insTrack);
             if (startMarker) map.removeLayer(startMarker);
@@ -185,141 +301,199 @@ MAP_HTML = '''
             insEndMarker = null;
             currentMarker = null;
             legendControl = null;
+            currentDatasetId = null;
         }
 
-        function setGPSTrackWithAccuracy(gpsData, drCoords, insCoords) {
-            clearMap();
-
-            if (gpsData.length === 0) return;
+        // ポリラインの座標を差し替え（未作成なら作成、座標が空なら削除）
+        function updatePolyline(layer, coords, options) {
+            if (!coords || coords.length === 0) {
+                if (layer) map.removeLayer(layer);
+                return null;
+            }
+            if (layer) {
+                layer.setLatLngs(coords);
+                return layer;
+            }
+            return L.polyline(coords, options).addTo(map);
+        }
 
-            var allCoords = [];
+        // 丸マーカーの位置を差し替え（未作成なら作成）
+        function updateCircleMarker(marker, coord, options, popup) {
+            if (marker) {
+                marker.setLatLng(coord);
+                return marker;
+            }
+            return L.circleMarker(coord, options).addTo(map).bindPopup(popup);
+        }
 
-            // GPS軌跡を精度ごとにセグメント分けして描画
-            var currentColor = null;
-            var currentSegment = [];
+        // GPS軌跡を描画
+        // segmentsByLevel: {精度レベル: [[[lat, lon], ...], ...]}（レベルごとに1本のマルチポリライン）
+        // datasetId: 表示範囲のフィットはデータセットが変わった時のみ行う
+        function drawGPSTrack(segmentsByLevel, startCoord, endCoord, drCoords, insCoords, datasetId) {
+            if (!startCoord) {
+                clearMap();
+                return;
+            }
 
-            for (var i = 0; i < gpsData.length; i++) {
-                var point = gpsData[i];
-                var coord = [point.lat, point.lon];
-                var color = getAccuracyColor(point.accuracy);
-                allCoords.push(coord);
-
-                if (currentColor === null) {
-                    currentColor = color;
-                    currentSegment.push(coord);
-                } else if (color === currentColor) {
-                    currentSegment.push(coord);
-                } else {
-                    // 色が変わった: 現在のセグメントを描画
-                    if (currentSegment.length >= 2) {
-                        var line = L.polyline(currentSegment, {
-                            color: currentColor,
-                            weight: 6,
-                            opacity: 0.9,
-                            lineCap: 'round',
-                            lineJoin: 'round'
-                        }).addTo(map);
-                        gpsLayers.push(line);
-                    }
-                    // 新しいセグメント開始（前のポイントを含める）
-                    currentSegment = [currentSegment[currentSegment.length - 1], coord];
-                    currentColor = color;
-                }
+            if (currentMarker) {
+                map.removeLayer(currentMarker);
+                currentMarker = null;
             }
 
-            // 最後のセグメントを描画
-            if (currentSegment.length >= 2) {
-                var line = L.polyline(currentSegment, {
-                    color: currentColor,
+            // GPS軌跡（精度レベルごとに1レイヤー）
+            for (var level in accuracyColors) {
+                gpsLayersByLevel[level] = updatePolyline(gpsLayersByLevel[level], segmentsByLevel[level], {
+                    color: accuracyColors[level],
                     weight: 6,
                     opacity: 0.9,
                     lineCap: 'round',
                     lineJoin: 'round'
-                }).addTo(map);
-                gpsLayers.push(line);
+                });
+                if (!gpsLayersByLevel[level]) delete gpsLayersByLevel[level];
             }
 
             // 開始点（白枠付き緑）
-            if (allCoords.length > 0) {
-                startMarker = L.circleMarker(allCoords[0], {
-                    radius: 10,
-                    fillColor: '#06d6a0',
-                    color: '#fff',
-                    weight: 3,
-                    fillOpacity: 1
-                }).addTo(map).bindPopup('Start');
+            startMarker = updateCircleMarker(startMarker, startCoord, {
+                radius: 10,
+                fillColor: '#06d6a0',
+                color: '#fff',
+                weight: 3,
+                fillOpacity: 1
+            }, 'Start');
 
-                // 終了点（白枠付き赤）
-                endMarker = L.circleMarker(allCoords[allCoords.length - 1], {
-                    radius: 10,
-                    fillColor: '#ef476f',
-                    color: '#fff',
-                    weight: 3,
-                    fillOpacity: 1
-                }).addTo(map).bindPopup('GPS End');
-            }
+            // 終了点（白枠付き赤）
+            endMarker = updateCircleMarker(endMarker, endCoord, {
+                radius: 10,
+                fillColor: '#ef476f',
+                color: '#fff',
+                weight: 3,
+                fillOpacity: 1
+            }, 'GPS End');
 
             // INS軌跡（シアン、点線、太め）- センサーのみで計算
-            if (insCoords && insCoords.length > 0) {
-                insTrack = L.polyline(insCoords, {
-                    color: insColor,
-                    weight: 4,
-                    opacity: 0.8,
-                    dashArray: '4, 4',
-                    lineCap: 'round',
-                    lineJoin: 'round'
-                }).addTo(map);
+            insTrack = updatePolyline(insTrack, insCoords, {
+                color: insColor,
+                weight: 4,
+                opacity: 0.8,
+                dashArray: '4, 4',
+                lineCap: 'round',
+                lineJoin: 'round'
+            });
 
-                // INS終了点マーカー
-                insEndMarker = L.circleMarker(insCoords[insCoords.length - 1], {
+            // INS終了点マーカー
+            if (insTrack) {
+                insEndMarker = updateCircleMarker(insEndMarker, insCoords[insCoords.length - 1], {
                     radius: 8,
                     fillColor: insColor,
                     color: '#fff',
                     weight: 2,
                     fillOpacity: 1
-                }).addTo(map).bindPopup('INS End');
-
-                insCoords.forEach(function(c) {
-                    allCoords.push(c);
-                });
+                }, 'INS End');
+            } else if (insEndMarker) {
+                map.removeLayer(insEndMarker);
+                insEndMarker = null;
             }
 
             // DR軌跡（紫、破線、太め）- GPS途絶時のみ
-            if (drCoords && drCoords.length > 0) {
-                drTrack = L.polyline(drCoords, {
-                    color: drColor,
-                    weight: 5,
-                    opacity: 0.9,
-                    dashArray: '12, 6',
-                    lineCap: 'round',
-                    lineJoin: 'round'
-                }).addTo(map);
+            drTrack = updatePolyline(drTrack, drCoords, {
+                color: drColor,
+                weight: 5,
+                opacity: 0.9,
+                dashArray: '12, 6',
+                lineCap: 'round',
+                lineJoin: 'round'
+            });
 
-                drCoords.forEach(function(c) {
-                    allCoords.push(c);
-                });
+            // 凡例を追加（初回のみ）
+            if (!legendControl) {
+                legendControl = L.control({position: 'bottomright'});
+                legendControl.onAdd = function(map) {
+                    var div = L.DomUtil.create('div', 'legend');
+                    div.appendChild(legendTemplate.content.cloneNode(true));
+                    return div;
+                };
+                legendControl.addTo(map);
             }
 
-            // 凡例を追加
-            legendControl = L.control({position: 'bottomright'});
-            legendControl.onAdd = function(map) {
-                var div = L.DomUtil.create('div', 'legend');
-                div.innerHTML = '<strong>Track Types</strong><br>' +
-                    '<div class="legend-item"><div class="legend-color" style="background:#06d6a0"></div>GPS Excellent (&lt;5m)</div>' +
-                    '<div class="legend-item"><div class="legend-color" style="background:#118ab2"></div>GPS Good (&lt;15m)</div>' +
-                    '<div class="legend-item"><div class="legend-color" style="background:#ffd166"></div>GPS Fair (&lt;30m)</div>' +
-                    '<div class="legend-item"><div class="legend-color" style="background:#f77f00"></div>GPS Poor (&lt;100m)</div>' +
-                    '<div class="legend-item"><div class="legend-color" style="background:#ef476f"></div>GPS Very Poor</div>' +
-                    '<div class="legend-item"><div class="legend-color dotted"></div>GPS/INS Fusion</div>' +
-                    '<div class="legend-item"><div class="legend-color dashed"></div>DR (GPS Lost)</div>';
-                return div;
-            };
-            legendControl.addTo(map);
+            // 全体が見えるようにフィット（データセットが変わった時のみ）
+            if (datasetId === undefined || datasetId !== currentDatasetId) {
+                var bounds = L.latLngBounds([startCoord, endCoord]);
+                for (var key in gpsLayersByLevel) {
+                    bounds.extend(gpsLayersByLevel[key].getBounds());
+                }
+                if (insTrack) bounds.extend(insTrack.getBounds());
+                if (drTrack) bounds.extend(drTrack.getBounds());
+                map.fitBounds(bounds, {padding: [30, 30]});
+            }
+            currentDatasetId = datasetId;
+        }
 
-            // 全体が見えるようにフィット
-            if (allCoords.length > 0) {
-                map.fitBounds(L.latLngBounds(allCoords), {padding: [30, 30]});
+        // base64化された little-endian float64 の (lat, lon) 列を [[lat, lon], ...] に復元
+        function decodeCoords(b64) {
+            var bin = atob(b64);
+            var bytes = new Uint8Array(bin.length);
+            for (var i = 0; i < bin.length; i++) {
+                bytes[i] = bin.charCodeAt(i);
+            }
+            var values = new Float64Array(bytes.buffer);
+            var coords = new Array(values.length / 2);
+            for (var j = 0; j < coords.length; j++) {
+                coords[j] = [values[2 * j], values[2 * j + 1]];
             }
+            return coords;
+        }
+
+        // バイナリ座標版: segments は [[精度レベル, 開始index, 終了index], ...]
+        function drawGPSTrackBinary(gpsB64, segments, drB64, insB64, datasetId) {
+            var gpsCoords = decodeCoords(gpsB64);
+            if (gpsCoords.length === 0) {
+                clearMap();
+                return;
+            }
+
+            var segmentsByLevel = {};
+            segments.forEach(function(seg) {
+                var level = seg[0];
+                (segmentsByLevel[level] = segmentsByLevel[level] || []).push(gpsCoords.slice(seg[1], seg[2]));
+            });
+
+            drawGPSTrack(segmentsByLevel, gpsCoords[0], gpsCoords[gpsCoords.length - 1],
+                         decodeCoords(drB64), decodeCoords(insB64), datasetId);
+        }
+
+        function setGPSTrackWithAccuracy(gpsData, drCoords, insCoords) {
+            if (gpsData.length === 0) {
+                clearMap();
+                return;
+            }
+
+            // 精度レベルが変わる位置で区切る（新しい区間は前のポイントから始める）
+            var segmentsByLevel = {};
+            var currentLevel = null;
+            var currentSegment = [];
+
+            for (var i = 0; i < gpsData.length; i++) {
+                var point = gpsData[i];
+                var coord = [point.lat, point.lon];
+                var level = getAccuracyLevel(point.accuracy);
+
+                if (level !== currentLevel && currentSegment.length > 0) {
+                    if (currentSegment.length >= 2) {
+                        (segmentsByLevel[currentLevel] = segmentsByLevel[currentLevel] || []).push(currentSegment);
+                    }
+                    currentSegment = [currentSegment[currentSegment.length - 1]];
+                }
+                currentLevel = level;
+                currentSegment.push(coord);
+            }
+            if (currentSegment.length >= 2) {
+                (segmentsByLevel[currentLevel] = segmentsByLevel[currentLevel] || []).push(currentSegment);
+            }
+
+            var first = gpsData[0];
+            var last = gpsData[gpsData.length - 1];
+            drawGPSTrack(segmentsByLevel, [first.lat, first.lon], [last.lat, last.lon],
+                         drCoords, insCoords);
         }
 
         // 後方互換性のため古い関数も残す
@@ -357,14 +531,7 @@ INTEGRATED_MAP_HTML = '''
 <!DOCTYPE html>
 <html>
 <head>
-    <meta charset="utf-8">
-    <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css"/>
-    <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
-    <style>
-        body { margin: 0; padding: 0; }
-        #map { width: 100%; height: 100vh; }
-        .leaflet-control-attribution { font-size: 10px; }
-        .legend {
+''' + _MAP_HEAD + '''        .legend {
             background: rgba(255,255,255,0.95);
             padding: 12px;
             border-radius: 5px;
@@ -409,49 +576,7 @@ INTEGRATED_MAP_HTML = '''
 <body>
     <div id="map"></div>
     <script>
-        var map = L.map('map').setView([35.6812, 139.7671], 15);
-
-        // タイルレイヤー定義
-        var tileLayers = {
-            gsi: L.tileLayer('https://cyberjapandata.gsi.go.jp/xyz/pale/{z}/{x}/{y}.png', {
-                attribution: '<a href="https://maps.gsi.go.jp/development/ichiran.html">国土地理院</a>',
-                maxZoom: 18
-            }),
-            gsi_std: L.tileLayer('https://cyberjapandata.gsi.go.jp/xyz/std/{z}/{x}/{y}.png', {
-                attribution: '<a href="https://maps.gsi.go.jp/development/ichiran.html">国土地理院</a>',
-                maxZoom: 18
-            }),
-            gsi_photo: L.tileLayer('https://cyberjapandata.gsi.go.jp/xyz/seamlessphoto/{z}/{x}/{y}.jpg', {
-                attribution: '<a href="https://maps.gsi.go.jp/development/ichiran.html">国土地理院</a>',
-                maxZoom: 18
-            }),
-            osm: L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
-                attribution: '&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a>',
-                maxZoom: 19
-            }),
-            google_map: L.tileLayer('https://mt1.google.com/vt/lyrs=m&x={x}&y={y}&z={z}', {
-                attribution: '&copy; Google Maps',
-                maxZoom: 20
-            }),
-            google_satellite: L.tileLayer('https://mt1.google.com/vt/lyrs=s&x={x}&y={y}&z={z}', {
-                attribution: '&copy; Google Maps',
-                maxZoom: 20
-            }),
-            google_hybrid: L.tileLayer('https://mt1.google.com/vt/lyrs=y&x={x}&y={y}&z={z}', {
-                attribution: '&copy; Google Maps',
-                maxZoom: 20
-            })
-        };
-
-        var currentTileLayer = tileLayers.google_map;
-        currentTileLayer.addTo(map);
-
-        function setMapType(mapType) {
-            map.removeLayer(currentTileLayer);
-            currentTileLayer = tileLayers[mapType] || tileLayers.google_map;
-            currentTileLayer.addTo(map);
-        }
-
+''' + _MAP_INIT_JS + '''
         // 航跡タイプ別の色
         var trackColors = {
             gps_excellent: '#06d6a0',  // GPS精度良好: 緑
@@ -535,17 +660,47 @@ INTEGRATED_MAP_HTML = '''
             }
         }
 
+        // segments は [{coords: [[lat, lon], ...], type: 航跡タイプ}, ...]
+        function addTrackSegmentsBatch(segments) {
+            segments.forEach(function(seg) {
+                addTrackSegment(seg.coords, seg.type);
+            });
+        }
+
+        // 統合航跡を1回の呼び出しで描き直す
+        // payload: {segments, start: [lat, lon], end: [lat, lon], bounds: [[南, 西], [北, 東]], stats}
+        function applyIntegratedTrack(payload) {
+            clearTracks();
+            addTrackSegmentsBatch(payload.segments);
+            setMarkers(payload.start[0], payload.start[1], payload.end[0], payload.end[1]);
+            fitBounds(payload.bounds);
+            addLegend(payload.stats);
+            addStats(payload.stats);
+        }
+
+        // 凡例・統計ボックスのHTMLは読み込み時に一度だけパースし、表示のたびに複製する
+        var legendTemplate = document.createElement('template');
+        legendTemplate.innerHTML = '<div class="legend-title">統合航跡 凡例</div>' +
+            '<div class="legend-item"><div class="legend-color" style="background:' + trackColors.gps_excellent + '"></div>GPS (精度 &lt;5m)</div>' +
+            '<div class="legend-item"><div class="legend-color" style="background:' + trackColors.gps_good + '"></div>GPS (精度 &lt;15m)</div>' +
+            '<div class="legend-item"><div class="legend-color" style="background:' + trackColors.gps_fair + '"></div>GPS (精度 &lt;30m)</div>' +
+            '<div class="legend-item"><div class="legend-color" style="background:' + trackColors.fused + ';background:repeating-linear-gradient(90deg,' + trackColors.fused + ',' + trackColors.fused + ' 3px,transparent 3px,transparent 6px)"></div>GPS/INS Fusion</div>' +
+            '<div class="legend-item"><div class="legend-color" style="background:repeating-linear-gradient(90deg,' + trackColors.memory + ',' + trackColors.memory + ' 8px,transparent 8px,transparent 12px)"></div>Memory Track</div>' +
+            '<div class="legend-item"><div class="legend-color" style="background:repeating-linear-gradient(90deg,' + trackColors.ins + ',' + trackColors.ins + ' 4px,transparent 4px,transparent 8px)"></div>INS Only</div>';
+
+        var statsTemplate = document.createElement('template');
+        statsTemplate.innerHTML = '<div class="stats-title">航跡統計</div>' +
+            '<div>総距離: <span data-stat="total_distance"></span> m</div>' +
+            '<div>GPS区間: <span data-stat="gps_ratio"></span>%</div>' +
+            '<div>Fusion区間: <span data-stat="fusion_ratio"></span>%</div>' +
+            '<div>Memory区間: <span data-stat="memory_ratio"></span>%</div>' +
+            '<div>平均精度: <span data-stat="avg_accuracy"></span> m</div>';
+
         function addLegend(stats) {
             legendControl = L.control({ position: 'topright' });
             legendControl.onAdd = function(map) {
                 var div = L.DomUtil.create('div', 'legend');
-                div.innerHTML = '<div class="legend-title">統合航跡 凡例</div>' +
-                    '<div class="legend-item"><div class="legend-color" style="background:' + trackColors.gps_excellent + '"></div>GPS (精度 &lt;5m)</div>' +
-                    '<div class="legend-item"><div class="legend-color" style="background:' + trackColors.gps_good + '"></div>GPS (精度 &lt;15m)</div>' +
-                    '<div class="legend-item"><div class="legend-color" style="background:' + trackColors.gps_fair + '"></div>GPS (精度 &lt;30m)</div>' +
-                    '<div class="legend-item"><div class="legend-color" style="background:' + trackColors.fused + ';background:repeating-linear-gradient(90deg,' + trackColors.fused + ',' + trackColors.fused + ' 3px,transparent 3px,transparent 6px)"></div>GPS/INS Fusion</div>' +
-                    '<div class="legend-item"><div class="legend-color" style="background:repeating-linear-gradient(90deg,' + trackColors.memory + ',' + trackColors.memory + ' 8px,transparent 8px,transparent 12px)"></div>Memory Track</div>' +
-                    '<div class="legend-item"><div class="legend-color" style="background:repeating-linear-gradient(90deg,' + trackColors.ins + ',' + trackColors.ins + ' 4px,transparent 4px,transparent 8px)"></div>INS Only</div>';
+                div.appendChild(legendTemplate.content.cloneNode(true));
                 return div;
             };
             legendControl.addTo(map);
@@ -555,12 +710,10 @@ INTEGRATED_MAP_HTML = '''
             statsControl = L.control({ position: 'bottomright' });
             statsControl.onAdd = function(map) {
                 var div = L.DomUtil.create('div', 'stats-box');
-                div.innerHTML = '<div class="stats-title">航跡統計</div>' +
-                    '<div>総距離: ' + stats.total_distance.toFixed(1) + ' m</div>' +
-                    '<div>GPS区間: ' + stats.gps_ratio.toFixed(1) + '%</div>' +
-                    '<div>Fusion区間: ' + stats.fusion_ratio.toFixed(1) + '%</div>' +
-                    '<div>Memory区間: ' + stats.memory_ratio.toFixed(1) + '%</div>' +
-                    '<div>平均精度: ' + stats.avg_accuracy.toFixed(1) + ' m</div>';
+                div.appendChild(statsTemplate.content.cloneNode(true));
+                div.querySelectorAll('[data-stat]').forEach(function(span) {
+                    span.textContent = stats[span.dataset.stat].toFixed(1);
+                });
                 return div;
             };
             statsControl.addTo(map);
@@ -604,6 +757,131 @@ INTEGRATED_MAP_HTML = '''
 '''
 
 
+@lru_cache(maxsize=None)
+def _import_webengine():
+    """
+    QtWebEngineを読み込む（読み込みが重いため、最初の地図ビュー作成時まで遅らせる）
+
+    returns: (QWebEngineView, QWebEnginePage, QWebEngineProfile)
+    QApplication作成後の読み込みになるため、main()でAA_ShareOpenGLContextsを設定しておく。
+    """
+    from PySide6.QtWebEngineWidgets import QWebEngineView
+    from PySide6.QtWebEngineCore import QWebEngineProfile, QWebEnginePage
+    return QWebEngineView, QWebEnginePage, QWebEngineProfile
+
+
+def json_dumps(obj):
+    """地図JSに埋め込むJSON文字列を生成（NumPy配列・スカラーもそのまま渡せる）"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+    return json.dumps(obj, default=_json_default)
+
+
+def json_loads(data):
+    """JSON（bytes / str）をパース
+
+    orjsonはNaN/Infinityを受け付けないため、標準jsonで書かれたログは標準jsonで再パースする。
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def _json_default(obj):
+    """標準jsonでNumPyの値を変換"""
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def decimate_track(lat, lon, zoom=MAP_DECIMATION_ZOOM, keep=None):
+    """
+    地図表示用に残す点のインデックスを返す
+
+    Web Mercator上で zoom の1ピクセルに相当する固定セルに投影し、同じセルに連続する点は
+    先頭と末尾だけを残す（最大まで拡大してもセル内の折り返しは区別できないため）。
+    セルは軌跡の範囲によらないので、長い軌跡でも拡大時の形状は変わらない。
+    座標がNaNの点はセルが決まらないため、前後の点とともに残す。
+    keep: 必ず残す点のブール配列（色の切り替わり位置など）
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    n = len(lat)
+    if n <= 2:
+        return np.arange(n)
+
+    # 世界全体を1とした座標で、zoomの1ピクセル（256 * 2^zoom 分割）単位のセル番号
+    scale = 256.0 * 2.0 ** zoom
+    ix = np.floor(lon * (scale / 360.0))
+    iy = np.floor(np.log(np.tan(np.pi / 4 + np.radians(lat) / 2)) * (scale / (2 * np.pi)))
+    # NaNを含む差分は != 0 が真になるため、NaNの前後は必ず「変化あり」になる
+    changed = (np.diff(ix) != 0) | (np.diff(iy) != 0)
+
+    # セルが変わる直前（区間の末尾）と直後（区間の先頭）を残す
+    mask = np.ones(n, dtype=bool)
+    mask[1:-1] = changed[:-1] | changed[1:]
+    if keep is not None:
+        mask |= keep
+    return np.flatnonzero(mask)
+
+
+def encode_coords(lat, lon):
+    """座標列をlittle-endian float64の (lat, lon) ペア列としてbase64化（JSのdecodeCoordsで復元）"""
+    coords = np.column_stack((lat, lon)).astype('<f8')
+    return base64.b64encode(coords.tobytes()).decode('ascii')
+
+
+def load_sensor_log(file_path):
+    """
+    センサーログを読み込む
+
+    対応形式:
+    - *.ndjson.gz: gzip圧縮NDJSON（1行目メタデータ、以降1行1レコード）
+    - *.json: 旧形式（metadata / record_count / records を持つ単一JSON）
+
+    各レコードが経過時間 t_ns（セッション開始からのナノ秒）のみを持つ場合は、
+    メタデータの session_start_unix を基準に 'timestamp'（UNIX秒）を補う。
+
+    returns: {'metadata': ..., 'record_count': ..., 'records': [...]}
+    """
+    log_data = _read_sensor_log(file_path)
+
+    records = log_data.get('records', [])
+    if records and 'timestamp' not in records[0] and 't_ns' in records[0]:
+        origin = log_data.get('metadata', {}).get('session_start_unix', 0.0)
+        for rec in records:
+            rec['timestamp'] = origin + rec.get('t_ns', 0) * 1e-9
+
+    return log_data
+
+
+def _read_sensor_log(file_path):
+    """ログファイルを形式に応じてパース"""
+    if str(file_path).endswith('.ndjson.gz'):
+        metadata = {}
+        records = []
+        with gzip.open(file_path, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                obj = json_loads(line)
+                if obj.get('type') == 'metadata':
+                    metadata = obj.get('metadata', {})
+                else:
+                    records.append(obj)
+        return {
+            'metadata': metadata,
+            'record_count': len(records),
+            'records': records
+        }
+
+    with open(file_path, 'rb') as f:
+        return json_loads(f.read())
+
+
 class GSIElevationAPI:
     """国土地理院標高タイルAPIクラス"""
 
@@ -614,9 +892,14 @@ class GSIElevationAPI:
         'https://cyberjapandata.gsi.go.jp/xyz/dem_png/{z}/{x}/{y}.png',    # 10mメッシュ
     ]
 
+    # タイル取得の同時接続数（通信待ちが支配的なのでスレッドで並列化）
+    FETCH_WORKERS = 8
+
+    # 取得したタイル（PNG）のディスクキャッシュ（次回起動以降は再ダウンロードしない）
+    TILE_CACHE_DIR = Path.home() / '.cache' / 'sensor-log-viewer' / 'dem'
+
     def __init__(self, zoom=15):
         self.zoom = zoom
-        self._cache = {}
 
     def _lat_lon_to_tile(self, lat, lon, zoom):
         """緯度経度をタイル座標に変換"""
@@ -638,21 +921,49 @@ class GSIElevationAPI:
         py = int((y_tile - int(y_tile)) * 256)
         return px, py
 
-    @lru_cache(maxsize=100)
+    @lru_cache(maxsize=256)
     def _fetch_tile(self, x, y, zoom):
-        """タイルを取得してキャッシュ"""
+        """タイルを取得してキャッシュ（デコード済み1枚約192KB、インスタンスを使い回すと読み込み間で共有される）"""
+        if not PIL_AVAILABLE:
+            return None
+        img_data = self._load_tile_data(x, y, zoom)
+        if img_data is None:
+            return None
+        try:
+            img = Image.open(io.BytesIO(img_data))
+            # 標高はRGBのみで表現されるため、3チャンネルのuint8配列に揃える
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+            return np.asarray(img, dtype=np.uint8)
+        except Exception:
+            return None
+
+    def _load_tile_data(self, x, y, zoom):
+        """タイルのPNGデータを取得（ディスクキャッシュ優先）"""
+        cache_path = self.TILE_CACHE_DIR / str(zoom) / str(x) / f'{y}.png'
+        try:
+            return cache_path.read_bytes()
+        except OSError:
+            pass
+
         for base_url in self.DEM_URLS:
             url = base_url.format(z=zoom, x=x, y=y)
             try:
                 req = urllib.request.Request(url, headers={'User-Agent': 'SensorLogViewer/1.0'})
                 with urllib.request.urlopen(req, timeout=5) as response:
-                    from PIL import Image
-                    import io
                     img_data = response.read()
-                    img = Image.open(io.BytesIO(img_data))
-                    return np.array(img)
             except Exception:
                 continue
+
+            # 書き込み途中のファイルを読まないよう、一時ファイル経由で置き換える
+            try:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = cache_path.with_name(f'{cache_path.name}.{threading.get_ident()}.tmp')
+                tmp_path.write_bytes(img_data)
+                tmp_path.replace(cache_path)
+            except OSError:
+                pass
+            return img_data
         return None
 
     def get_elevation(self, lat, lon):
@@ -661,89 +972,177 @@ class GSIElevationAPI:
         px, py = self._lat_lon_to_pixel(lat, lon, self.zoom)
 
         tile = self._fetch_tile(x, y, self.zoom)
-        if tile is None:
+        if tile is None or tile.ndim < 3:
             return None
 
-        try:
-            # PNGタイルから標高を計算
-            # 国土地理院PNG標高タイル仕様:
-            # x = 2^16 * R + 2^8 * G + B
-            # x < 2^23: h = x * 0.01
-            # x >= 2^23: h = (x - 2^24) * 0.01
-            if len(tile.shape) >= 3:
-                r = int(tile[py, px, 0])
-                g = int(tile[py, px, 1])
-                b = int(tile[py, px, 2])
-
-                # 無効値チェック（128, 0, 0は海など）
-                if r == 128 and g == 0 and b == 0:
-                    return None
-
-                # 標高計算
-                x = r * 65536 + g * 256 + b
-                if x >= 8388608:  # 2^23 (負の値)
-                    x = x - 16777216  # 2^24
-                h = x * 0.01
-
-                return h
-        except Exception:
-            pass
-
-        return None
+        h = self._decode_elevation(tile, np.array([py]), np.array([px]))[0]
+        if np.isnan(h):
+            return None
+        return float(h)
 
     def get_elevation_profile(self, coords, sample_interval=10):
         """
         経路に沿った標高プロファイルを取得
 
-        coords: [(lat, lon), ...] 座標リスト
+        coords: [(lat, lon), ...] 座標リスト、または (N, 2) 配列
         sample_interval: サンプリング間隔（インデックス）
 
         returns: [(distance, elevation), ...] 距離と標高のリスト
         """
-        profile = []
-        total_distance = 0.0
-        prev_lat, prev_lon = None, None
-
-        for i, (lat, lon) in enumerate(coords):
-            if i % sample_interval != 0 and i != len(coords) - 1:
-                # 距離は累積
-                if prev_lat is not None:
-                    dist = self._haversine(prev_lat, prev_lon, lat, lon)
-                    total_distance += dist
-                prev_lat, prev_lon = lat, lon
-                continue
+        n = len(coords)
+        if n == 0:
+            return []
 
-            # 距離計算
-            if prev_lat is not None:
-                dist = self._haversine(prev_lat, prev_lon, lat, lon)
-                total_distance += dist
+        coords_arr = np.asarray(coords, dtype=np.float64)
+        lat = coords_arr[:, 0]
+        lon = coords_arr[:, 1]
 
-            # 標高取得
-            elev = self.get_elevation(lat, lon)
-            if elev is not None:
-                profile.append((total_distance, elev))
+        # 累積距離を一括計算
+        cum_dist = self._haversine_vec(lat, lon)
 
-            prev_lat, prev_lon = lat, lon
+        # サンプリング位置（終点は必ず含める）
+        indices = np.arange(0, n, sample_interval)
+        if indices[-1] != n - 1:
+            indices = np.append(indices, n - 1)
 
-        return profile
+        # サンプル点をタイルごとにまとめ、各タイルは1回だけ取得してまとめて標高を読む
+        tile_x, tile_y, px, py = self._lat_lon_to_tile_pixel_vec(
+            lat[indices], lon[indices], self.zoom
+        )
+        groups = {}
+        for k, key in enumerate(zip(tile_x.tolist(), tile_y.tolist())):
+            groups.setdefault(key, []).append(k)
+
+        elevations = np.full(len(indices), np.nan)
+        workers = min(self.FETCH_WORKERS, len(groups))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self._fetch_tile, x, y, self.zoom): members
+                for (x, y), members in groups.items()
+            }
+            for future in as_completed(futures):
+                tile = future.result()
+                if tile is None or tile.ndim < 3:
+                    continue
+                members = np.asarray(futures[future])
+                elevations[members] = self._decode_elevation(tile, py[members], px[members])
+
+        valid = ~np.isnan(elevations)
+        return list(zip(cum_dist[indices][valid].tolist(), elevations[valid].tolist()))
+
+    def _lat_lon_to_tile_pixel_vec(self, lat, lon, zoom):
+        """緯度経度の配列をタイル座標とタイル内ピクセル座標の配列に変換"""
+        n = 2 ** zoom
+        x_tile = (lon + 180.0) / 360.0 * n
+        # asinh(tan(φ)) = ln(tan(π/4 + φ/2))（配列演算ではこちらが約2倍速い）
+        y_tile = (1.0 - np.log(np.tan(np.pi / 4 + np.radians(lat) / 2)) / np.pi) / 2.0 * n
+
+        tile_x = x_tile.astype(np.int64)
+        tile_y = y_tile.astype(np.int64)
+        px = ((x_tile - tile_x) * 256).astype(np.int64)
+        py = ((y_tile - tile_y) * 256).astype(np.int64)
+        return tile_x, tile_y, px, py
+
+    @staticmethod
+    def _decode_elevation(tile, py, px):
+        """PNG標高タイルの指定ピクセル群を標高[m]に変換（無効値はNaN）
+
+        国土地理院PNG標高タイル仕様:
+        x = 2^16 * R + 2^8 * G + B
+        x < 2^23: h = x * 0.01
+        x >= 2^23: h = (x - 2^24) * 0.01
+        """
+        rgb = tile[py, px, :3].astype(np.int32)
+        r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+
+        x = (r << 16) | (g << 8) | b
+        x = np.where(x >= 8388608, x - 16777216, x)  # 2^23以上は負の値
+        h = x * 0.01
+
+        # 無効値（128, 0, 0は海など）
+        h[(r == 128) & (g == 0) & (b == 0)] = np.nan
+        return h
+
+    @staticmethod
+    def _haversine_vec(lat, lon):
+        """座標列の始点からの累積距離をHaversine公式で計算（メートル）"""
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        seg = haversine_vec(lat[:-1], lon[:-1], lat[1:], lon[1:])
+        return np.concatenate(([0.0], np.cumsum(seg)))
+
+
+@njit(cache=True)
+def _altitude_fusion_batch(state, gps_alt, gps_v_acc, baro_relative, accel_z, dt,
+                           gravity, velocity_decay, reference_weight):
+    """
+    AltitudeFusion.update を系列全体に適用する（欠損値はNaN）
+
+    state: [初期化済み(0/1), GPS基準高度, 気圧計基準値, 融合高度, 垂直速度]（その場で更新）
+    returns: 各サンプルの融合高度（未初期化の間はNaN）
+    """
+    n = len(gps_alt)
+    fused = np.empty(n)
+    initialized = state[0] != 0
+    gps_reference = state[1]
+    baro_reference = state[2]
+    fused_altitude = state[3]
+    vertical_velocity = state[4]
+
+    for i in range(n):
+        alt = gps_alt[i]
+        baro = baro_relative[i]
+        has_gps = alt == alt
+        has_baro = baro == baro
+
+        if not initialized:
+            # GPS高度で初期化
+            if has_gps and alt != 0:
+                initialized = True
+                gps_reference = alt
+                baro_reference = baro if has_baro else 0.0
+                fused_altitude = alt
+                fused[i] = alt
+            else:
+                fused[i] = np.nan
+            continue
+
+        # 気圧計による高度変化（主センサー）
+        if has_baro:
+            fused_altitude = gps_reference + (baro - baro_reference)
+        elif has_gps and alt != 0:
+            # 気圧計がない場合はGPS高度で更新
+            fused_altitude = alt
 
-    def _haversine(self, lat1, lon1, lat2, lon2):
-        """2点間の距離を計算（メートル）"""
-        R = 6378137.0
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        dlat = math.radians(lat2 - lat1)
-        dlon = math.radians(lon2 - lon1)
+        # 加速度Z軸による補助（急激な変化の検出）
+        az = accel_z[i]
+        if az == az and dt[i] > 0:
+            vertical_velocity = (vertical_velocity + az * gravity * dt[i]) * velocity_decay
+
+        # GPS精度が良い時は基準を補正
+        v_acc = gps_v_acc[i]
+        if has_gps and 0 < v_acc < 15:
+            gps_reference = (1 - reference_weight) * gps_reference + reference_weight * alt
+            if has_baro:
+                baro_reference = baro
 
-        a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+        fused[i] = fused_altitude
 
-        return R * c
+    state[0] = 1.0 if initialized else 0.0
+    state[1] = gps_reference
+    state[2] = baro_reference
+    state[3] = fused_altitude
+    state[4] = vertical_velocity
+    return fused
 
 
 class AltitudeFusion:
     """高度融合クラス（GPS + 気圧計 + 加速度Z軸）"""
 
+    GRAVITY = 9.81                  # 重力加速度 [m/s^2]
+    VERTICAL_VELOCITY_DECAY = 0.95  # 垂直速度の減衰率（per update）
+    GPS_REFERENCE_WEIGHT = 0.3      # GPS精度良好時の基準高度補正の重み
+
     def __init__(self):
         self.gps_altitude = None      # GPS基準高度
         self.baro_reference = None    # 気圧計基準値
@@ -756,6 +1155,8 @@ class AltitudeFusion:
         self.baro_reference = None
         self.fused_altitude = None
         self.vertical_velocity = 0.0
+        # 初期化前の更新処理に戻す
+        self.__dict__.pop('update', None)
 
     def update(self, gps_alt, gps_v_acc, baro_relative, accel_z, dt):
         """
@@ -768,21 +1169,28 @@ class AltitudeFusion:
         dt: 時間間隔 (s)
 
         returns: 融合高度 (m)
+
+        初期化（最初の有効なGPS高度）が済むと、以降の呼び出しは
+        初期化判定を持たない_update_steadyに直接切り替わる。
         """
         # GPS高度で初期化
-        if self.gps_altitude is None:
-            if gps_alt is not None and gps_alt != 0:
-                self.gps_altitude = gps_alt
-                self.baro_reference = baro_relative if baro_relative is not None else 0
-                self.fused_altitude = gps_alt
-                return self.fused_altitude
-            return None
+        if gps_alt is not None and gps_alt != 0:
+            self.gps_altitude = gps_alt
+            self.baro_reference = baro_relative if baro_relative is not None else 0
+            self.fused_altitude = gps_alt
+            self.update = self._update_steady
+            return self.fused_altitude
+        return None
+
+    def _update_steady(self, gps_alt, gps_v_acc, baro_relative, accel_z, dt):
+        """初期化後の高度更新（引数・戻り値はupdateと同じ）"""
+        has_baro = baro_relative is not None
+        has_gps = gps_alt is not None
 
         # 気圧計による高度変化（主センサー）
-        if baro_relative is not None and self.baro_reference is not None:
-            delta_baro = baro_relative - self.baro_reference
-            self.fused_altitude = self.gps_altitude + delta_baro
-        elif gps_alt is not None and gps_alt != 0:
+        if has_baro:
+            self.fused_altitude = self.gps_altitude + (baro_relative - self.baro_reference)
+        elif has_gps and gps_alt != 0:
             # 気圧計がない場合はGPS高度で更新
             self.fused_altitude = gps_alt
 
@@ -790,115 +1198,469 @@ class AltitudeFusion:
         if accel_z is not None and dt > 0:
             # 垂直加速度から速度を推定（簡易的）
             # 重力を除いた加速度なので、直接使用可能
-            self.vertical_velocity += accel_z * 9.81 * dt
-            self.vertical_velocity *= 0.95  # 減衰
+            self.vertical_velocity = (
+                (self.vertical_velocity + accel_z * self.GRAVITY * dt)
+                * self.VERTICAL_VELOCITY_DECAY
+            )
 
         # GPS精度が良い時は基準を補正
-        if gps_alt is not None and gps_v_acc is not None and gps_v_acc > 0 and gps_v_acc < 15:
-            weight = 0.3  # GPS高度の重みを上げる
+        if has_gps and gps_v_acc is not None and 0 < gps_v_acc < 15:
+            weight = self.GPS_REFERENCE_WEIGHT
             self.gps_altitude = (1 - weight) * self.gps_altitude + weight * gps_alt
-            if baro_relative is not None:
+            if has_baro:
                 self.baro_reference = baro_relative
 
         return self.fused_altitude
 
+    def update_batch(self, gps_alt, gps_v_acc, baro_relative, accel_z, dt):
+        """
+        系列全体をまとめて更新（updateを順に呼ぶのと同じ結果）
+
+        各引数はupdateと同じ量の配列で、欠損値はNaNで表す。
+        returns: 融合高度の配列（未初期化の間はNaN）
+        """
+        initialized = self.fused_altitude is not None
+        state = np.array([
+            1.0 if initialized else 0.0,
+            self.gps_altitude if initialized else 0.0,
+            self.baro_reference if initialized else 0.0,
+            self.fused_altitude if initialized else 0.0,
+            self.vertical_velocity,
+        ])
+        fused = _altitude_fusion_batch(
+            state,
+            np.asarray(gps_alt, dtype=np.float64),
+            np.asarray(gps_v_acc, dtype=np.float64),
+            np.asarray(baro_relative, dtype=np.float64),
+            np.asarray(accel_z, dtype=np.float64),
+            np.asarray(dt, dtype=np.float64),
+            self.GRAVITY, self.VERTICAL_VELOCITY_DECAY, self.GPS_REFERENCE_WEIGHT,
+        )
+
+        self.vertical_velocity = float(state[4])
+        if state[0]:
+            self.gps_altitude = float(state[1])
+            self.baro_reference = float(state[2])
+            self.fused_altitude = float(state[3])
+            self.update = self._update_steady
+        return fused
+
     def get_vertical_velocity(self):
         """垂直速度を取得 (m/s)"""
         return self.vertical_velocity
 
 
+# GPS/INS融合の状態ベクトルのインデックス（時刻の未設定はNaN）
+(STATE_LAT, STATE_LON,                          # 位置 [deg]
+ STATE_VN, STATE_VE,                            # 速度（北、東）[m/s]
+ STATE_POS_UNC, STATE_VEL_UNC,                  # 不確実性 [m], [m/s]
+ STATE_MEM_VN, STATE_MEM_VE, STATE_MEM_SPEED,   # 記憶時のメモリー速度（減衰前）[m/s]
+ STATE_MEM_HEADING,                             # メモリー方位 [rad]
+ STATE_MEM_MODE, STATE_MEM_START,               # メモリーモード（0/1）と開始時刻
+ STATE_LAST_GPS_LAT, STATE_LAST_GPS_LON,        # 最後に採用したGPS位置 [deg]
+ STATE_LAST_GPS_TIME, STATE_LAST_GOOD_GPS_TIME,
+ STATE_MEM_DECAY_STEPS,                         # 記憶後のメモリー速度の減衰回数
+ STATE_COS_LAT_REF, STATE_COS_LAT) = range(19)  # cos(緯度)のキャッシュ（基準緯度と値）
+STATE_SIZE = 19
+
+# 軌跡タイプ（カーネルはインデックスで返す）
+TRACK_TYPES = ('gps', 'fused', 'ins', 'memory')
+TRACK_GPS, TRACK_FUSED, TRACK_INS, TRACK_MEMORY = range(4)
+TRACK_NONE = -1  # 軌跡点を追加しなかった
+
+EARTH_RADIUS = 6378137.0  # 地球半径 [m]
+DEG_PER_METER = math.degrees(1.0) / EARTH_RADIUS  # 子午線方向1mあたりの緯度差 [deg]
+
+# メモリートラック設定
+ACCURACY_THRESHOLD_GOOD = 15.0     # これ以下なら速度を記憶
+ACCURACY_THRESHOLD_DEGRADE = 30.0  # これ以上でメモリートラック発動
+MEMORY_VELOCITY_DECAY = 0.98       # メモリー速度の減衰率（per update）
+MEMORY_MAX_DURATION = 60.0         # メモリートラック最大持続時間（秒）
+
+COS_LAT_TOLERANCE = 1e-5  # cos(緯度)を再計算する緯度変化 [deg]（経度換算の誤差は1e-7未満）
+
+# メモリー速度の減衰係数表（MEMORY_VELOCITY_DECAY ** n、100Hz更新での最大持続時間分）
+MEMORY_DECAY_LUT = MEMORY_VELOCITY_DECAY ** np.arange(int(MEMORY_MAX_DURATION * 100) + 1)
+
+
+def haversine_vec(lat1, lon1, lat2, lon2):
+    """対応する点どうしの距離をHaversine公式で配列ごとに計算（メートル）"""
+    lat1_rad = np.radians(lat1)
+    lat2_rad = np.radians(lat2)
+    dlat = lat2_rad - lat1_rad
+    dlon = np.radians(np.subtract(lon2, lon1))
+
+    a = np.sin(dlat * 0.5)**2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(dlon * 0.5)**2
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+@njit(cache=True)
+def _memory_decay(steps):
+    """記憶後にsteps回減衰したメモリー速度の係数"""
+    n = int(steps)
+    if n < len(MEMORY_DECAY_LUT):
+        return MEMORY_DECAY_LUT[n]
+    return MEMORY_VELOCITY_DECAY ** n
+
+
+@njit(cache=True)
+def _cos_lat(state, lat):
+    """cos(緯度)を取得（緯度の変化がCOS_LAT_TOLERANCE以内ならキャッシュを再利用）"""
+    if not abs(lat - state[STATE_COS_LAT_REF]) <= COS_LAT_TOLERANCE:
+        state[STATE_COS_LAT_REF] = lat
+        state[STATE_COS_LAT] = math.cos(math.radians(lat))
+    return state[STATE_COS_LAT]
+
+
+@njit(cache=True)
+def _memory_speed(state):
+    """減衰後のメモリー速度 [m/s]"""
+    return state[STATE_MEM_SPEED] * _memory_decay(state[STATE_MEM_DECAY_STEPS])
+
+
+@njit(cache=True)
+def _fusion_gps_step(state, lat, lon, speed, course, accuracy, timestamp):
+    """GPS観測で状態を更新し、追加する軌跡タイプを返す（timestampの未設定はNaN）
+
+    精度は「悪化（負またはDEGRADE以上）」「良好（GOOD未満）」「通常」の3つに分かれ、悪化は先に判定して抜ける。
+    """
+    # GPS精度が悪化した場合：メモリートラックモードへ
+    if accuracy < 0 or accuracy >= ACCURACY_THRESHOLD_DEGRADE:
+        if state[STATE_MEM_MODE] == 0 and _memory_speed(state) > 0.3:
+            state[STATE_MEM_MODE] = 1.0
+            state[STATE_MEM_START] = timestamp
+        return TRACK_NONE  # GPS更新をスキップ
+
+    # 進行方向の単位ベクトル（メモリー速度と速度補正で共用）
+    course_rad = 0.0
+    cos_course = 0.0
+    sin_course = 0.0
+    if course >= 0:
+        course_rad = math.radians(course)
+        cos_course = math.cos(course_rad)
+        sin_course = math.sin(course_rad)
+
+    # GPS精度が良好な場合：速度をメモリに記憶
+    if accuracy < ACCURACY_THRESHOLD_GOOD:
+        if course >= 0 and speed > 0.3:
+            state[STATE_MEM_VN] = speed * cos_course
+            state[STATE_MEM_VE] = speed * sin_course
+            state[STATE_MEM_HEADING] = course_rad
+            state[STATE_MEM_SPEED] = speed
+            state[STATE_MEM_DECAY_STEPS] = 0.0
+        state[STATE_LAST_GOOD_GPS_TIME] = timestamp
+
+        # メモリーモード解除
+        if state[STATE_MEM_MODE] != 0:
+            state[STATE_MEM_MODE] = 0.0
+            state[STATE_MEM_START] = math.nan
+
+    # 通常のGPS更新処理
+    # GPS精度に基づく信頼度（Kalmanゲイン的）
+    gps_weight = 1.0 / (1.0 + accuracy / 10.0)  # 0〜1
+
+    # 位置を補正
+    state[STATE_LAT] = (1 - gps_weight) * state[STATE_LAT] + gps_weight * lat
+    state[STATE_LON] = (1 - gps_weight) * state[STATE_LON] + gps_weight * lon
+
+    # 速度を補正（GPS速度が有効な場合）
+    if speed >= 0 and course >= 0:
+        gps_vel_north = speed * cos_course
+        gps_vel_east = speed * sin_course
+
+        vel_weight = gps_weight * 0.8  # 速度は位置より信頼度低め
+        state[STATE_VN] = (1 - vel_weight) * state[STATE_VN] + vel_weight * gps_vel_north
+        state[STATE_VE] = (1 - vel_weight) * state[STATE_VE] + vel_weight * gps_vel_east
+
+    # 不確実性を減少
+    state[STATE_POS_UNC] = accuracy
+    state[STATE_VEL_UNC] = accuracy / 10.0
+
+    state[STATE_LAST_GPS_LAT] = lat
+    state[STATE_LAST_GPS_LON] = lon
+    state[STATE_LAST_GPS_TIME] = timestamp
+
+    return TRACK_FUSED
+
+
+@njit(cache=True)
+def _fusion_ins_step(state, has_accel, ax, ay, az, has_attitude, roll, pitch, yaw,
+                     dt, timestamp):
+    """センサーデータで位置を更新し、追加する軌跡タイプを返す
+
+    has_accel / has_attitude: 加速度・姿勢が得られなかった場合はFalse
+    timestamp: メモリートラック用（0は未設定扱い）
+    """
+    if dt <= 0:
+        return TRACK_NONE
+
+    # メモリートラックモードの判定
+    use_memory_track = False
+    mem_start = state[STATE_MEM_START]
+    if (state[STATE_MEM_MODE] != 0 and mem_start == mem_start and mem_start != 0
+            and timestamp == timestamp and timestamp != 0):
+        memory_elapsed = timestamp - mem_start
+        if memory_elapsed < MEMORY_MAX_DURATION and _memory_speed(state) > 0.3:
+            use_memory_track = True
+
+    lat = state[STATE_LAT]
+
+    if use_memory_track:
+        # === メモリートラックモード ===
+        # 記憶した速度で等速直線運動を仮定
+        track_type = TRACK_MEMORY
+
+        # ジャイロで方位変化のみ検出（旋回対応）
+        if has_attitude:
+            # 簡易的に現在のyawから方位を更新
+            state[STATE_MEM_HEADING] = 3*math.pi/2 - yaw
+
+        # メモリ速度を減衰（時間経過で信頼度低下、係数は減衰回数から表引き）
+        state[STATE_MEM_DECAY_STEPS] += 1
+        memory_speed = _memory_speed(state)
+
+        # 方位変化を反映した速度ベクトル
+        memory_heading = state[STATE_MEM_HEADING]
+        vel_north = memory_speed * math.cos(memory_heading)
+        vel_east = memory_speed * math.sin(memory_heading)
+
+    else:
+        # === 通常INSモード ===
+        track_type = TRACK_INS
+        vel_north = state[STATE_VN]
+        vel_east = state[STATE_VE]
+
+        # 現在の方位を計算
+        heading = 0.0
+        if has_attitude:
+            heading = 3*math.pi/2 - yaw
+        else:
+            roll = 0.0
+            pitch = 0.0
+
+        # 加速度を世界座標系に変換
+        if has_accel:
+            ay_corrected = ay * math.cos(pitch) - az * math.sin(pitch)
+            ax_corrected = ax * math.cos(roll)
+
+            accel_forward = ay_corrected
+            accel_right = ax_corrected
+
+            cos_heading = math.cos(heading)
+            sin_heading = math.sin(heading)
+            accel_north = accel_forward * cos_heading - accel_right * sin_heading
+            accel_east = accel_forward * sin_heading + accel_right * cos_heading
+
+            accel_mag = math.sqrt(ax*ax + ay*ay + az*az)
+
+            if accel_mag < 0.03:
+                vel_north *= 0.8
+                vel_east *= 0.8
+            else:
+                move_threshold = 0.05
+                if abs(accel_forward) > move_threshold or abs(accel_right) > move_threshold:
+                    vel_north += accel_north * 9.81 * dt
+                    vel_east += accel_east * 9.81 * dt
+
+        # 速度減衰
+        decay = 0.99
+        vel_north *= decay
+        vel_east *= decay
+
+        # 速度上限
+        max_speed = 10.0
+        speed = math.sqrt(vel_north**2 + vel_east**2)
+        if speed > max_speed:
+            scale = max_speed / speed
+            vel_north *= scale
+            vel_east *= scale
+
+        state[STATE_VN] = vel_north
+        state[STATE_VE] = vel_east
+
+    # 位置を更新
+    state[STATE_LAT] = lat + vel_north * dt * DEG_PER_METER
+    state[STATE_LON] += vel_east * dt * DEG_PER_METER / _cos_lat(state, lat)
+
+    # 不確実性を増加
+    state[STATE_POS_UNC] += 0.5 * dt
+    state[STATE_VEL_UNC] += 0.1 * dt
+
+    return track_type
+
+
+@njit(cache=True)
+def _integrate_fusion(state, timestamps, has_accel, accel, has_attitude, attitude,
+                      has_gps, gps, track_lat, track_lon, track_type, count):
+    """ログ全体をGPS/INS融合で処理し、軌跡点を track_* の count 以降に書き込む
+
+    accel, attitude: (N, 3) のユーザー加速度 [G] / 姿勢 (roll, pitch, yaw) [rad]
+    gps: (N, 6) の (lat, lon, speed, course, accuracy, timestamp)
+    track_*: 2N点以上の空きがあること
+    先頭レコードは時刻の基準としてのみ使用する。
+    returns: 書き込み後の軌跡点数
+    """
+    n = len(timestamps)
+
+    for i in range(1, n):
+        t = timestamps[i]
+        dt = t - timestamps[i - 1]
+
+        # INS更新（予測ステップ）
+        kind = _fusion_ins_step(state, has_accel[i], accel[i, 0], accel[i, 1], accel[i, 2],
+                                has_attitude[i], attitude[i, 0], attitude[i, 1],
+                                attitude[i, 2], dt, t)
+        if kind != TRACK_NONE:
+            track_lat[count] = state[STATE_LAT]
+            track_lon[count] = state[STATE_LON]
+            track_type[count] = kind
+            count += 1
+
+        # GPS更新（測定ステップ）- 有効なGPSがあれば補正
+        if has_gps[i]:
+            kind = _fusion_gps_step(state, gps[i, 0], gps[i, 1], gps[i, 2],
+                                    gps[i, 3], gps[i, 4], gps[i, 5])
+            if kind != TRACK_NONE:
+                track_lat[count] = state[STATE_LAT]
+                track_lon[count] = state[STATE_LON]
+                track_type[count] = kind
+                count += 1
+
+    return count
+
+
+def _fusion_state_property(index, doc, optional=False):
+    """状態ベクトルの要素を属性として公開する（optionalはNaNをNoneとして扱う）"""
+    def fget(self):
+        value = float(self._state[index])
+        if optional and math.isnan(value):
+            return None
+        return value
+
+    def fset(self, value):
+        self._state[index] = math.nan if value is None else value
+
+    return property(fget, fset, doc=doc)
+
+
+def _memory_state_property(index, doc):
+    """記憶時のメモリー速度を減衰後の値として公開する"""
+    def fget(self):
+        return float(self._state[index] * _memory_decay(self._state[STATE_MEM_DECAY_STEPS]))
+
+    def fset(self, value):
+        self._state[index] = value / _memory_decay(self._state[STATE_MEM_DECAY_STEPS])
+
+    return property(fget, fset, doc=doc)
+
+
 class GPSINSFusion:
-    """GPS/INS融合による位置推定クラス（簡易Kalmanフィルタ + メモリートラック）"""
+    """GPS/INS融合による位置推定クラス（簡易Kalmanフィルタ + メモリートラック）
+
+    数値計算はnjitカーネルで行い、ログ全体の処理は process_log でまとめて実行する。
+    """
+
+    TRACK_INITIAL_CAPACITY = 1024  # 軌跡バッファの初期容量（不足時は倍々に拡張）
 
-    EARTH_RADIUS = 6378137.0  # 地球半径 [m]
+    EARTH_RADIUS = EARTH_RADIUS
 
     # メモリートラック設定
-    ACCURACY_THRESHOLD_GOOD = 15.0   # これ以下なら速度を記憶
-    ACCURACY_THRESHOLD_DEGRADE = 30.0  # これ以上でメモリートラック発動
-    MEMORY_VELOCITY_DECAY = 0.98     # メモリー速度の減衰率（per update）
-    MEMORY_MAX_DURATION = 60.0       # メモリートラック最大持続時間（秒）
+    ACCURACY_THRESHOLD_GOOD = ACCURACY_THRESHOLD_GOOD
+    ACCURACY_THRESHOLD_DEGRADE = ACCURACY_THRESHOLD_DEGRADE
+    MEMORY_VELOCITY_DECAY = MEMORY_VELOCITY_DECAY
+    MEMORY_MAX_DURATION = MEMORY_MAX_DURATION
+
+    current_lat = _fusion_state_property(STATE_LAT, '現在の推定緯度')
+    current_lon = _fusion_state_property(STATE_LON, '現在の推定経度')
+    velocity_north = _fusion_state_property(STATE_VN, '北方向速度 [m/s]')
+    velocity_east = _fusion_state_property(STATE_VE, '東方向速度 [m/s]')
+    position_uncertainty = _fusion_state_property(STATE_POS_UNC, '位置不確実性 [m]')
+    velocity_uncertainty = _fusion_state_property(STATE_VEL_UNC, '速度不確実性 [m/s]')
+    memory_velocity_north = _memory_state_property(STATE_MEM_VN, 'メモリー速度（北）[m/s]')
+    memory_velocity_east = _memory_state_property(STATE_MEM_VE, 'メモリー速度（東）[m/s]')
+    memory_speed = _memory_state_property(STATE_MEM_SPEED, 'メモリー速度 [m/s]')
+    memory_heading = _fusion_state_property(STATE_MEM_HEADING, 'メモリー方位 [rad]')
+    memory_mode_start_time = _fusion_state_property(
+        STATE_MEM_START, 'メモリートラック開始時刻', optional=True)
+    last_gps_lat = _fusion_state_property(STATE_LAST_GPS_LAT, '最後に採用したGPS緯度')
+    last_gps_lon = _fusion_state_property(STATE_LAST_GPS_LON, '最後に採用したGPS経度')
+    last_gps_time = _fusion_state_property(
+        STATE_LAST_GPS_TIME, '最後に採用したGPS時刻', optional=True)
+    last_good_gps_time = _fusion_state_property(
+        STATE_LAST_GOOD_GPS_TIME, '最後に精度良好だったGPS時刻', optional=True)
 
     def __init__(self, start_lat, start_lon):
         """開始位置を設定"""
-        self.current_lat = start_lat
-        self.current_lon = start_lon
-
-        # 速度（北方向、東方向）[m/s]
-        self.velocity_north = 0.0
-        self.velocity_east = 0.0
+        self._state = np.zeros(STATE_SIZE, dtype=np.float64)
+        self._state[STATE_LAT] = start_lat
+        self._state[STATE_LON] = start_lon
 
         # 推定誤差共分散（簡易版）
-        self.position_uncertainty = 10.0  # m
-        self.velocity_uncertainty = 1.0   # m/s
-
-        # GPS補正用
-        self.last_gps_lat = start_lat
-        self.last_gps_lon = start_lon
-        self.last_gps_time = None
-
-        # メモリートラック用
-        self.memory_velocity_north = 0.0
-        self.memory_velocity_east = 0.0
-        self.memory_heading = 0.0
-        self.memory_speed = 0.0
-        self.is_memory_mode = False
-        self.memory_mode_start_time = None
-        self.last_good_gps_time = None
-
-        # 軌跡（タイプ付き: 'gps', 'ins', 'fused', 'memory'）
-        self.track = [(start_lat, start_lon, 'gps')]
+        self._state[STATE_POS_UNC] = 10.0  # m
+        self._state[STATE_VEL_UNC] = 1.0   # m/s
+
+        # GPS補正用・メモリートラック用
+        self._state[STATE_LAST_GPS_LAT] = start_lat
+        self._state[STATE_LAST_GPS_LON] = start_lon
+        self._state[STATE_MEM_START] = math.nan
+        self._state[STATE_LAST_GPS_TIME] = math.nan
+        self._state[STATE_LAST_GOOD_GPS_TIME] = math.nan
+        self._state[STATE_COS_LAT_REF] = math.nan
+
+        # 軌跡（緯度・経度・タイプ別の配列、タイプはTRACK_TYPESのインデックス）
+        capacity = self.TRACK_INITIAL_CAPACITY
+        self._track_lat = np.empty(capacity)
+        self._track_lon = np.empty(capacity)
+        self._track_type = np.empty(capacity, dtype=np.int8)
+        self._track_count = 0
+        self._append_track(TRACK_GPS)
+
+    @property
+    def is_memory_mode(self):
+        """メモリートラックモード中か"""
+        return bool(self._state[STATE_MEM_MODE])
+
+    @is_memory_mode.setter
+    def is_memory_mode(self, value):
+        self._state[STATE_MEM_MODE] = 1.0 if value else 0.0
+
+    @property
+    def track(self):
+        """軌跡（表示用の (lat, lon, タイプ名) のリスト、タイプ名は TRACK_TYPES）"""
+        lat, lon, types = self.get_track_with_type()
+        return [(lat_, lon_, TRACK_TYPES[kind]) for lat_, lon_, kind
+                in zip(lat.tolist(), lon.tolist(), types.tolist())]
+
+    def _reserve_track(self, extra):
+        """軌跡バッファにextra点分の空きを確保"""
+        needed = self._track_count + extra
+        capacity = len(self._track_lat)
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2)
+        count = self._track_count
+        for name in ('_track_lat', '_track_lon', '_track_type'):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:count] = old[:count]
+            setattr(self, name, new)
+
+    def _append_track(self, track_type):
+        """現在位置を軌跡に追加"""
+        if track_type != TRACK_NONE:
+            self._reserve_track(1)
+            i = self._track_count
+            self._track_lat[i] = self._state[STATE_LAT]
+            self._track_lon[i] = self._state[STATE_LON]
+            self._track_type[i] = track_type
+            self._track_count = i + 1
 
     def update_gps(self, lat, lon, speed, course, accuracy, timestamp):
         """GPS観測で状態を更新（測定更新）"""
-        # GPS精度が良好な場合：速度をメモリに記憶
-        if accuracy >= 0 and accuracy < self.ACCURACY_THRESHOLD_GOOD:
-            if course >= 0 and speed > 0.3:
-                course_rad = np.radians(course)
-                self.memory_velocity_north = speed * np.cos(course_rad)
-                self.memory_velocity_east = speed * np.sin(course_rad)
-                self.memory_heading = course_rad
-                self.memory_speed = speed
-            self.last_good_gps_time = timestamp
-
-            # メモリーモード解除
-            if self.is_memory_mode:
-                self.is_memory_mode = False
-                self.memory_mode_start_time = None
-
-        # GPS精度が悪化した場合：メモリートラックモードへ
-        if accuracy < 0 or accuracy >= self.ACCURACY_THRESHOLD_DEGRADE:
-            if not self.is_memory_mode and self.memory_speed > 0.3:
-                self.is_memory_mode = True
-                self.memory_mode_start_time = timestamp
-            return  # GPS更新をスキップ
-
-        # 通常のGPS更新処理
-        # GPS精度に基づく信頼度（Kalmanゲイン的）
-        gps_weight = 1.0 / (1.0 + accuracy / 10.0)  # 0〜1
-
-        # 位置を補正
-        self.current_lat = (1 - gps_weight) * self.current_lat + gps_weight * lat
-        self.current_lon = (1 - gps_weight) * self.current_lon + gps_weight * lon
-
-        # 速度を補正（GPS速度が有効な場合）
-        if speed >= 0 and course >= 0:
-            course_rad = np.radians(course)
-            gps_vel_north = speed * np.cos(course_rad)
-            gps_vel_east = speed * np.sin(course_rad)
-
-            vel_weight = gps_weight * 0.8  # 速度は位置より信頼度低め
-            self.velocity_north = (1 - vel_weight) * self.velocity_north + vel_weight * gps_vel_north
-            self.velocity_east = (1 - vel_weight) * self.velocity_east + vel_weight * gps_vel_east
-
-        # 不確実性を減少
-        self.position_uncertainty = accuracy
-        self.velocity_uncertainty = accuracy / 10.0
-
-        self.last_gps_lat = lat
-        self.last_gps_lon = lon
-        self.last_gps_time = timestamp
-
-        self.track.append((self.current_lat, self.current_lon, 'fused'))
+        if timestamp is None:
+            timestamp = math.nan
+        self._append_track(
+            _fusion_gps_step(self._state, lat, lon, speed, course, accuracy, timestamp))
 
     def update_ins(self, user_accel, attitude, dt, timestamp=None):
         """
@@ -909,146 +1671,409 @@ class GPSINSFusion:
         dt: 時間間隔 [s]
         timestamp: タイムスタンプ（メモリートラック用）
         """
-        if dt <= 0:
-            return
+        has_accel = user_accel is not None
+        has_attitude = attitude is not None
+        ax, ay, az = user_accel if has_accel else (0.0, 0.0, 0.0)
+        roll, pitch, yaw = attitude if has_attitude else (0.0, 0.0, 0.0)
+        self._append_track(_fusion_ins_step(
+            self._state, has_accel, ax, ay, az, has_attitude, roll, pitch, yaw,
+            dt, timestamp or 0.0))
+
+    def process_log(self, timestamps, has_accel, accel, has_attitude, attitude,
+                    has_gps, gps):
+        """
+        ログ全体をまとめて処理（update_ins → update_gps をレコード順に適用）
 
-        use_memory_track = False
-        track_type = 'ins'
-
-        # メモリートラックモードの判定
-        if self.is_memory_mode and self.memory_mode_start_time and timestamp:
-            memory_elapsed = timestamp - self.memory_mode_start_time
-            if memory_elapsed < self.MEMORY_MAX_DURATION and self.memory_speed > 0.3:
-                use_memory_track = True
-
-        if use_memory_track:
-            # === メモリートラックモード ===
-            # 記憶した速度で等速直線運動を仮定
-            track_type = 'memory'
-
-            # ジャイロで方位変化のみ検出（旋回対応）
-            if attitude is not None:
-                cur_roll, cur_pitch, yaw = attitude
-                # 方位変化を検出してメモリ方位に適用
-                heading = 3*np.pi/2 - yaw
-                # 簡易的に現在のyawから方位を更新
-                self.memory_heading = heading
-
-            # メモリ速度を減衰（時間経過で信頼度低下）
-            self.memory_velocity_north *= self.MEMORY_VELOCITY_DECAY
-            self.memory_velocity_east *= self.MEMORY_VELOCITY_DECAY
-            self.memory_speed *= self.MEMORY_VELOCITY_DECAY
-
-            # 方位変化を反映した速度ベクトル
-            vel_north = self.memory_speed * np.cos(self.memory_heading)
-            vel_east = self.memory_speed * np.sin(self.memory_heading)
-
-            # 位置の更新（メモリ速度使用）
-            delta_lat = (vel_north * dt) / self.EARTH_RADIUS
-            delta_lon = (vel_east * dt) / (
-                self.EARTH_RADIUS * np.cos(np.radians(self.current_lat))
-            )
+        timestamps: (N,) 各レコードの時刻 [s]（先頭は基準としてのみ使用）
+        has_accel, has_attitude, has_gps: (N,) 各データの有無
+        accel: (N, 3) ユーザー加速度 [G]
+        attitude: (N, 3) 姿勢 (roll, pitch, yaw) [rad]
+        gps: (N, 6) (lat, lon, speed, course, accuracy, timestamp)（時刻の未設定はNaN）
+        """
+        # 1レコードあたり最大2点（INS + GPS）
+        self._reserve_track(2 * len(timestamps))
+        self._track_count = _integrate_fusion(
+            self._state, timestamps, has_accel, accel, has_attitude, attitude,
+            has_gps, gps, self._track_lat, self._track_lon, self._track_type,
+            self._track_count)
 
-            self.current_lat += np.degrees(delta_lat)
-            self.current_lon += np.degrees(delta_lon)
+    def get_track(self):
+        """軌跡を取得（座標のみ、(N, 2) の配列）"""
+        lat, lon = self.get_track_arrays()
+        return np.column_stack((lat, lon))
 
-        else:
-            # === 通常INSモード ===
-            # 現在の方位を計算
-            heading = 0.0
-            cur_pitch = 0.0
-            cur_roll = 0.0
+    def get_track_arrays(self):
+        """軌跡を緯度・経度の配列で取得（内部バッファのビュー）"""
+        n = self._track_count
+        return self._track_lat[:n], self._track_lon[:n]
+
+    def get_track_with_type(self):
+        """軌跡をタイプ付きで取得（緯度・経度・タイプの配列、内部バッファのビュー）
+
+        タイプはTRACK_TYPESのインデックス。特定タイプの抽出は
+        types == TRACK_FUSED のようにマスクで行う。
+        """
+        lat, lon = self.get_track_arrays()
+        return lat, lon, self._track_type[:self._track_count]
+
+    def get_current_position(self):
+        """現在位置を取得"""
+        return (self.current_lat, self.current_lon)
 
-            if attitude is not None:
-                cur_roll, cur_pitch, yaw = attitude
-                heading = 3*np.pi/2 - yaw
+    def get_speed(self):
+        """現在速度を取得 [m/s]"""
+        return math.hypot(self._state[STATE_VN], self._state[STATE_VE])
 
-            # 加速度を世界座標系に変換
-            if user_accel is not None:
-                ax, ay, az = user_accel
+    def get_uncertainty(self):
+        """現在の位置不確実性を取得 [m]"""
+        return self.position_uncertainty
 
-                cos_pitch = np.cos(cur_pitch)
-                sin_pitch = np.sin(cur_pitch)
-                cos_roll = np.cos(cur_roll)
 
-                ay_corrected = ay * cos_pitch - az * sin_pitch
-                ax_corrected = ax * cos_roll
+# 後方互換性のためのエイリアス
+INSCalculator = GPSINSFusion
 
-                accel_forward = ay_corrected
-                accel_right = ax_corrected
 
-                accel_north = (accel_forward * np.cos(heading)
-                              - accel_right * np.sin(heading))
-                accel_east = (accel_forward * np.sin(heading)
-                             + accel_right * np.cos(heading))
+class SensorLogData:
+    """ログのレコードから抽出したセンサーデータとGPS/INS融合軌跡
 
-                accel_mag = np.sqrt(ax*ax + ay*ay + az*az)
+    GUIに依存しないため、ワーカースレッドで生成してからビューアに渡す。
+    """
 
-                if abs(accel_mag) < 0.03:
-                    self.velocity_north *= 0.8
-                    self.velocity_east *= 0.8
-                else:
-                    move_threshold = 0.05
-                    if abs(accel_forward) > move_threshold or abs(accel_right) > move_threshold:
-                        self.velocity_north += accel_north * 9.81 * dt
-                        self.velocity_east += accel_east * 9.81 * dt
-
-            # 速度減衰
-            decay = 0.99
-            self.velocity_north *= decay
-            self.velocity_east *= decay
-
-            # 速度上限
-            max_speed = 10.0
-            speed = np.sqrt(self.velocity_north**2 + self.velocity_east**2)
-            if speed > max_speed:
-                scale = max_speed / speed
-                self.velocity_north *= scale
-                self.velocity_east *= scale
-
-            # 位置を更新
-            delta_lat = (self.velocity_north * dt) / self.EARTH_RADIUS
-            delta_lon = (self.velocity_east * dt) / (
-                self.EARTH_RADIUS * np.cos(np.radians(self.current_lat))
+    def __init__(self, records):
+        self.records = records
+        self._extract_sensor_data()
+
+    def _extract_sensor_data(self):
+        """センサーデータを抽出（1レコード1行の構造化配列に詰めてから列ごとのビューを公開）"""
+        n = len(self.records)
+        sensor = np.empty(n, dtype=SENSOR_RECORD_DTYPE)
+
+        # GPS/デッドレコニングは有効なレコードのみを先頭から詰める（件数はループ後に確定）
+        gps_buf = np.empty(n, dtype=GPS_RECORD_DTYPE)
+        dr_buf = np.empty(n, dtype=DR_RECORD_DTYPE)
+        track_buf = np.empty(n, dtype=TRACK_POINT_DTYPE)
+        gps_count = 0
+        dr_count = 0
+        track_count = 0
+
+        # GPS/INS融合のGPS入力（全レコード分）
+        self.has_gps = np.zeros(n, dtype=np.bool_)
+        self.gps_fusion = np.zeros((n, 6))  # lat, lon, speed, course, accuracy, timestamp
+
+        first_time = self.records[0].get('timestamp', 0)
+
+        for i, rec in enumerate(self.records):
+            rec_get = rec.get
+            timestamp = rec_get('timestamp', 0)
+            t = timestamp - first_time
+
+            sensors = rec_get('sensors', {})
+            gravity = sensors.get('gravity') or {}
+            accel = sensors.get('user_acceleration') or {}
+            attitude = sensors.get('attitude') or {}
+            gyro = sensors.get('gyro_calculated') or {}
+            mag = sensors.get('magnetic_field') or {}
+
+            sensor[i] = (
+                timestamp, t,
+                gravity.get('x', 0), gravity.get('y', 0), gravity.get('z', 0),
+                bool(accel), accel.get('x', 0), accel.get('y', 0), accel.get('z', 0),
+                bool(attitude),
+                attitude.get('roll_deg', 0), attitude.get('pitch_deg', 0),
+                attitude.get('yaw_deg', 0),
+                attitude.get('roll_rad', 0), attitude.get('pitch_rad', 0),
+                attitude.get('yaw_rad', 0),
+                gyro.get('x', 0), gyro.get('y', 0), gyro.get('z', 0),
+                mag.get('x', 0), mag.get('y', 0), mag.get('z', 0),
             )
 
-            self.current_lat += np.degrees(delta_lat)
-            self.current_lon += np.degrees(delta_lon)
+            # GPS（表示用と融合入力で同じ値は1回だけ取り出す）
+            gps = rec_get('gps', {})
+            raw = gps.get('raw')
+            gps_valid = bool(raw) and not gps.get('no_signal', True)
+            if gps_valid:
+                raw_get = raw.get
+                lat = raw_get('latitude', 0)
+                lon = raw_get('longitude', 0)
+                gps_buf[gps_count] = (
+                    lat,
+                    lon,
+                    raw_get('altitude', 0),
+                    raw_get('speed_clamped', 0),
+                    raw_get('horizontal_accuracy', 0),
+                    t,
+                )
+                gps_count += 1
+
+                self.has_gps[i] = True
+                gps_time = raw_get('timestamp')
+                self.gps_fusion[i] = (
+                    lat,
+                    lon,
+                    raw_get('speed_clamped', raw_get('speed', -1)),
+                    raw_get('course', -1),
+                    raw_get('horizontal_accuracy', 100),
+                    np.nan if gps_time is None else gps_time
+                )
 
-        # 不確実性を増加
-        self.position_uncertainty += 0.5 * dt
-        self.velocity_uncertainty += 0.1 * dt
+            # デッドレコニング
+            dr = rec_get('dead_reckoning', {})
+            if dr.get('active'):
+                result = dr.get('result', {})
+                if result:
+                    result_get = result.get
+                    dr_buf[dr_count] = (
+                        result_get('latitude', 0),
+                        result_get('longitude', 0),
+                        result_get('speed', 0),
+                        result_get('heading_deg', 0),
+                        t,
+                    )
+                    dr_count += 1
+
+            # 統合航跡の点（融合位置を優先し、なければ有効なGPS位置を使う）
+            fusion = rec_get('gps_ins_fusion')
+            if fusion:
+                point_lat = fusion.get('latitude')
+                point_lon = fusion.get('longitude')
+            elif gps_valid:
+                point_lat = raw_get('latitude')
+                point_lon = raw_get('longitude')
+            else:
+                point_lat = point_lon = None
+
+            if point_lat is not None and point_lon is not None:
+                baro = sensors.get('barometer') or {}
+                track_buf[track_count] = (
+                    point_lat, point_lon, timestamp,
+                    bool(fusion),
+                    bool(fusion) and fusion.get('mode', 'ins') == 'memory_track',
+                    gps_valid,
+                    raw_get('horizontal_accuracy', 100) if gps_valid else None,
+                    raw_get('altitude') if gps_valid else None,
+                    raw_get('vertical_accuracy', -1) if gps_valid else None,
+                    baro.get('relative_altitude_m'),
+                    accel.get('z'),
+                )
+                track_count += 1
 
-        self.track.append((self.current_lat, self.current_lon, track_type))
+        # 列ごとのビュー（コピーしない）
+        self.sensor_data = sensor
+        self.time_array = sensor['t']
 
-    def get_track(self):
-        """軌跡を取得（座標のみ）"""
-        return [(lat, lon) for lat, lon, _ in self.track]
+        # 重力
+        self.gravity_x = sensor['gravity_x']
+        self.gravity_y = sensor['gravity_y']
+        self.gravity_z = sensor['gravity_z']
 
-    def get_track_with_type(self):
-        """軌跡をタイプ付きで取得"""
-        return self.track
+        # ユーザー加速度
+        self.accel_x = sensor['accel_x']
+        self.accel_y = sensor['accel_y']
+        self.accel_z = sensor['accel_z']
 
-    def get_current_position(self):
-        """現在位置を取得"""
-        return (self.current_lat, self.current_lon)
+        # 姿勢
+        self.roll = sensor['roll']
+        self.pitch = sensor['pitch']
+        self.yaw = sensor['yaw']
 
-    def get_speed(self):
-        """現在速度を取得 [m/s]"""
-        return np.sqrt(self.velocity_north**2 + self.velocity_east**2)
+        # ジャイロ
+        self.gyro_x = sensor['gyro_x']
+        self.gyro_y = sensor['gyro_y']
+        self.gyro_z = sensor['gyro_z']
 
-    def get_uncertainty(self):
-        """現在の位置不確実性を取得 [m]"""
-        return self.position_uncertainty
+        # 磁場
+        self.mag_x = sensor['mag_x']
+        self.mag_y = sensor['mag_y']
+        self.mag_z = sensor['mag_z']
+
+        # GPS
+        gps = gps_buf[:gps_count]
+        self.gps_lat = gps['lat']
+        self.gps_lon = gps['lon']
+        self.gps_alt = gps['alt']
+        self.gps_speed = gps['speed']
+        self.gps_accuracy = gps['accuracy']
+        self.gps_time = gps['t']
 
+        # デッドレコニング
+        dr = dr_buf[:dr_count]
+        self.dr_lat = dr['lat']
+        self.dr_lon = dr['lon']
+        self.dr_speed = dr['speed']
+        self.dr_heading = dr['heading']
+        self.dr_time = dr['t']
+
+        # 統合航跡・標高断面図の点と、先頭点からの累積距離 [m]（地図の統計と断面図で共有）
+        track = self.track_points = track_buf[:track_count]
+        self.track_distance = np.zeros(track_count)
+        np.cumsum(haversine_vec(track['lat'][:-1], track['lon'][:-1],
+                                track['lat'][1:], track['lon'][1:]),
+                  out=self.track_distance[1:])
 
-# 後方互換性のためのエイリアス
-INSCalculator = GPSINSFusion
+        # INS（慣性航法）軌跡を計算
+        self._calculate_ins_track()
+
+    def _calculate_ins_track(self):
+        """GPS/INS融合で軌跡を計算"""
+        self.ins_lat = []
+        self.ins_lon = []
+
+        # 開始位置がない場合は計算しない
+        if len(self.gps_lat) == 0:
+            return
+
+        start_lat = self.gps_lat[0]
+        start_lon = self.gps_lon[0]
+
+        # GPS/INS融合（ループ全体をカーネル内で実行）
+        fusion = GPSINSFusion(start_lat, start_lon)
+        sensor = self.sensor_data
+        accel = np.column_stack((sensor['accel_x'], sensor['accel_y'], sensor['accel_z']))
+        attitude = np.column_stack(
+            (sensor['roll_rad'], sensor['pitch_rad'], sensor['yaw_rad']))
+        fusion.process_log(sensor['timestamp'], sensor['has_accel'], accel,
+                           sensor['has_attitude'], attitude,
+                           self.has_gps, self.gps_fusion)
+
+        # 軌跡を取得（最大500点に間引き、最後の点を確実に含める）
+        # ストライドのスライスはコピーして、融合の軌跡バッファを保持し続けないようにする
+        track_lat, track_lon = fusion.get_track_arrays()
+        step = max(1, len(track_lat) // 500)
+        ins_lat = track_lat[::step].copy()
+        ins_lon = track_lon[::step].copy()
+        if (len(track_lat) - 1) % step and (ins_lat[-1] != track_lat[-1]
+                                            or ins_lon[-1] != track_lon[-1]):
+            ins_lat = np.append(ins_lat, track_lat[-1])
+            ins_lon = np.append(ins_lon, track_lon[-1])
+
+        self.ins_lat = ins_lat
+        self.ins_lon = ins_lon
+
+
+class LogLoadWorker(QObject):
+    """ログの読み込みとデータ抽出をバックグラウンドスレッドで実行"""
+
+    loaded = Signal(str, object, object)  # ファイルパス, log_data, SensorLogData（レコードなしはNone）
+    failed = Signal(str)
+
+    def __init__(self, file_path):
+        super().__init__()
+        self.file_path = str(file_path)
+
+    def run(self):
+        """読み込みを実行し、結果をシグナルで通知"""
+        try:
+            log_data = load_sensor_log(self.file_path)
+            records = log_data.get('records', [])
+            data = SensorLogData(records) if records else None
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.loaded.emit(self.file_path, log_data, data)
+
+
+class TerrainProfileWorker(QObject):
+    """国土地理院標高タイルから地形断面を取得（タイルの通信を待つためバックグラウンドスレッドで実行）"""
+
+    loaded = Signal(int, object, object)  # 要求番号, 距離の配列, 標高の配列（取得できなければ空）
+
+    def __init__(self, gsi_api, coords, sample_interval, request_id):
+        super().__init__()
+        self.gsi_api = gsi_api
+        self.coords = coords
+        self.sample_interval = sample_interval
+        self.request_id = request_id
+
+    def run(self):
+        """地形断面を取得し、結果をシグナルで通知"""
+        terrain_dist = terrain_elev = np.empty(0)
+        try:
+            terrain_profile = self.gsi_api.get_elevation_profile(
+                self.coords, sample_interval=self.sample_interval)
+            if terrain_profile:
+                terrain_dist, terrain_elev = np.array(terrain_profile, dtype=np.float64).T
+        except Exception as e:
+            print(f'標高タイル取得エラー: {e}')
+        self.loaded.emit(self.request_id, terrain_dist, terrain_elev)
+
+
+class LazyMapView(QWidget):
+    """地図WebViewのプレースホルダ（初めて表示されたときにWebViewを生成する）
+
+    WebViewはタブごとにChromiumのレンダラープロセスを起動するため、表示されるまで作らない。
+    JSは用途（key）ごとに最新のものだけ保持し、読み込み完了後は MAP_JS_COALESCE_MS ごとに
+    まとめて実行する（区間選択のドラッグなどで連続した更新を間引く）。
+    """
+
+    def __init__(self, html, create_view):
+        super().__init__()
+        self._html = html
+        self._create_view = create_view
+        self._pending_js = {}  # key -> JS（実行順は最後に更新した順）
+        self._loaded = False
+        self.view = None
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(MAP_JS_COALESCE_MS)
+        self._flush_timer.timeout.connect(self._flush_pending_js)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+    def showEvent(self, event):
+        """初めて表示されたときにWebViewを生成"""
+        super().showEvent(event)
+        if self.view is None:
+            self.view = self._create_view(self._html)
+            self.view.loadFinished.connect(self._on_load_finished)
+            self.layout().addWidget(self.view)
+
+    def _on_load_finished(self, ok):
+        """読み込み完了後に保留中のJSを実行"""
+        self._loaded = True
+        self._flush_pending_js()
+
+    def _flush_pending_js(self):
+        """保留中のJSを実行"""
+        if not self._loaded:
+            return
+        pending, self._pending_js = self._pending_js, {}
+        for js in pending.values():
+            self.view.page().runJavaScript(js)
+
+    def run_js(self, js, key):
+        """JSの実行を予約（同じkeyの保留中のJSは置き換える）"""
+        self._pending_js.pop(key, None)
+        self._pending_js[key] = js
+        if self._loaded and not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def release(self):
+        """WebViewを破棄"""
+        if self.view is not None:
+            self.view.setUrl(QUrl('about:blank'))
+            self.view.deleteLater()
+            self.view = None
+            self._loaded = False
+        self._flush_timer.stop()
 
 
 class SensorLogViewer(QMainWindow):
     """センサーログビューアのメインウィンドウ"""
 
+    # 時系列グラフの線（色, 凡例名）、鮮やかな色（ダークテーマ用）
+    XYZ_CURVES = (
+        ('#FF6B6B', 'X'),  # 鮮やかな赤
+        ('#4ECB71', 'Y'),  # 鮮やかな緑
+        ('#4DABF7', 'Z'),  # 鮮やかな青
+    )
+    ATTITUDE_CURVES = (
+        ('#FF8787', 'Roll'),   # ピンク系赤
+        ('#69DB7C', 'Pitch'),  # 明るい緑
+        ('#74C0FC', 'Yaw'),    # 明るい青
+    )
+
     def __init__(self, folder_path=None):
         super().__init__()
         self.setWindowTitle('Sensor Logger Viewer')
@@ -1056,8 +2081,19 @@ class SensorLogViewer(QMainWindow):
 
         self.log_data = None
         self.records = []
+        self.current_file = None  # 地図の表示範囲を合わせ直すかの判定用
+        self.sensor_data = None  # SENSOR_RECORD_DTYPE の構造化配列
         self.time_array = None
         self._folder_path = folder_path
+        self._web_profile = self._create_web_profile()
+        self._load_thread = None  # 読み込み中のワーカースレッド
+        self._load_worker = None
+        self._pens = {}  # 色 → QPen（同じ色の線はペンを共有する）
+        self._gsi_api = GSIElevationAPI(zoom=14)  # 標高タイルのメモリキャッシュを読み込み間で共有
+        self._terrain_thread = None  # 地形断面を取得中のワーカースレッド
+        self._terrain_worker = None
+        self._terrain_request_id = 0  # 最新の地形断面の要求番号（古い結果の判定用）
+        self._pending_terrain = None  # 取得中に来た次の要求 (要求番号, 座標)
 
         self._setup_ui()
         self._setup_menu()
@@ -1087,16 +2123,20 @@ class SensorLogViewer(QMainWindow):
     def closeEvent(self, event):
         """ウィンドウを閉じる際のクリーンアップ"""
         try:
-            # WebViewをクリーンアップ
-            if hasattr(self, 'gps_map_view'):
-                self.gps_map_view.setUrl(QUrl('about:blank'))
-                self.gps_map_view.deleteLater()
-            if hasattr(self, 'dr_map_view'):
-                self.dr_map_view.setUrl(QUrl('about:blank'))
-                self.dr_map_view.deleteLater()
-            if hasattr(self, 'integrated_map_view'):
-                self.integrated_map_view.setUrl(QUrl('about:blank'))
-                self.integrated_map_view.deleteLater()
+            # 読み込み中のワーカースレッドを待つ
+            if self._load_thread is not None:
+                self._load_thread.quit()
+                self._load_thread.wait()
+
+            # 地形断面の取得中のスレッドを待つ（保留中の要求は破棄）
+            self._pending_terrain = None
+            if self._terrain_thread is not None:
+                self._terrain_thread.quit()
+                self._terrain_thread.wait()
+
+            # WebViewをクリーンアップ（表示されずに生成されなかった地図は何もしない）
+            for map_view in (self.map_view, self.dr_map_view, self.integrated_map_view):
+                map_view.release()
         except Exception as e:
             print(f'Cleanup error: {e}')
 
@@ -1108,7 +2148,7 @@ class SensorLogViewer(QMainWindow):
         # ファイルシステムモデル
         self.file_model = QFileSystemModel()
         self.file_model.setRootPath('')
-        self.file_model.setNameFilters(['*.json'])
+        self.file_model.setNameFilters(LOG_FILE_PATTERNS)
         self.file_model.setNameFilterDisables(False)
 
         # ツリービュー
@@ -1146,9 +2186,32 @@ class SensorLogViewer(QMainWindow):
     def _on_file_tree_clicked(self, index):
         """ファイルツリーのクリックイベント"""
         file_path = self.file_model.filePath(index)
-        if file_path.endswith('.json') and Path(file_path).is_file():
+        if file_path.endswith(LOG_FILE_SUFFIXES) and Path(file_path).is_file():
             self._load_file(file_path)
 
+    def _create_web_profile(self):
+        """地図用のWebEngineプロファイルを作成（HTTPキャッシュをディスクに保存）"""
+        _, _, QWebEngineProfile = _import_webengine()
+        # ページより先に破棄されないようアプリケーションを親にする
+        profile = QWebEngineProfile('sensor-log-viewer', QApplication.instance())
+        profile.setHttpCacheType(QWebEngineProfile.DiskHttpCache)
+        profile.setCachePath(str(WEB_CACHE_DIR))
+        return profile
+
+    def _create_lazy_map(self, html, combo):
+        """タブ表示時にWebViewを生成する地図を作成し、地図タイプの選択と連動させる"""
+        map_view = LazyMapView(html, self._create_map_view)
+        combo.currentIndexChanged.connect(lambda: self._change_map_type(map_view, combo))
+        return map_view
+
+    def _create_map_view(self, html):
+        """地図用のWebEngineViewを作成（HTMLは生成時に1回だけ読み込み、以降はJS呼び出しで更新）"""
+        QWebEngineView, QWebEnginePage, _ = _import_webengine()
+        view = QWebEngineView()
+        view.setPage(QWebEnginePage(self._web_profile, view))
+        view.setHtml(html, QUrl(MAP_BASE_URL))
+        return view
+
     def _setup_ui(self):
         """UIの設定"""
         central_widget = QWidget()
@@ -1176,11 +2239,13 @@ class SensorLogViewer(QMainWindow):
         self.gravity_plot = pg.PlotWidget(title='Gravity (G)')
         self.gravity_plot.addLegend()
         self.gravity_plot.showGrid(x=True, y=True)
+        self.gravity_curves = self._add_curves(self.gravity_plot, self.XYZ_CURVES)
         motion_layout.addWidget(self.gravity_plot)
 
         self.accel_plot = pg.PlotWidget(title='User Acceleration (G)')
         self.accel_plot.addLegend()
         self.accel_plot.showGrid(x=True, y=True)
+        self.accel_curves = self._add_curves(self.accel_plot, self.XYZ_CURVES)
         motion_layout.addWidget(self.accel_plot)
 
         self.tab_widget.addTab(motion_widget, 'Acceleration')
@@ -1192,11 +2257,13 @@ class SensorLogViewer(QMainWindow):
         self.attitude_plot = pg.PlotWidget(title='Attitude (degrees)')
         self.attitude_plot.addLegend()
         self.attitude_plot.showGrid(x=True, y=True)
+        self.attitude_curves = self._add_curves(self.attitude_plot, self.ATTITUDE_CURVES)
         attitude_layout.addWidget(self.attitude_plot)
 
         self.gyro_plot = pg.PlotWidget(title='Gyroscope (rad/s)')
         self.gyro_plot.addLegend()
         self.gyro_plot.showGrid(x=True, y=True)
+        self.gyro_curves = self._add_curves(self.gyro_plot, self.XYZ_CURVES)
         attitude_layout.addWidget(self.gyro_plot)
 
         self.tab_widget.addTab(attitude_widget, 'Attitude')
@@ -1208,6 +2275,7 @@ class SensorLogViewer(QMainWindow):
         self.magnetic_plot = pg.PlotWidget(title='Magnetic Field (μT)')
         self.magnetic_plot.addLegend()
         self.magnetic_plot.showGrid(x=True, y=True)
+        self.magnetic_curves = self._add_curves(self.magnetic_plot, self.XYZ_CURVES)
         magnetic_layout.addWidget(self.magnetic_plot)
 
         self.tab_widget.addTab(magnetic_widget, 'Magnetic')
@@ -1229,11 +2297,7 @@ class SensorLogViewer(QMainWindow):
         gps_splitter = QSplitter(Qt.Horizontal)
 
         # 左: 地図
-        self.map_view = QWebEngineView()
-        self.map_view.setHtml(MAP_HTML)
-        self.gps_map_combo.currentIndexChanged.connect(
-            lambda: self._change_map_type(self.map_view, self.gps_map_combo)
-        )
+        self.map_view = self._create_lazy_map(MAP_HTML, self.gps_map_combo)
         gps_splitter.addWidget(self.map_view)
 
         # 右: グラフ
@@ -1242,14 +2306,20 @@ class SensorLogViewer(QMainWindow):
 
         self.altitude_plot = pg.PlotWidget(title='Altitude (m)')
         self.altitude_plot.showGrid(x=True, y=True)
+        self.altitude_curve, = self._add_curves(
+            self.altitude_plot, [('#5CD8FF', None)])  # 明るいシアン
         gps_graphs_layout.addWidget(self.altitude_plot)
 
         self.speed_plot = pg.PlotWidget(title='Speed (m/s)')
         self.speed_plot.showGrid(x=True, y=True)
+        self.speed_curve, = self._add_curves(
+            self.speed_plot, [('#69DB7C', None)])  # 明るい緑
         gps_graphs_layout.addWidget(self.speed_plot)
 
         self.accuracy_plot = pg.PlotWidget(title='GPS Accuracy (m)')
         self.accuracy_plot.showGrid(x=True, y=True)
+        self.accuracy_curve, = self._add_curves(
+            self.accuracy_plot, [('#FFA94D', None)])  # 明るいオレンジ
         gps_graphs_layout.addWidget(self.accuracy_plot)
 
         gps_splitter.addWidget(gps_graphs)
@@ -1276,11 +2346,7 @@ class SensorLogViewer(QMainWindow):
         dr_splitter = QSplitter(Qt.Horizontal)
 
         # 左: 地図（DR比較用）
-        self.dr_map_view = QWebEngineView()
-        self.dr_map_view.setHtml(MAP_HTML)
-        self.dr_map_combo.currentIndexChanged.connect(
-            lambda: self._change_map_type(self.dr_map_view, self.dr_map_combo)
-        )
+        self.dr_map_view = self._create_lazy_map(MAP_HTML, self.dr_map_combo)
         dr_splitter.addWidget(self.dr_map_view)
 
         # 右: グラフ
@@ -1290,14 +2356,21 @@ class SensorLogViewer(QMainWindow):
         self.dr_speed_plot = pg.PlotWidget(title='DR Speed (m/s)')
         self.dr_speed_plot.showGrid(x=True, y=True)
         self.dr_speed_plot.addLegend()
+        self.dr_gps_speed_curve, self.dr_speed_curve = self._add_curves(
+            self.dr_speed_plot, [('#4DABF7', 'GPS'),   # 明るい青
+                                 ('#DA77F2', 'DR')])   # 明るい紫
         dr_graphs_layout.addWidget(self.dr_speed_plot)
 
         self.dr_heading_plot = pg.PlotWidget(title='DR Heading (deg)')
         self.dr_heading_plot.showGrid(x=True, y=True)
+        self.dr_heading_curve, = self._add_curves(
+            self.dr_heading_plot, [('#DA77F2', None)])  # 明るい紫
         dr_graphs_layout.addWidget(self.dr_heading_plot)
 
         self.dr_error_plot = pg.PlotWidget(title='DR vs GPS Distance (m)')
         self.dr_error_plot.showGrid(x=True, y=True)
+        self.dr_error_curve, = self._add_curves(
+            self.dr_error_plot, [('#FFA94D', None)])  # 明るいオレンジ
         dr_graphs_layout.addWidget(self.dr_error_plot)
 
         dr_splitter.addWidget(dr_graphs)
@@ -1325,11 +2398,8 @@ class SensorLogViewer(QMainWindow):
         integrated_splitter = QSplitter(Qt.Vertical)
 
         # 統合航跡用の地図
-        self.integrated_map_view = QWebEngineView()
-        self.integrated_map_view.setHtml(INTEGRATED_MAP_HTML)
-        self.integrated_map_combo.currentIndexChanged.connect(
-            lambda: self._change_map_type(self.integrated_map_view, self.integrated_map_combo)
-        )
+        self.integrated_map_view = self._create_lazy_map(
+            INTEGRATED_MAP_HTML, self.integrated_map_combo)
         integrated_splitter.addWidget(self.integrated_map_view)
 
         # 標高断面図
@@ -1341,9 +2411,34 @@ class SensorLogViewer(QMainWindow):
         self.elevation_plot.showGrid(x=True, y=True)
         self.elevation_plot.setLabel('bottom', '距離', 'm')
         self.elevation_plot.setLabel('left', '標高', 'm')
+        self.elevation_plot.setDownsampling(auto=True, mode='peak')
+        self.elevation_plot.setClipToView(True)
         self.elevation_plot.addLegend()
         elevation_layout.addWidget(self.elevation_plot)
 
+        # 断面図の曲線と区間選択は一度だけ作り、読み込みごとに setData で差し替える
+        # 地形断面: 線と、最低標高-10mの基線との間の塗りつぶし
+        self.terrain_curve = pg.PlotDataItem(pen=self._pen('#718096'), name='地形標高')
+        self._terrain_base = pg.PlotDataItem()
+        self.elevation_plot.addItem(pg.FillBetweenItem(
+            self.terrain_curve, self._terrain_base, brush=pg.mkBrush('#4a5568')))
+        self.elevation_plot.addItem(self.terrain_curve)
+        # GPS高度（地図のGPS Good色と統一: #118ab2）
+        self.elevation_gps_curve = self.elevation_plot.plot(
+            pen=self._pen('#118ab2'), name='GPS高度')
+        # 融合高度（地図のFusion色と統一: #00CED1）
+        self.elevation_fused_curve = self.elevation_plot.plot(
+            pen=self._pen('#00CED1'), name='融合高度(GPS+気圧計)')
+
+        # 区間選択（データを読み込むまで非表示）
+        self._elevation_region = pg.LinearRegionItem(
+            brush=pg.mkBrush(255, 165, 0, 50),  # オレンジ半透明
+            movable=True
+        )
+        self._elevation_region.setVisible(False)
+        self.elevation_plot.addItem(self._elevation_region)
+        self._elevation_region.sigRegionChanged.connect(self._on_elevation_region_changed)
+
         integrated_splitter.addWidget(elevation_widget)
         integrated_splitter.setSizes([500, 200])  # 地図:断面図 = 5:2
 
@@ -1401,28 +2496,84 @@ class SensorLogViewer(QMainWindow):
         self.statusBar = QStatusBar()
         self.setStatusBar(self.statusBar)
 
+    def _add_curves(self, plot, styles):
+        """時系列グラフに再利用する曲線を追加（styles: (色, 凡例名) の並び）
+
+        データはファイル読み込みごとに setData で差し替える。表示範囲外は描画せず、
+        点数が多い場合は表示幅に合わせてピーク保持で間引く。
+        """
+        plot.setDownsampling(auto=True, mode='peak')
+        plot.setClipToView(True)
+        plot.setLabel('bottom', 'Time', 's')
+        return [plot.plot(pen=self._pen(color), name=name)
+                for color, name in styles]
+
+    def _pen(self, color):
+        """線のペン（幅2）を色ごとに1つだけ作って共有する"""
+        pen = self._pens.get(color)
+        if pen is None:
+            pen = self._pens[color] = pg.mkPen(color, width=2)
+        return pen
+
     def _open_file(self):
         """ファイルを開く"""
         file_path, _ = QFileDialog.getOpenFileName(
             self, 'Open Sensor Log', '',
-            'JSON Files (*.json);;All Files (*)'
+            'Sensor Logs (*.ndjson.gz *.json);;All Files (*)'
         )
 
         if file_path:
             self._load_file(file_path)
 
     def _load_file(self, file_path):
-        """ファイルを読み込む"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                self.log_data = json.load(f)
+        """ファイルを読み込む（パースとデータ抽出はワーカースレッドで実行）"""
+        if self._load_thread is not None:
+            self.statusBar.showMessage('Still loading the previous file')
+            return
 
-            self.records = self.log_data.get('records', [])
+        self.statusBar.showMessage(f'Loading {Path(file_path).name}...')
+        self.file_tree.setEnabled(False)
+
+        thread = QThread(self)
+        worker = LogLoadWorker(file_path)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.loaded.connect(self._on_file_loaded)
+        worker.failed.connect(self._on_file_load_failed)
+        worker.loaded.connect(thread.quit)
+        worker.failed.connect(thread.quit)
+        thread.finished.connect(self._on_load_thread_finished)
+        thread.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+
+        # 完了までワーカーを参照しておく（GCで破棄されないように）
+        self._load_thread = thread
+        self._load_worker = worker
+        thread.start()
+
+    def _on_load_thread_finished(self):
+        """ワーカースレッドの終了後に次の読み込みを受け付ける"""
+        self._load_thread = None
+        self._load_worker = None
+        self.file_tree.setEnabled(True)
+
+    def _on_file_load_failed(self, message):
+        """読み込みエラーを表示"""
+        self.statusBar.showMessage(f'Error loading file: {message}')
+
+    def _on_file_loaded(self, file_path, log_data, data):
+        """ワーカースレッドで読み込んだ結果を反映（メインスレッド）"""
+        try:
+            self.log_data = log_data
+            self.records = log_data.get('records', [])
 
-            if not self.records:
+            if data is None:
                 self.statusBar.showMessage('No records found in file')
                 return
 
+            self._apply_sensor_data(data)
+
+            self.current_file = str(file_path)
             self.file_label.setText(Path(file_path).name)
             self._update_metadata()
             self._plot_data()
@@ -1432,6 +2583,39 @@ class SensorLogViewer(QMainWindow):
         except Exception as e:
             self.statusBar.showMessage(f'Error loading file: {e}')
 
+    def _apply_sensor_data(self, data):
+        """ワーカースレッドで抽出したSensorLogDataの配列をビューアに反映"""
+        self.sensor_data = data.sensor_data
+        self.time_array = data.time_array
+
+        # 時系列グラフ
+        self.gravity_x, self.gravity_y, self.gravity_z = data.gravity_x, data.gravity_y, data.gravity_z
+        self.accel_x, self.accel_y, self.accel_z = data.accel_x, data.accel_y, data.accel_z
+        self.roll, self.pitch, self.yaw = data.roll, data.pitch, data.yaw
+        self.gyro_x, self.gyro_y, self.gyro_z = data.gyro_x, data.gyro_y, data.gyro_z
+        self.mag_x, self.mag_y, self.mag_z = data.mag_x, data.mag_y, data.mag_z
+
+        # GPS
+        self.gps_lat = data.gps_lat
+        self.gps_lon = data.gps_lon
+        self.gps_alt = data.gps_alt
+        self.gps_speed = data.gps_speed
+        self.gps_accuracy = data.gps_accuracy
+        self.gps_time = data.gps_time
+
+        # デッドレコニング・INS軌跡
+        self.dr_lat = data.dr_lat
+        self.dr_lon = data.dr_lon
+        self.dr_speed = data.dr_speed
+        self.dr_heading = data.dr_heading
+        self.dr_time = data.dr_time
+        self.ins_lat = data.ins_lat
+        self.ins_lon = data.ins_lon
+
+        # 統合航跡・標高断面図
+        self.track_points = data.track_points
+        self.track_distance = data.track_distance
+
     def _update_metadata(self):
         """メタデータを更新"""
         if not self.log_data:
@@ -1456,11 +2640,19 @@ Records: {record_count}"""
 
             stats_text = f"""Duration: {duration:.1f}s ({duration/60:.1f}min)
 Avg Rate: {len(self.records)/max(duration, 0.1):.1f}Hz
-Start: {self.records[0].get('datetime', 'N/A')[:19]}
-End: {self.records[-1].get('datetime', 'N/A')[:19]}"""
+Start: {self._format_record_datetime(self.records[0])}
+End: {self._format_record_datetime(self.records[-1])}"""
 
             self.stats_label.setText(stats_text)
 
+    def _format_record_datetime(self, record):
+        """レコードの日時を表示用文字列に変換"""
+        if 'datetime' in record:
+            return record['datetime'][:19]
+        if 'timestamp' in record:
+            return datetime.fromtimestamp(record['timestamp']).isoformat()[:19]
+        return 'N/A'
+
     def _setup_map_combo(self, combo):
         """地図選択コンボボックスをセットアップ"""
         combo.addItem('Google Maps', 'google_map')
@@ -1476,354 +2668,64 @@ End: {self.records[-1].get('datetime', 'N/A')[:19]}"""
         map_type = combo.currentData()
         if map_type:
             js = f'setMapType("{map_type}");'
-            map_view.page().runJavaScript(js)
-
-    def _extract_sensor_data(self):
-        """センサーデータを抽出"""
-        n = len(self.records)
-
-        # 時間配列
-        self.time_array = np.zeros(n)
-
-        # 重力
-        self.gravity_x = np.zeros(n)
-        self.gravity_y = np.zeros(n)
-        self.gravity_z = np.zeros(n)
-
-        # ユーザー加速度
-        self.accel_x = np.zeros(n)
-        self.accel_y = np.zeros(n)
-        self.accel_z = np.zeros(n)
-
-        # 姿勢
-        self.roll = np.zeros(n)
-        self.pitch = np.zeros(n)
-        self.yaw = np.zeros(n)
-
-        # ジャイロ
-        self.gyro_x = np.zeros(n)
-        self.gyro_y = np.zeros(n)
-        self.gyro_z = np.zeros(n)
-
-        # 磁場
-        self.mag_x = np.zeros(n)
-        self.mag_y = np.zeros(n)
-        self.mag_z = np.zeros(n)
-
-        # GPS
-        self.gps_lat = []
-        self.gps_lon = []
-        self.gps_alt = []
-        self.gps_speed = []
-        self.gps_accuracy = []
-        self.gps_time = []
-
-        # デッドレコニング
-        self.dr_lat = []
-        self.dr_lon = []
-        self.dr_speed = []
-        self.dr_heading = []
-        self.dr_time = []
-
-        first_time = self.records[0].get('timestamp', 0)
-
-        for i, rec in enumerate(self.records):
-            t = rec.get('timestamp', 0) - first_time
-            self.time_array[i] = t
-
-            sensors = rec.get('sensors', {})
-
-            # 重力
-            gravity = sensors.get('gravity')
-            if gravity:
-                self.gravity_x[i] = gravity.get('x', 0)
-                self.gravity_y[i] = gravity.get('y', 0)
-                self.gravity_z[i] = gravity.get('z', 0)
-
-            # ユーザー加速度
-            accel = sensors.get('user_acceleration')
-            if accel:
-                self.accel_x[i] = accel.get('x', 0)
-                self.accel_y[i] = accel.get('y', 0)
-                self.accel_z[i] = accel.get('z', 0)
-
-            # 姿勢
-            attitude = sensors.get('attitude')
-            if attitude:
-                self.roll[i] = attitude.get('roll_deg', 0)
-                self.pitch[i] = attitude.get('pitch_deg', 0)
-                self.yaw[i] = attitude.get('yaw_deg', 0)
-
-            # ジャイロ
-            gyro = sensors.get('gyro_calculated')
-            if gyro:
-                self.gyro_x[i] = gyro.get('x', 0)
-                self.gyro_y[i] = gyro.get('y', 0)
-                self.gyro_z[i] = gyro.get('z', 0)
-
-            # 磁場
-            mag = sensors.get('magnetic_field')
-            if mag:
-                self.mag_x[i] = mag.get('x', 0)
-                self.mag_y[i] = mag.get('y', 0)
-                self.mag_z[i] = mag.get('z', 0)
-
-            # GPS
-            gps = rec.get('gps', {})
-            raw = gps.get('raw')
-            if raw and not gps.get('no_signal', True):
-                self.gps_lat.append(raw.get('latitude', 0))
-                self.gps_lon.append(raw.get('longitude', 0))
-                self.gps_alt.append(raw.get('altitude', 0))
-                self.gps_speed.append(raw.get('speed_clamped', 0))
-                self.gps_accuracy.append(raw.get('horizontal_accuracy', 0))
-                self.gps_time.append(t)
-
-            # デッドレコニング
-            dr = rec.get('dead_reckoning', {})
-            if dr.get('active'):
-                result = dr.get('result', {})
-                if result:
-                    self.dr_lat.append(result.get('latitude', 0))
-                    self.dr_lon.append(result.get('longitude', 0))
-                    self.dr_speed.append(result.get('speed', 0))
-                    self.dr_heading.append(result.get('heading_deg', 0))
-                    self.dr_time.append(t)
-
-        # リストをnumpy配列に変換
-        self.gps_lat = np.array(self.gps_lat)
-        self.gps_lon = np.array(self.gps_lon)
-        self.gps_alt = np.array(self.gps_alt)
-        self.gps_speed = np.array(self.gps_speed)
-        self.gps_accuracy = np.array(self.gps_accuracy)
-        self.gps_time = np.array(self.gps_time)
-
-        self.dr_lat = np.array(self.dr_lat)
-        self.dr_lon = np.array(self.dr_lon)
-        self.dr_speed = np.array(self.dr_speed)
-        self.dr_heading = np.array(self.dr_heading)
-        self.dr_time = np.array(self.dr_time)
-
-        # INS（慣性航法）軌跡を計算
-        self._calculate_ins_track()
-
-    def _calculate_ins_track(self):
-        """GPS/INS融合で軌跡を計算"""
-        self.ins_lat = []
-        self.ins_lon = []
-
-        # 開始位置がない場合は計算しない
-        if len(self.gps_lat) == 0:
-            return
-
-        start_lat = self.gps_lat[0]
-        start_lon = self.gps_lon[0]
-
-        # GPS/INS融合インスタンスを作成
-        fusion = GPSINSFusion(start_lat, start_lon)
-
-        # 全レコードを処理
-        prev_time = None
-        for i, rec in enumerate(self.records):
-            t = rec.get('timestamp', 0)
-
-            if prev_time is None:
-                prev_time = t
-                continue
-
-            dt = t - prev_time
-            prev_time = t
-
-            # センサーデータを取得
-            sensors = rec.get('sensors', {})
-
-            # ユーザー加速度
-            user_accel = None
-            accel_data = sensors.get('user_acceleration')
-            if accel_data:
-                user_accel = (
-                    accel_data.get('x', 0),
-                    accel_data.get('y', 0),
-                    accel_data.get('z', 0)
-                )
-
-            # 姿勢（ラジアン）
-            attitude = None
-            att_data = sensors.get('attitude')
-            if att_data:
-                attitude = (
-                    att_data.get('roll_rad', 0),
-                    att_data.get('pitch_rad', 0),
-                    att_data.get('yaw_rad', 0)
-                )
-
-            # INS更新（予測ステップ）
-            fusion.update_ins(user_accel, attitude, dt, timestamp=t)
-
-            # GPS更新（測定ステップ）- 有効なGPSがあれば補正
-            gps = rec.get('gps', {})
-            raw = gps.get('raw')
-            if raw and not gps.get('no_signal', True):
-                lat = raw.get('latitude', 0)
-                lon = raw.get('longitude', 0)
-                speed = raw.get('speed_clamped', raw.get('speed', -1))
-                course = raw.get('course', -1)
-                accuracy = raw.get('horizontal_accuracy', 100)
-                timestamp = raw.get('timestamp')
-
-                fusion.update_gps(lat, lon, speed, course, accuracy, timestamp)
-
-        # 軌跡を取得（間引いて保存）
-        track = fusion.get_track()
-        step = max(1, len(track) // 500)  # 最大500点に間引き
-        for i in range(0, len(track), step):
-            lat, lon = track[i]
-            self.ins_lat.append(lat)
-            self.ins_lon.append(lon)
-
-        # 最後の点を確実に含める
-        if len(track) > 0:
-            last_lat, last_lon = track[-1]
-            if len(self.ins_lat) == 0 or (self.ins_lat[-1] != last_lat or self.ins_lon[-1] != last_lon):
-                self.ins_lat.append(last_lat)
-                self.ins_lon.append(last_lon)
-
-        self.ins_lat = np.array(self.ins_lat)
-        self.ins_lon = np.array(self.ins_lon)
+            map_view.run_js(js, 'map_type')
 
     def _plot_data(self):
         """データをプロット"""
-        self._extract_sensor_data()
-
-        # プロット用の鮮やかな色（ダークテーマ用）
-        pen_x = pg.mkPen('#FF6B6B', width=2)  # 鮮やかな赤
-        pen_y = pg.mkPen('#4ECB71', width=2)  # 鮮やかな緑
-        pen_z = pg.mkPen('#4DABF7', width=2)  # 鮮やかな青
+        t = self.time_array
+        plots = (
+            (self.gravity_curves, (self.gravity_x, self.gravity_y, self.gravity_z)),
+            (self.accel_curves, (self.accel_x, self.accel_y, self.accel_z)),
+            (self.attitude_curves, (self.roll, self.pitch, self.yaw)),
+            (self.gyro_curves, (self.gyro_x, self.gyro_y, self.gyro_z)),
+            (self.magnetic_curves, (self.mag_x, self.mag_y, self.mag_z)),
+        )
+        for curves, values in plots:
+            for curve, y in zip(curves, values):
+                curve.setData(t, y)
 
-        # 重力プロット
-        self.gravity_plot.clear()
-        self.gravity_plot.addLegend()
-        self.gravity_plot.plot(self.time_array, self.gravity_x,
-                               pen=pen_x, name='X')
-        self.gravity_plot.plot(self.time_array, self.gravity_y,
-                               pen=pen_y, name='Y')
-        self.gravity_plot.plot(self.time_array, self.gravity_z,
-                               pen=pen_z, name='Z')
-        self.gravity_plot.setLabel('bottom', 'Time', 's')
-
-        # 加速度プロット
-        self.accel_plot.clear()
-        self.accel_plot.addLegend()
-        self.accel_plot.plot(self.time_array, self.accel_x,
-                             pen=pen_x, name='X')
-        self.accel_plot.plot(self.time_array, self.accel_y,
-                             pen=pen_y, name='Y')
-        self.accel_plot.plot(self.time_array, self.accel_z,
-                             pen=pen_z, name='Z')
-        self.accel_plot.setLabel('bottom', 'Time', 's')
-
-        # 姿勢プロット
-        pen_roll = pg.mkPen('#FF8787', width=2)   # ピンク系赤
-        pen_pitch = pg.mkPen('#69DB7C', width=2)  # 明るい緑
-        pen_yaw = pg.mkPen('#74C0FC', width=2)    # 明るい青
-
-        self.attitude_plot.clear()
-        self.attitude_plot.addLegend()
-        self.attitude_plot.plot(self.time_array, self.roll,
-                                pen=pen_roll, name='Roll')
-        self.attitude_plot.plot(self.time_array, self.pitch,
-                                pen=pen_pitch, name='Pitch')
-        self.attitude_plot.plot(self.time_array, self.yaw,
-                                pen=pen_yaw, name='Yaw')
-        self.attitude_plot.setLabel('bottom', 'Time', 's')
-
-        # ジャイロプロット
-        self.gyro_plot.clear()
-        self.gyro_plot.addLegend()
-        self.gyro_plot.plot(self.time_array, self.gyro_x,
-                            pen=pen_x, name='X')
-        self.gyro_plot.plot(self.time_array, self.gyro_y,
-                            pen=pen_y, name='Y')
-        self.gyro_plot.plot(self.time_array, self.gyro_z,
-                            pen=pen_z, name='Z')
-        self.gyro_plot.setLabel('bottom', 'Time', 's')
-
-        # 磁場プロット
-        self.magnetic_plot.clear()
-        self.magnetic_plot.addLegend()
-        self.magnetic_plot.plot(self.time_array, self.mag_x,
-                                pen=pen_x, name='X')
-        self.magnetic_plot.plot(self.time_array, self.mag_y,
-                                pen=pen_y, name='Y')
-        self.magnetic_plot.plot(self.time_array, self.mag_z,
-                                pen=pen_z, name='Z')
-        self.magnetic_plot.setLabel('bottom', 'Time', 's')
+        # GPS地図とDR地図には同じ軌跡を描くので、JSは1回だけ生成して共有する
+        track_js = self._gps_track_js() if len(self.gps_lat) > 0 else None
 
         # GPSプロット
-        self._plot_gps()
+        self._plot_gps(track_js)
 
         # デッドレコニングプロット
-        self._plot_dead_reckoning()
+        self._plot_dead_reckoning(track_js)
 
         # 統合航跡プロット
         self._plot_integrated_track()
 
-    def _plot_gps(self):
-        """GPSデータをプロット"""
-        self.altitude_plot.clear()
-        self.speed_plot.clear()
-        self.accuracy_plot.clear()
+    def _plot_gps(self, track_js):
+        """GPSデータをプロット（track_jsは_gps_track_jsで生成した地図描画JS）"""
+        self.altitude_curve.setData(self.gps_time, self.gps_alt)
+        self.speed_curve.setData(self.gps_time, self.gps_speed)
+        self.accuracy_curve.setData(self.gps_time, self.gps_accuracy)
 
         if len(self.gps_lat) == 0:
             self.gps_info_label.setText('No GPS data')
             return
 
         # 地図に軌跡を表示（精度情報付き）
-        gps_data = [
-            {'lat': float(lat), 'lon': float(lon), 'accuracy': float(acc)}
-            for lat, lon, acc in zip(self.gps_lat, self.gps_lon, self.gps_accuracy)
-        ]
-
-        dr_coords = []
-        if len(self.dr_lat) > 0:
-            dr_coords = [[float(lat), float(lon)]
-                         for lat, lon in zip(self.dr_lat, self.dr_lon)]
-
-        ins_coords = []
-        if len(self.ins_lat) > 0:
-            ins_coords = [[float(lat), float(lon)]
-                          for lat, lon in zip(self.ins_lat, self.ins_lon)]
-
-        js = f'setGPSTrackWithAccuracy({json.dumps(gps_data)}, {json.dumps(dr_coords)}, {json.dumps(ins_coords)});'
-        self.map_view.page().runJavaScript(js)
-
-        # グラフ（鮮やかな色）
-        self.altitude_plot.plot(self.gps_time, self.gps_alt,
-                                pen=pg.mkPen('#5CD8FF', width=2))  # 明るいシアン
-        self.altitude_plot.setLabel('bottom', 'Time', 's')
-
-        self.speed_plot.plot(self.gps_time, self.gps_speed,
-                             pen=pg.mkPen('#69DB7C', width=2))  # 明るい緑
-        self.speed_plot.setLabel('bottom', 'Time', 's')
-
-        self.accuracy_plot.plot(self.gps_time, self.gps_accuracy,
-                                pen=pg.mkPen('#FFA94D', width=2))  # 明るいオレンジ
-        self.accuracy_plot.setLabel('bottom', 'Time', 's')
+        self.map_view.run_js(track_js, 'track')
 
         # GPS情報
-        lat_center = np.mean(self.gps_lat)
-        lon_center = np.mean(self.gps_lon)
+        lat_center = self.gps_lat.mean()
+        lon_center = self.gps_lon.mean()
 
+        # 中心緯度での平面近似（中心からの平行移動は差分で消えるので隣接点の差分だけ換算する）
         lat_to_m = 111320
-        lon_to_m = 111320 * np.cos(np.radians(lat_center))
+        lon_to_m = 111320 * math.cos(math.radians(lat_center))
 
-        x = (self.gps_lon - lon_center) * lon_to_m
-        y = (self.gps_lat - lat_center) * lat_to_m
+        dx = np.diff(self.gps_lon)
+        dx *= lon_to_m
+        dy = np.diff(self.gps_lat)
+        dy *= lat_to_m
 
-        total_dist = np.sum(np.sqrt(np.diff(x)**2 + np.diff(y)**2))
-        avg_speed = np.mean(self.gps_speed)
-        max_speed = np.max(self.gps_speed)
-        avg_accuracy = np.mean(self.gps_accuracy)
+        total_dist = np.hypot(dx, dy).sum()
+        avg_speed = self.gps_speed.mean()
+        max_speed = self.gps_speed.max()
+        avg_accuracy = self.gps_accuracy.mean()
 
         gps_text = f"""Points: {len(self.gps_lat)}
 Center: {lat_center:.6f}, {lon_center:.6f}
@@ -1831,61 +2733,73 @@ Distance: {total_dist:.1f}m
 Avg Speed: {avg_speed:.2f}m/s
 Max Speed: {max_speed:.2f}m/s
 Avg Accuracy: {avg_accuracy:.1f}m
-Alt: {np.min(self.gps_alt):.1f} - {np.max(self.gps_alt):.1f}m"""
+Alt: {self.gps_alt.min():.1f} - {self.gps_alt.max():.1f}m"""
 
         self.gps_info_label.setText(gps_text)
 
-    def _plot_dead_reckoning(self):
-        """デッドレコニングデータをプロット"""
-        self.dr_speed_plot.clear()
-        self.dr_speed_plot.addLegend()
-        self.dr_heading_plot.clear()
-        self.dr_error_plot.clear()
+    def _gps_track_js(self):
+        """GPS軌跡（精度レベル別に区間分け済み）とDR・INS軌跡を描画するJSを生成"""
+        levels = np.searchsorted(GPS_ACCURACY_THRESHOLDS, self.gps_accuracy, side='right')
+
+        # 表示上区別できない点を間引く（色の切り替わり前後の点は残す）
+        level_changed = np.zeros(len(levels), dtype=bool)
+        level_changed[1:] = np.diff(levels) != 0
+        level_changed[:-1] |= level_changed[1:]
+        gps_idx = decimate_track(self.gps_lat, self.gps_lon, keep=level_changed)
+        gps_lat = np.asarray(self.gps_lat)[gps_idx]
+        gps_lon = np.asarray(self.gps_lon)[gps_idx]
+        levels = levels[gps_idx]
+
+        # 精度レベルが変わる位置で区切る（新しい区間は前のポイントから始める）
+        breaks = np.flatnonzero(np.diff(levels)) + 1
+        starts = np.concatenate(([0], breaks - 1))
+        ends = np.concatenate((breaks, [len(levels)]))
+
+        segments = [
+            [GPS_ACCURACY_LEVELS[levels[end - 1]], start, end]
+            for start, end in zip(starts.tolist(), ends.tolist())
+            if end - start >= 2
+        ]
 
-        if len(self.gps_lat) == 0:
+        # 座標はJSON化せずバイナリ（base64）で渡す
+        dr_idx = decimate_track(self.dr_lat, self.dr_lon)
+        gps_b64 = encode_coords(gps_lat, gps_lon)
+        dr_b64 = encode_coords(np.asarray(self.dr_lat)[dr_idx], np.asarray(self.dr_lon)[dr_idx])
+        ins_b64 = encode_coords(self.ins_lat, self.ins_lon)
+
+        return (f'drawGPSTrackBinary("{gps_b64}", {json_dumps(segments)}, '
+                f'"{dr_b64}", "{ins_b64}", {json_dumps(self.current_file)});')
+
+    def _plot_dead_reckoning(self, track_js):
+        """デッドレコニングデータをプロット（track_jsは_plot_gpsと共有する地図描画JS）"""
+        # GPS速度とDR速度・方位・GPSとの距離（GPSがない場合は空にする）
+        has_gps = len(self.gps_lat) > 0
+        if has_gps:
+            self.dr_gps_speed_curve.setData(self.gps_time, self.gps_speed)
+            self.dr_speed_curve.setData(self.dr_time, self.dr_speed)
+            self.dr_heading_curve.setData(self.dr_time, self.dr_heading)
+
+            # GPS位置をDRの時刻に線形補間し、全点の距離をまとめて計算
+            gps_lat = np.interp(self.dr_time, self.gps_time, self.gps_lat)
+            gps_lon = np.interp(self.dr_time, self.gps_time, self.gps_lon)
+            dr_error = haversine_vec(self.dr_lat, self.dr_lon, gps_lat, gps_lon)
+            self.dr_error_curve.setData(self.dr_time, dr_error)
+        else:
+            for curve in (self.dr_gps_speed_curve, self.dr_speed_curve,
+                          self.dr_heading_curve, self.dr_error_curve):
+                curve.clear()
+
+        if not has_gps:
             self.dr_info_label.setText('No GPS data')
             return
 
         # DR地図（精度情報付き）
-        gps_data = [
-            {'lat': float(lat), 'lon': float(lon), 'accuracy': float(acc)}
-            for lat, lon, acc in zip(self.gps_lat, self.gps_lon, self.gps_accuracy)
-        ]
-
-        dr_coords = []
-        if len(self.dr_lat) > 0:
-            dr_coords = [[float(lat), float(lon)]
-                         for lat, lon in zip(self.dr_lat, self.dr_lon)]
-
-        ins_coords = []
-        if len(self.ins_lat) > 0:
-            ins_coords = [[float(lat), float(lon)]
-                          for lat, lon in zip(self.ins_lat, self.ins_lon)]
-
-        js = f'setGPSTrackWithAccuracy({json.dumps(gps_data)}, {json.dumps(dr_coords)}, {json.dumps(ins_coords)});'
-        self.dr_map_view.page().runJavaScript(js)
-
-        # GPS速度も表示（明るい青）
-        if len(self.gps_time) > 0:
-            self.dr_speed_plot.plot(self.gps_time, self.gps_speed,
-                                    pen=pg.mkPen('#4DABF7', width=2),
-                                    name='GPS')
+        self.dr_map_view.run_js(track_js, 'track')
 
         if len(self.dr_lat) == 0:
             self.dr_info_label.setText('No Dead Reckoning data')
             return
 
-        # DR速度（明るい紫）
-        self.dr_speed_plot.plot(self.dr_time, self.dr_speed,
-                                pen=pg.mkPen('#DA77F2', width=2),
-                                name='DR')
-        self.dr_speed_plot.setLabel('bottom', 'Time', 's')
-
-        # DR方位（明るい紫）
-        self.dr_heading_plot.plot(self.dr_time, self.dr_heading,
-                                  pen=pg.mkPen('#DA77F2', width=2))
-        self.dr_heading_plot.setLabel('bottom', 'Time', 's')
-
         # DR情報
         dr_text = f"""DR Points: {len(self.dr_lat)}
 Duration: {self.dr_time[-1] - self.dr_time[0]:.1f}s
@@ -1896,99 +2810,35 @@ Max Speed: {np.max(self.dr_speed):.2f}m/s"""
 
     def _plot_integrated_track(self):
         """統合航跡を計算してプロット"""
-        if len(self.records) == 0:
+        points = self.track_points
+        if len(points) == 0:
             return
 
-        # 統合航跡を計算
-        integrated_track = []  # [(lat, lon, track_type), ...]
+        lat = points['lat']
+        lon = points['lon']
+        has_fusion = points['has_fusion']
+        gps_valid = points['gps_valid']
+
+        # 色の決定: GPS精度が良ければGPS色、そうでなければFusion/Memory/INS色
+        # （Fusionがないレコードは後方互換性のためGPS位置をGPS色で描く）
+        level = np.searchsorted(GPS_ACCURACY_THRESHOLDS[:3], points['accuracy'], side='right')
+        gps_good = gps_valid & (level < 3)
+        gps_poor = gps_valid & ~has_fusion & (level == 3)
+        memory = has_fusion & points['memory_mode'] & ~gps_good
+        fused = has_fusion & ~memory & gps_valid & (level == 3)
+        ins = has_fusion & ~memory & ~gps_valid
+        types = np.select([gps_good, gps_poor, memory, fused, ins], [level, 3, 4, 5, 6])
+
         stats = {
-            'total_distance': 0.0,
-            'gps_count': 0,
-            'fusion_count': 0,
-            'memory_count': 0,
-            'ins_count': 0,
-            'total_accuracy': 0.0,
-            'accuracy_count': 0
+            'total_distance': float(self.track_distance[-1]),
+            'gps_count': int(np.count_nonzero(gps_good | gps_poor)),
+            'fusion_count': int(np.count_nonzero(fused)),
+            'memory_count': int(np.count_nonzero(memory)),
+            'ins_count': int(np.count_nonzero(ins)),
+            'total_accuracy': float(np.sum(points['accuracy'][gps_valid])),
+            'accuracy_count': int(np.count_nonzero(gps_valid)),
         }
 
-        prev_lat, prev_lon = None, None
-
-        for rec in self.records:
-            gps = rec.get('gps', {})
-            raw = gps.get('raw')
-            fusion = rec.get('gps_ins_fusion')
-            no_signal = gps.get('no_signal', True)
-
-            lat, lon, track_type = None, None, None
-
-            # 常にFusion位置を使用（連続性確保）、色はGPS精度/モードで決定
-            if fusion:
-                lat = fusion.get('latitude')
-                lon = fusion.get('longitude')
-                fusion_mode = fusion.get('mode', 'ins')
-
-                # 色の決定: GPS精度が良ければGPS色、そうでなければFusion/Memory/INS色
-                if raw and not no_signal:
-                    accuracy = raw.get('horizontal_accuracy', 100)
-                    stats['total_accuracy'] += accuracy
-                    stats['accuracy_count'] += 1
-
-                    if accuracy < 5:
-                        track_type = 'gps_excellent'
-                        stats['gps_count'] += 1
-                    elif accuracy < 15:
-                        track_type = 'gps_good'
-                        stats['gps_count'] += 1
-                    elif accuracy < 30:
-                        track_type = 'gps_fair'
-                        stats['gps_count'] += 1
-                    else:
-                        # GPS精度が悪い場合はFusionモードで色分け
-                        if fusion_mode == 'memory_track':
-                            track_type = 'memory'
-                            stats['memory_count'] += 1
-                        else:
-                            track_type = 'fused'
-                            stats['fusion_count'] += 1
-                else:
-                    # GPS無効時はFusionモードで色分け
-                    if fusion_mode == 'memory_track':
-                        track_type = 'memory'
-                        stats['memory_count'] += 1
-                    else:
-                        track_type = 'ins'
-                        stats['ins_count'] += 1
-
-            elif raw and not no_signal:
-                # Fusionがない場合はGPSを使用（後方互換性）
-                lat = raw.get('latitude')
-                lon = raw.get('longitude')
-                accuracy = raw.get('horizontal_accuracy', 100)
-                stats['total_accuracy'] += accuracy
-                stats['accuracy_count'] += 1
-
-                if accuracy < 5:
-                    track_type = 'gps_excellent'
-                elif accuracy < 15:
-                    track_type = 'gps_good'
-                elif accuracy < 30:
-                    track_type = 'gps_fair'
-                else:
-                    track_type = 'gps_poor'
-                stats['gps_count'] += 1
-
-            if lat is not None and lon is not None:
-                # 距離計算
-                if prev_lat is not None:
-                    dist = self._haversine_distance(prev_lat, prev_lon, lat, lon)
-                    stats['total_distance'] += dist
-
-                integrated_track.append((lat, lon, track_type))
-                prev_lat, prev_lon = lat, lon
-
-        if len(integrated_track) == 0:
-            return
-
         # 統計計算
         total_points = stats['gps_count'] + stats['fusion_count'] + stats['memory_count'] + stats['ins_count']
         if total_points > 0:
@@ -2003,243 +2853,159 @@ Max Speed: {np.max(self.dr_speed):.2f}m/s"""
         else:
             stats['avg_accuracy'] = 0
 
-        # 航跡をタイプ別にセグメント化（連続性を保つ）
-        segments = []
-        current_segment = []
-        current_type = None
-
-        for lat, lon, track_type in integrated_track:
-            if track_type != current_type:
-                if len(current_segment) > 0:
-                    segments.append((current_segment, current_type))
-                    # 新しいセグメント開始時、前のセグメントの最後の点を含める（連続性確保）
-                    current_segment = [current_segment[-1], [lat, lon]]
-                else:
-                    current_segment = [[lat, lon]]
-                current_type = track_type
-            else:
-                current_segment.append([lat, lon])
-
-        if len(current_segment) > 0:
-            segments.append((current_segment, current_type))
-
-        # 地図をクリア
-        self.integrated_map_view.page().runJavaScript('clearTracks();')
-
-        # セグメントを描画
-        for coords, track_type in segments:
-            if len(coords) >= 2:
-                js = f'addTrackSegment({json.dumps(coords)}, "{track_type}");'
-                self.integrated_map_view.page().runJavaScript(js)
-
-        # 開始・終了マーカー
-        if len(integrated_track) > 0:
-            start_lat, start_lon, _ = integrated_track[0]
-            end_lat, end_lon, _ = integrated_track[-1]
-            js = f'setMarkers({start_lat}, {start_lon}, {end_lat}, {end_lon});'
-            self.integrated_map_view.page().runJavaScript(js)
-
-        # 全座標で地図をフィット
-        all_coords = [[lat, lon] for lat, lon, _ in integrated_track]
-        js = f'fitBounds({json.dumps(all_coords)});'
-        self.integrated_map_view.page().runJavaScript(js)
-
-        # 凡例と統計を表示
-        stats_json = json.dumps(stats)
-        self.integrated_map_view.page().runJavaScript(f'addLegend({stats_json});')
-        self.integrated_map_view.page().runJavaScript(f'addStats({stats_json});')
+        # 航跡をタイプが変わる位置で区切る（新しい区間は前の点から始めて連続性を保つ）
+        coords = np.column_stack((lat, lon))
+        breaks = np.flatnonzero(np.diff(types)) + 1
+        starts = np.concatenate(([0], breaks - 1))
+        ends = np.concatenate((breaks, [len(types)]))
+
+        # 地図を描き直す（セグメント・マーカー・表示範囲・凡例・統計をまとめて1回のJS呼び出しで渡す）
+        payload = {
+            'segments': [{'coords': coords[start:end], 'type': INTEGRATED_TRACK_TYPES[types[end - 1]]}
+                         for start, end in zip(starts.tolist(), ends.tolist())
+                         if end - start >= 2],
+            'start': [lat[0], lon[0]],
+            'end': [lat[-1], lon[-1]],
+            'bounds': [[lat.min(), lon.min()], [lat.max(), lon.max()]],
+            'stats': stats,
+        }
+        self.integrated_map_view.run_js(f'applyIntegratedTrack({json_dumps(payload)});', 'track')
 
         # 標高断面図を描画
-        self._plot_elevation_profile(integrated_track)
+        self._plot_elevation_profile()
 
-    def _plot_elevation_profile(self, integrated_track):
+    def _plot_elevation_profile(self):
         """標高断面図を描画"""
-        self.elevation_plot.clear()
-
-        if len(integrated_track) < 2:
+        points = self.track_points
+        if len(points) < 2:
+            self._terrain_request_id += 1  # 取得中の地形断面は表示しない
+            self._pending_terrain = None
+            for curve in (self.terrain_curve, self._terrain_base,
+                          self.elevation_gps_curve, self.elevation_fused_curve):
+                curve.clear()
+            self._elevation_region.setVisible(False)
             return
 
-        # 座標リストを作成
-        coords = [(lat, lon) for lat, lon, _ in integrated_track]
-
-        # 距離→座標の対応表を保存（Region選択用）
-        self._distance_to_coord = []
-
-        # 高度融合による推定高度を計算
-        altitude_fusion = AltitudeFusion()
-        fused_distances = []
-        fused_altitudes = []
-        gps_distances = []
-        gps_altitudes = []
-        has_barometer_data = False  # 気圧計データの有無
-
-        total_distance = 0.0
-        prev_lat, prev_lon = None, None
-        prev_time = None
-
-        for i, rec in enumerate(self.records):
-            gps = rec.get('gps', {})
-            raw = gps.get('raw')
-            sensors = rec.get('sensors', {})
-            baro = sensors.get('barometer')
-            accel = sensors.get('user_acceleration')
-            timestamp = rec.get('timestamp', 0)
-
-            # 位置を取得
-            fusion_data = rec.get('gps_ins_fusion')
-            lat, lon = None, None
-
-            if fusion_data:
-                lat = fusion_data.get('latitude')
-                lon = fusion_data.get('longitude')
-            elif raw and not gps.get('no_signal', True):
-                lat = raw.get('latitude')
-                lon = raw.get('longitude')
-
-            if lat is None or lon is None:
-                continue
-
-            # 距離計算
-            if prev_lat is not None:
-                dist = self._haversine_distance(prev_lat, prev_lon, lat, lon)
-                total_distance += dist
-
-            # dt計算
-            dt = 0.1
-            if prev_time is not None:
-                dt = timestamp - prev_time
-            prev_time = timestamp
-
-            # GPS高度
-            gps_alt = None
-            gps_v_acc = None
-            if raw and not gps.get('no_signal', True):
-                gps_alt = raw.get('altitude')
-                gps_v_acc = raw.get('vertical_accuracy', -1)
-
-                if gps_alt is not None and gps_alt != 0:
-                    gps_distances.append(total_distance)
-                    gps_altitudes.append(gps_alt)
-
-            # 気圧計相対高度
-            baro_relative = None
-            if baro:
-                baro_relative = baro.get('relative_altitude_m')
-                if baro_relative is not None:
-                    has_barometer_data = True
-
-            # 加速度Z軸
-            accel_z = None
-            if accel:
-                accel_z = accel.get('z')
-
-            # 高度融合（気圧計データがある場合のみ記録）
-            fused_alt = altitude_fusion.update(gps_alt, gps_v_acc, baro_relative, accel_z, dt)
-            if fused_alt is not None and baro_relative is not None:
-                fused_distances.append(total_distance)
-                fused_altitudes.append(fused_alt)
-
-            # 距離→座標の対応を記録
-            self._distance_to_coord.append((total_distance, lat, lon))
-
-            prev_lat, prev_lon = lat, lon
-
-        # 国土地理院標高タイルから地形断面を取得
-        try:
-            gsi_api = GSIElevationAPI(zoom=14)
-            # サンプリング間隔を調整（データ量に応じて）
-            sample_interval = max(1, len(coords) // 100)
-            terrain_profile = gsi_api.get_elevation_profile(coords, sample_interval=sample_interval)
-
-            if terrain_profile:
-                terrain_dist = [p[0] for p in terrain_profile]
-                terrain_elev = [p[1] for p in terrain_profile]
-
-                # 地形断面を塗りつぶしで描画
-                terrain_brush = pg.mkBrush('#4a5568')
-                fill = pg.FillBetweenItem(
-                    pg.PlotDataItem(terrain_dist, terrain_elev),
-                    pg.PlotDataItem(terrain_dist, [min(terrain_elev) - 10] * len(terrain_dist)),
-                    brush=terrain_brush
-                )
-                self.elevation_plot.addItem(fill)
-
-                # 地形の線も描画
-                self.elevation_plot.plot(terrain_dist, terrain_elev,
-                                         pen=pg.mkPen('#718096', width=2),
-                                         name='地形標高')
-        except Exception as e:
-            print(f'標高タイル取得エラー: {e}')
-
-        # GPS高度をプロット（地図のGPS Good色と統一: #118ab2）
-        if gps_distances and gps_altitudes:
-            self.elevation_plot.plot(gps_distances, gps_altitudes,
-                                     pen=pg.mkPen('#118ab2', width=2),
-                                     name='GPS高度')
-
-        # 融合高度をプロット（気圧計データがある場合のみ、地図のFusion色と統一: #00CED1）
-        if fused_distances and fused_altitudes and has_barometer_data:
-            self.elevation_plot.plot(fused_distances, fused_altitudes,
-                                     pen=pg.mkPen('#00CED1', width=2),
-                                     name='融合高度(GPS+気圧計)')
-
-        # LinearRegionItem（区間選択）を追加
-        if self._distance_to_coord:
-            max_dist = self._distance_to_coord[-1][0] if self._distance_to_coord else 1000
-            # 初期範囲は全体の20-40%
-            initial_region = [max_dist * 0.2, max_dist * 0.4]
-
-            self._elevation_region = pg.LinearRegionItem(
-                values=initial_region,
-                brush=pg.mkBrush(255, 165, 0, 50),  # オレンジ半透明
-                movable=True
-            )
-            self.elevation_plot.addItem(self._elevation_region)
-
-            # 範囲変更時のコールバック
-            self._elevation_region.sigRegionChanged.connect(self._on_elevation_region_changed)
-
-            # 初期表示
-            self._on_elevation_region_changed()
+        lat = points['lat']
+        lon = points['lon']
+
+        # 地形断面の取得用の (N, 2) 座標配列
+        coords = np.column_stack((lat, lon))
+
+        # 累積距離（読み込み時に計算済み）
+        distances = self.track_distance
+
+        # 高度融合の入力（先頭点のdtは0.1秒とする）
+        dt = np.empty(len(points))
+        dt[0] = 0.1
+        dt[1:] = np.diff(points['timestamp'])
+        gps_alt = points['gps_alt']
+        baro = points['baro']
+        has_barometer_data = not np.all(np.isnan(baro))  # 気圧計データの有無
+
+        gps_mask = ~np.isnan(gps_alt) & (gps_alt != 0)
+        gps_distances = distances[gps_mask]
+        gps_altitudes = gps_alt[gps_mask]
+
+        # 高度融合による推定高度を計算（気圧計データがある点のみ記録）
+        fused = AltitudeFusion().update_batch(gps_alt, points['gps_v_acc'], baro,
+                                              points['accel_z'], dt)
+        fused_mask = ~np.isnan(fused) & ~np.isnan(baro)
+        fused_distances = distances[fused_mask]
+        fused_altitudes = fused[fused_mask]
+
+        # 国土地理院標高タイルから地形断面を取得（通信を待つためワーカースレッドで取得し、届くまで地形は空にする）
+        self.terrain_curve.clear()
+        self._terrain_base.clear()
+        self._request_terrain_profile(coords)
+
+        # GPS高度
+        self.elevation_gps_curve.setData(gps_distances, gps_altitudes)
+
+        # 融合高度（気圧計データがある場合のみ）
+        if has_barometer_data:
+            self.elevation_fused_curve.setData(fused_distances, fused_altitudes)
+        else:
+            self.elevation_fused_curve.clear()
+
+        # 区間選択の初期範囲は全体の20-40%
+        max_dist = float(distances[-1])
+        self._elevation_region.setRegion([max_dist * 0.2, max_dist * 0.4])
+        self._elevation_region.setVisible(True)
+
+        # 初期表示（範囲が前回と同じ場合は変更通知が来ないため明示的に呼ぶ）
+        self._on_elevation_region_changed()
+
+    def _request_terrain_profile(self, coords):
+        """地形断面の取得を要求（取得中なら完了後に最新の要求だけを実行する）"""
+        self._terrain_request_id += 1
+        self._pending_terrain = (self._terrain_request_id, coords)
+        if self._terrain_thread is None:
+            self._start_terrain_thread()
+
+    def _start_terrain_thread(self):
+        """保留中の地形断面の要求をワーカースレッドで開始"""
+        request_id, coords = self._pending_terrain
+        self._pending_terrain = None
+
+        # サンプリング間隔を調整（データ量に応じて）
+        sample_interval = max(1, len(coords) // 100)
+
+        thread = QThread(self)
+        worker = TerrainProfileWorker(self._gsi_api, coords, sample_interval, request_id)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.loaded.connect(self._on_terrain_profile_loaded)
+        worker.loaded.connect(thread.quit)
+        thread.finished.connect(self._on_terrain_thread_finished)
+        thread.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+
+        # 完了までワーカーを参照しておく（GCで破棄されないように）
+        self._terrain_thread = thread
+        self._terrain_worker = worker
+        thread.start()
+
+    def _on_terrain_thread_finished(self):
+        """地形断面の取得スレッドの終了後、保留中の要求があれば開始"""
+        self._terrain_thread = None
+        self._terrain_worker = None
+        if self._pending_terrain is not None:
+            self._start_terrain_thread()
+
+    def _on_terrain_profile_loaded(self, request_id, terrain_dist, terrain_elev):
+        """取得した地形断面（線と、最低標高-10mまでの塗りつぶし）を描画"""
+        if request_id != self._terrain_request_id:
+            return  # 別のファイルを読み込んだ後に届いた古い結果
+
+        self.terrain_curve.setData(terrain_dist, terrain_elev)
+        if len(terrain_elev) > 0:
+            self._terrain_base.setData(terrain_dist, np.full(len(terrain_dist), terrain_elev.min() - 10))
+        else:
+            self._terrain_base.clear()
 
     def _on_elevation_region_changed(self):
         """断面図の区間選択が変更された時のコールバック"""
-        if not hasattr(self, '_elevation_region') or not hasattr(self, '_distance_to_coord'):
+        if not self._elevation_region.isVisible():
             return
 
-        region = self._elevation_region.getRegion()
-        start_dist, end_dist = region
-
-        # 距離から座標を検索
-        start_coord = None
-        end_coord = None
-
-        for dist, lat, lon in self._distance_to_coord:
-            if start_coord is None and dist >= start_dist:
-                start_coord = (lat, lon)
-            if dist <= end_dist:
-                end_coord = (lat, lon)
-
-        if start_coord and end_coord:
-            js = f'setRegionMarkers({start_coord[0]}, {start_coord[1]}, {end_coord[0]}, {end_coord[1]});'
-            self.integrated_map_view.page().runJavaScript(js)
-
-    def _haversine_distance(self, lat1, lon1, lat2, lon2):
-        """2点間の距離をHaversine公式で計算（メートル）"""
-        R = 6378137.0  # 地球半径
-
-        lat1_rad = np.radians(lat1)
-        lat2_rad = np.radians(lat2)
-        dlat = np.radians(lat2 - lat1)
-        dlon = np.radians(lon2 - lon1)
+        start_dist, end_dist = self._elevation_region.getRegion()
 
-        a = np.sin(dlat/2)**2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(dlon/2)**2
-        c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
+        # 区間内の最初と最後の点を累積距離の二分探索で求める
+        distances = self.track_distance
+        start = np.searchsorted(distances, start_dist, side='left')
+        end = np.searchsorted(distances, end_dist, side='right') - 1
 
-        return R * c
+        if start < len(distances) and end >= 0:
+            lat = self.track_points['lat']
+            lon = self.track_points['lon']
+            js = f'setRegionMarkers({lat[start]}, {lon[start]}, {lat[end]}, {lon[end]});'
+            self.integrated_map_view.run_js(js, 'region')
 
 
 def main():
+    # QtWebEngineをQApplication作成後に遅延インポートするために必要
+    QApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
     app = QApplication(sys.argv)
     app.setStyle('Fusion')
 